@@ -2,15 +2,12 @@
 from fastapi import FastAPI
 from pydantic import BaseModel
 import pandas as pd
-from scripts.load_data import load_data
-from Models.ml_optimizer import MLOptimizer
+from Models.model_cache import get_optimizer
 
 app = FastAPI(title="RWA Portfolio Predictions API")
 
-# Load data once
-data, prices_matrix, tx_df = load_data()
-optimizer = MLOptimizer(data, prices_matrix, tx_df)
-optimizer.train_models()
+# Warm up at startup: models are loaded from the registry (scripts/train_models.py), not trained per worker
+get_optimizer()
 
 
 class SymbolsRequest(BaseModel):
@@ -23,6 +20,7 @@ def get_predictions(symbols: str = None):
     Returns ML predictions for return, liquidity, and risk.
     symbols: comma-separated list, e.g. ?symbols=PAXG,XAUt
     """
+    optimizer = get_optimizer()
     df = optimizer.data.copy()
 
     if symbols:
@@ -31,4 +29,4 @@ def get_predictions(symbols: str = None):
 
     # Build output dictionary
     result = df[["symbol", "pred_return", "pred_liquidity", "pred_risk"]].to_dict(orient="records")
-    return {"predictions": result}
\ No newline at end of file
+    return {"predictions": result, "model_version": optimizer.model_version}
\ No newline at end of file
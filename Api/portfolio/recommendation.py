@@ -4,8 +4,8 @@ from pydantic import BaseModel
 from typing import List
 import pandas as pd
 
-from scripts.load_data import load_data
-from Models.ml_optimizer import MLOptimizer
+from Models.model_cache import get_optimizer
+from Models.frontier import frontier_cache
 
 app = FastAPI()
 
@@ -15,34 +15,46 @@ class PortfolioRequest(BaseModel):
     amount_to_invest: float
     risk_tolerance: float
     liquidity_weight: float = 0.2
+    # True: résolution directe au lieu de la frontière précalculée
+    exact: bool = False
+
+
+class InvestorProfile(BaseModel):
+    risk_tolerance: float
+    liquidity_weight: float = 0.2
+
+
+class BatchPortfolioRequest(BaseModel):
+    symbols: List[str]
+    amount_to_invest: float
+    # Grille risk_tolerance x liquidity_weight ...
+    risk_tolerances: List[float] = []
+    liquidity_weights: List[float] = [0.2]
+    # ... et/ou des profils explicites
+    profiles: List[InvestorProfile] = []
 
 
 @app.post("/optimize")
 def optimize_portfolio(req: PortfolioRequest):
-    # Charger les données
-    data, prices_matrix, tx_df = load_data()
+    # Optimizer entraîné partagé, réentraîné seulement si les CSV changent
+    optimizer = get_optimizer()
 
     # Vérifier que les symbols existent dans data
-    allowed_symbols = [s for s in req.symbols if s in data["symbol"].values]
+    allowed_symbols = [s for s in req.symbols if s in optimizer.data["symbol"].values]
     if not allowed_symbols:
         return {"error": "None of the requested symbols exist in the data."}
 
-    # ML optimizer
-    optimizer = MLOptimizer(
-        data=data,
-        prices_matrix=prices_matrix,
-        tx_df=tx_df,
-        min_allocation=0.05
-    )
-    optimizer.train_models()
-
-    # Optimiser le portefeuille
-    allocation = optimizer.optimize_portfolio(
-        amount_invest=req.amount_to_invest,
-        risk_tolerance=req.risk_tolerance,
-        allowed_symbols=allowed_symbols,
-        liquidity_weight=req.liquidity_weight
-    )
+    # Optimiser le portefeuille: interpolé sur la frontière précalculée, sauf demande explicite
+    if req.exact:
+        allocation = optimizer.optimize_portfolio(
+            amount_invest=req.amount_to_invest,
+            risk_tolerance=req.risk_tolerance,
+            allowed_symbols=allowed_symbols,
+            liquidity_weight=req.liquidity_weight
+        )
+        source = "solver"
+    else:
+        allocation, source = frontier_cache.optimize(optimizer, allowed_symbols, req.risk_tolerance, req.liquidity_weight)
 
     # Préparer le retour : allocation % et $ propre pour JSON
     allocation_percent = {k: float(v) for k, v in allocation.items()}
@@ -52,5 +64,49 @@ def optimize_portfolio(req: PortfolioRequest):
         "requested_symbols": req.symbols,
         "allowed_symbols": allowed_symbols,
         "allocation_percent": allocation_percent,
-        "allocation_amount": allocation_amount
+        "allocation_amount": allocation_amount,
+        "source": source
+    }
+
+
+# Profils résolus au plus par requête batch
+MAX_BATCH_PROFILES = 2000
+
+
+@app.post("/optimize/batch")
+def optimize_portfolio_batch(req: BatchPortfolioRequest):
+    """Frontière complète en un aller-retour: tous les profils sont résolus sur le même optimizer entraîné."""
+    optimizer = get_optimizer()
+
+    allowed_symbols = [s for s in req.symbols if s in optimizer.data["symbol"].values]
+    if not allowed_symbols:
+        return {"error": "None of the requested symbols exist in the data."}
+
+    if len(req.risk_tolerances) * len(req.liquidity_weights) + len(req.profiles) > MAX_BATCH_PROFILES:
+        return {"error": f"At most {MAX_BATCH_PROFILES} profiles per batch."}
+    profiles = [(r, l) for l in req.liquidity_weights for r in req.risk_tolerances]
+    profiles += [(p.risk_tolerance, p.liquidity_weight) for p in req.profiles]
+    if not profiles:
+        return {"error": "Provide risk_tolerances (with liquidity_weights) or profiles."}
+
+    results = optimizer.optimize_batch(profiles, allowed_symbols=allowed_symbols)
+
+    frontier = []
+    for (risk_tolerance, liquidity_weight), result in zip(profiles, results):
+        allocation_percent = {k: float(v) for k, v in result["allocation_percent"].items()}
+        entry = {
+            "risk_tolerance": risk_tolerance,
+            "liquidity_weight": liquidity_weight,
+            "allocation_percent": allocation_percent,
+            "allocation_amount": {k: float(v * req.amount_to_invest / 100) for k, v in allocation_percent.items()},
+            "expected_return": result["expected_return"],
+            "volatility": result["volatility"],
+            "liquidity": result["liquidity"],
+        }
+        frontier.append(entry)
+
+    return {
+        "requested_symbols": req.symbols,
+        "allowed_symbols": allowed_symbols,
+        "frontier": frontier
     }
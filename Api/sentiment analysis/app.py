@@ -3,14 +3,16 @@
 # FastAPI Application
 # ==============================
 
-from fastapi import FastAPI, HTTPException, Query, Depends, status
+from fastapi import FastAPI, HTTPException, Query, Depends, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, FileResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.openapi.docs import get_swagger_ui_html
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Tuple
 import json
+import re
+import base64
 import pandas as pd
 import numpy as np
 from pydantic import BaseModel, Field, validator
@@ -19,8 +21,21 @@ import os
 from pathlib import Path
 import logging
 from enum import Enum
-import tempfile
+from hsi_aggregator import HSIAggregator, update_summary
+from hsi_analytics import DailyBase, normalize_freq, rolling
 import os
+import asyncio
+import hashlib
+import time
+import gzip
+import threading
+from collections import OrderedDict
+
+# optional zstd compression for downloads
+try:
+    import zstandard
+except Exception:
+    zstandard = None
 
 # ==============================
 # LOGGING SETUP
@@ -43,6 +58,23 @@ class TimePeriod(str, Enum):
     WEEKLY = "weekly"
     MONTHLY = "monthly"
 
+class DownloadEncoding(str, Enum):
+    IDENTITY = "identity"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+class DownsampleMode(str, Enum):
+    TAIL = "tail"
+    LTTB = "lttb"
+    MINMAX = "minmax"
+    MEAN = "mean"
+
+class RollingStat(str, Enum):
+    MEAN = "mean"
+    STD = "std"
+    EWMA = "ewma"
+    ZSCORE = "zscore"
+
 class HSIDataPoint(BaseModel):
     """Model for HSI data point"""
     date: str
@@ -83,6 +115,18 @@ class ArticlesResponse(BaseModel):
     data: List[Article]
     count: int
     description: str
+    next_cursor: Optional[str] = Field(None, description="Pass as `after` to fetch the next page")
+
+class IngestRequest(BaseModel):
+    """Request model for ingesting newly scored articles"""
+    articles: List[Article] = Field(..., min_items=1, description="Scored articles to add")
+
+class IngestResponse(BaseModel):
+    """Response model for article ingestion"""
+    success: bool = True
+    ingested: int
+    version: Optional[str]
+    description: str = "Articles ingested into the HSI tables"
 
 class KeywordsResponse(BaseModel):
     """Response model for keywords"""
@@ -102,93 +146,510 @@ class FilterParams(BaseModel):
     housing_only: Optional[bool] = Field(False, description="Only housing articles")
     limit: Optional[int] = Field(100, ge=1, le=1000, description="Limit results")
 
+# ==============================
+# COLUMNAR HSI STORE
+# ==============================
+
+class HSISeries:
+    """Date-sorted, columnar view of one HSI period (daily, weekly or monthly)"""
+
+    def __init__(self, records: List[Dict]):
+        dates = pd.to_datetime(
+            pd.Series([item.get('date', '') for item in records], dtype=object),
+            errors="coerce",
+            format="mixed"
+        )
+        # Undated rows sort first so start_date excludes them, like the old string compare
+        dates = dates.fillna(pd.Timestamp.min).values.astype("datetime64[ns]")
+        order = np.argsort(dates, kind="stable")
+
+        self.records = [records[i] for i in order]
+        self.dates = dates[order]
+        self.hsi_mean = np.array(
+            [item.get('hsi_mean', 0) for item in self.records], dtype=np.float64
+        )
+        self.article_count = np.array(
+            [item.get('article_count', 0) for item in self.records], dtype=np.float64
+        )
+        self._columns: Dict[str, Optional[np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def column(self, metric: str) -> Optional[np.ndarray]:
+        """Float column for a record field (missing values read as 0), built once.
+
+        Returns None when the field holds non-numeric values (e.g. date, text).
+        """
+        if metric not in self._columns:
+            values = [item.get(metric, 0) for item in self.records]
+            numeric = all(value is None or isinstance(value, (int, float, np.number)) for value in values)
+            self._columns[metric] = np.array(
+                [np.nan if value is None else value for value in values], dtype=np.float64
+            ) if numeric else None
+        return self._columns[metric]
+
+    def date_slice(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> slice:
+        """Binary-search the row range covering [start_date, end_date] (whole days).
+
+        An unparseable bound matches nothing.
+        """
+        lo, hi = 0, len(self.dates)
+        if start_date:
+            start = pd.to_datetime(start_date, errors="coerce")
+            if pd.isna(start):
+                return slice(0, 0)
+            lo = int(np.searchsorted(self.dates, np.datetime64(start.normalize(), "ns"), side="left"))
+        if end_date:
+            end = pd.to_datetime(end_date, errors="coerce")
+            if pd.isna(end):
+                return slice(0, 0)
+            end = end.normalize() + pd.Timedelta(days=1)
+            hi = int(np.searchsorted(self.dates, np.datetime64(end, "ns"), side="left"))
+        return slice(lo, max(lo, hi))
+
+    def query(self, filters: FilterParams = None) -> List[Dict]:
+        """Apply date bounds by binary search and value filters as vectorized masks
+
+        Masks are written as negated exclusions so NaN values pass, as before.
+        """
+        if not filters:
+            return self.records
+
+        window = self.date_slice(filters.start_date, filters.end_date)
+        mask = np.ones(window.stop - window.start, dtype=bool)
+        if filters.min_hsi is not None:
+            mask &= ~(self.hsi_mean[window] < filters.min_hsi)
+        if filters.max_hsi is not None:
+            mask &= ~(self.hsi_mean[window] > filters.max_hsi)
+        if filters.min_articles is not None:
+            mask &= ~(self.article_count[window] < filters.min_articles)
+
+        indices = np.flatnonzero(mask) + window.start
+        if filters.limit:
+            indices = indices[:filters.limit]
+        return [self.records[i] for i in indices]
+
+class ArticleIndex:
+    """Date-sorted articles with inverted indexes for keyset-paginated search.
+
+    Every article gets a position in date order; posting lists are sorted
+    arrays of positions per sentiment, housing flag, housing keyword and
+    text term. A cursor is the position of the last article on a page.
+    """
+
+    TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+    CHUNK_SIZE = 4096
+
+    def __init__(self, records: List[Dict]):
+        self.series = HSISeries(records)
+        self.records = self.series.records
+        self.dates = self.series.dates
+
+        postings: Dict[str, List[int]] = {}
+        for position, article in enumerate(self.records):
+            keys = {f"sentiment:{article.get('sentiment')}"}
+            if article.get('contains_housing'):
+                keys.add("housing")
+            for keyword in article.get('housing_keywords') or []:
+                keys.add(f"keyword:{str(keyword).lower()}")
+            for token in self.tokenize(article.get('text', '')):
+                keys.add(f"term:{token}")
+            for key in keys:
+                postings.setdefault(key, []).append(position)
+
+        self.postings = {key: np.array(ids, dtype=np.int64) for key, ids in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return cls.TOKEN_PATTERN.findall((text or '').lower())
+
+    @staticmethod
+    def encode_cursor(position: int) -> str:
+        return base64.urlsafe_b64encode(str(position).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> int:
+        """Decode a cursor produced by encode_cursor; raises ValueError if malformed"""
+        padded = cursor + "=" * (-len(cursor) % 4)
+        try:
+            return int(base64.urlsafe_b64decode(padded.encode()).decode())
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+
+    def search(
+        self,
+        filters: FilterParams = None,
+        q: Optional[str] = None,
+        keyword: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Return one page of matching articles and the cursor for the next page"""
+        window = self.series.date_slice(
+            filters.start_date if filters else None,
+            filters.end_date if filters else None
+        )
+        start = window.start
+        if after:
+            start = max(start, self.decode_cursor(after) + 1)
+        stop = window.stop
+        limit = filters.limit if filters and filters.limit else len(self.records)
+
+        keys = []
+        if filters and filters.housing_only:
+            keys.append("housing")
+        if filters and filters.sentiment:
+            keys.append(f"sentiment:{filters.sentiment.value}")
+        if keyword:
+            keys.append(f"keyword:{keyword.lower()}")
+        if q:
+            keys.extend(f"term:{token}" for token in self.tokenize(q))
+
+        lists = []
+        for key in keys:
+            if key not in self.postings:
+                return [], None
+            lists.append(self.postings[key])
+        lists.sort(key=len)
+
+        # Drive the scan from the shortest posting list (or the date window
+        # itself) starting at the cursor, and probe the others by binary search.
+        if lists:
+            driver, others = lists[0], lists[1:]
+            offset = int(np.searchsorted(driver, start, side="left"))
+            end = int(np.searchsorted(driver, stop, side="left"))
+        else:
+            driver, others = None, []
+            offset, end = start, stop
+
+        found: List[int] = []
+        while offset < end and len(found) <= limit:
+            chunk_end = min(offset + self.CHUNK_SIZE, end)
+            chunk = driver[offset:chunk_end] if driver is not None else np.arange(offset, chunk_end)
+            keep = np.ones(len(chunk), dtype=bool)
+            for other in others:
+                probe = np.searchsorted(other, chunk).clip(max=len(other) - 1)
+                keep &= other[probe] == chunk
+            found.extend(chunk[keep][:limit + 1 - len(found)].tolist())
+            offset = chunk_end
+
+        page = found[:limit]
+        next_cursor = self.encode_cursor(page[-1]) if len(found) > limit else None
+        return [self.records[i] for i in page], next_cursor
+
+# ==============================
+# DOWNSAMPLING
+# ==============================
+
+def bucket_bounds(n: int, buckets: int) -> np.ndarray:
+    """Start offsets of `buckets` near-equal index buckets over n points"""
+    return (np.arange(buckets) * n) // buckets
+
+def downsample_lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-triangle-three-buckets; returns the indices of the kept points"""
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest are split into buckets
+    edges = 1 + bucket_bounds(n - 2, points - 2)
+    edges = np.append(edges, n - 1)
+    x = x.astype(np.float64)
+
+    # Average point of every bucket, used as the third triangle vertex
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(points - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        ax, ay = x[previous], y[previous]
+        areas = np.abs(
+            (ax - avg_x[bucket + 1]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[bucket + 1] - ay)
+        )
+        previous = lo + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+def downsample_minmax(y: np.ndarray, points: int) -> np.ndarray:
+    """Min/max envelope: the lowest and highest point of points/2 buckets"""
+    n = len(y)
+    if points >= n or points < 2:
+        return np.arange(n)
+
+    buckets = points // 2
+    starts = bucket_bounds(n, buckets)
+    counts = np.diff(np.append(starts, n))
+    bucket_of = np.repeat(np.arange(buckets), counts)
+
+    def first_match(extremes: np.ndarray) -> np.ndarray:
+        hits = np.flatnonzero(y == np.repeat(extremes, counts))
+        _, first = np.unique(bucket_of[hits], return_index=True)
+        return hits[first]
+
+    lows = first_match(np.minimum.reduceat(y, starts))
+    highs = first_match(np.maximum.reduceat(y, starts))
+    return np.unique(np.concatenate([lows, highs]))
+
+def downsample_mean(y: np.ndarray, points: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Fixed-bucket mean; returns (bucket start indices, bucket means)"""
+    n = len(y)
+    if points >= n:
+        return np.arange(n), y
+    starts = bucket_bounds(n, points)
+    return starts, np.add.reduceat(y, starts) / np.diff(np.append(starts, n))
+
 # ==============================
 # DATA MANAGER
 # ==============================
 
+class HSISnapshot:
+    """Immutable, fully indexed view of one version of the HSI data file.
+
+    A snapshot is built completely before it is published, so readers that
+    grab a reference never observe a half-loaded state.
+    """
+
+    def __init__(self, data: Dict, version: Optional[str] = None, stat: Optional[Tuple[int, int]] = None,
+                 load_duration: float = 0.0, generation: int = 0, base: Optional["HSISnapshot"] = None):
+        self.data = data
+        self.version = version
+        self.stat = stat
+        self.load_duration = load_duration
+        self.generation = generation
+        self.loaded_at = datetime.now()
+        self._encoded: Dict[str, bytes] = {}
+        self._encode_lock = threading.Lock()
+        self._daily_base: Optional[DailyBase] = None
+        self._daily_base_lock = threading.Lock()
+        if "error" in data:
+            self.series: Dict[str, HSISeries] = {}
+            self.articles: Optional[ArticleIndex] = None
+        elif base is not None:
+            # Derived snapshot: only re-index what differs from the base
+            self.series = {
+                period.value: (
+                    base.series[period.value]
+                    if data.get(period.value) is base.data.get(period.value)
+                    else HSISeries(data.get(period.value, []))
+                )
+                for period in TimePeriod
+            }
+            self.articles = (
+                base.articles
+                if data.get('articles') is base.data.get('articles')
+                else ArticleIndex(data.get('articles', []))
+            )
+        else:
+            self.series = {
+                period.value: HSISeries(data.get(period.value, []))
+                for period in TimePeriod
+            }
+            self.articles = ArticleIndex(data.get('articles', []))
+
+    def derive(self, updates: Dict[str, Any], tag: str) -> "HSISnapshot":
+        """New snapshot with some top-level sections replaced, sharing the rest"""
+        started = time.perf_counter()
+        snapshot = HSISnapshot(
+            {**self.data, **updates},
+            version=hashlib.sha256(f"{self.version}:{tag}".encode()).hexdigest()[:16],
+            stat=self.stat,
+            generation=self.generation + 1,
+            base=self
+        )
+        snapshot.load_duration = time.perf_counter() - started
+        return snapshot
+
+    @property
+    def ok(self) -> bool:
+        return "error" not in self.data
+
+    def daily_base(self) -> DailyBase:
+        """Prefix-summed daily series for analytics, built once per snapshot.
+
+        Uses the daily table when it is aggregated (after ingestion),
+        otherwise groups the exported articles by day.
+        """
+        with self._daily_base_lock:
+            if self._daily_base is None:
+                daily = self.data.get('daily') or []
+                if daily and all('hsi_mean' in row for row in daily):
+                    self._daily_base = DailyBase.from_table(daily)
+                else:
+                    articles = self.data.get('articles') or daily
+                    self._daily_base = DailyBase.from_articles(
+                        [row for row in articles if 'sentiment_score' in row]
+                    )
+            return self._daily_base
+
+    def encoded(self, encoding: DownloadEncoding = DownloadEncoding.IDENTITY) -> bytes:
+        """JSON export of this snapshot, encoded once per version and encoding"""
+        with self._encode_lock:
+            return self._encode(encoding)
+
+    def _encode(self, encoding: DownloadEncoding) -> bytes:
+        if encoding.value not in self._encoded:
+            if encoding == DownloadEncoding.IDENTITY:
+                body = json.dumps(self.data, indent=2, default=str).encode('utf-8')
+            elif encoding == DownloadEncoding.GZIP:
+                body = gzip.compress(self._encode(DownloadEncoding.IDENTITY), compresslevel=6, mtime=0)
+            else:
+                body = zstandard.ZstdCompressor(level=10).compress(self._encode(DownloadEncoding.IDENTITY))
+            self._encoded[encoding.value] = body
+        return self._encoded[encoding.value]
+
+    @classmethod
+    def load(cls, data_file: str, generation: int = 0) -> "HSISnapshot":
+        """Parse and index the data file; failures yield an error snapshot"""
+        started = time.perf_counter()
+        try:
+            stat = file_signature(data_file)
+            with open(data_file, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw)
+            snapshot = cls(
+                data,
+                version=hashlib.sha256(raw).hexdigest()[:16],
+                stat=stat,
+                load_duration=time.perf_counter() - started,
+                generation=generation
+            )
+            logger.info(f"✅ Data loaded from {data_file}")
+            logger.info(f"   Articles: {data['summary']['total_articles']}")
+            logger.info(f"   Date range: {data['summary']['date_range']['start']} to {data['summary']['date_range']['end']}")
+            logger.info(f"   Version: {snapshot.version} ({snapshot.load_duration:.3f}s)")
+            return snapshot
+        except FileNotFoundError:
+            logger.error(f"❌ Data file {data_file} not found")
+            return cls({"error": "Data file not found. Run the Jupyter notebook first."}, generation=generation)
+        except Exception as e:
+            logger.error(f"❌ Error loading data: {str(e)}")
+            return cls({"error": f"Error loading data: {str(e)}"}, generation=generation)
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Cheap change detector for the data file: (mtime_ns, size)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 class DataManager:
     """Manages loading and accessing HSI data"""
     
     def __init__(self, data_file: str = "hsi_processed_data.json"):
         self.data_file = data_file
-        self.data = {}
+        self.snapshot = HSISnapshot({"error": "Data not loaded yet"})
+        self.last_seen_stat: Optional[Tuple[int, int]] = None
+        self.aggregator: Optional[HSIAggregator] = None
+        self.ingest_lock = threading.Lock()
         self.load_data()
     
+    @property
+    def data(self) -> Dict:
+        return self.snapshot.data
+    
     def load_data(self):
         """Load processed data from JSON file"""
-        try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                self.data = json.load(f)
-            logger.info(f"✅ Data loaded from {self.data_file}")
-            logger.info(f"   Articles: {self.data['summary']['total_articles']}")
-            logger.info(f"   Date range: {self.data['summary']['date_range']['start']} to {self.data['summary']['date_range']['end']}")
-        except FileNotFoundError:
-            logger.error(f"❌ Data file {self.data_file} not found")
-            self.data = {"error": "Data file not found. Run the Jupyter notebook first."}
-        except Exception as e:
-            logger.error(f"❌ Error loading data: {str(e)}")
-            self.data = {"error": f"Error loading data: {str(e)}"}
+        with self.ingest_lock:
+            self.snapshot = HSISnapshot.load(self.data_file, generation=self.snapshot.generation + 1)
+            self.last_seen_stat = self.snapshot.stat
+            self.aggregator = None
+    
+    def reload_if_changed(self) -> bool:
+        """Build and publish a new snapshot if the data file changed on disk.
+
+        A file that fails to parse does not replace a good snapshot.
+        """
+        current = self.snapshot
+        signature = file_signature(self.data_file)
+        if signature is None or signature == self.last_seen_stat:
+            return False
+        
+        snapshot = HSISnapshot.load(self.data_file, generation=current.generation + 1)
+        self.last_seen_stat = signature
+        if not snapshot.ok and current.ok:
+            logger.warning(f"⚠️  Keeping snapshot {current.version}; new data file failed to load")
+            return False
+        if snapshot.version is not None and snapshot.version == current.version:
+            return False
+        
+        with self.ingest_lock:
+            # A new notebook export supersedes articles ingested since the last one
+            self.snapshot = snapshot
+            self.aggregator = None
+        logger.info(f"🔄 Swapped in HSI snapshot {snapshot.version} (generation {snapshot.generation})")
+        return True
+    
+    def ingest_articles(self, articles: List[Dict]) -> HSISnapshot:
+        """Fold newly scored articles into the HSI tables, article index and summary, and publish a new snapshot"""
+        with self.ingest_lock:
+            current = self.snapshot
+            if not current.ok:
+                raise ValueError(current.data["error"])
+            if self.aggregator is None:
+                self.aggregator = HSIAggregator.from_tables(current.data)
+            
+            self.aggregator.ingest_many(articles)
+            updates = {
+                period.value: self.aggregator.records(period.value)
+                for period in TimePeriod
+            }
+            # Ingested articles are searchable and counted in the summary right away
+            updates['articles'] = (current.data.get('articles') or []) + articles
+            updates['summary'] = update_summary(current.data.get('summary') or {}, articles)
+            self.snapshot = current.derive(updates, tag=f"ingest-{self.aggregator.ingested}")
+            logger.info(f"📰 Ingested {len(articles)} articles into snapshot {self.snapshot.version}")
+            return self.snapshot
+    
+    async def watch(self, interval: float = 5.0):
+        """Poll the data file and reload it off the event loop when it changes"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"❌ Error reloading data: {str(e)}")
     
     def get_weekly_hsi(self, filters: FilterParams = None) -> List[Dict]:
         """Get weekly HSI data with optional filters"""
-        if "error" in self.data:
-            return []
-        
-        data = self.data.get('weekly', [])
-        return self._filter_data(data, filters)
+        return self._filter_data(TimePeriod.WEEKLY, filters)
     
     def get_monthly_hsi(self, filters: FilterParams = None) -> List[Dict]:
         """Get monthly HSI data with optional filters"""
-        if "error" in self.data:
-            return []
-        
-        data = self.data.get('monthly', [])
-        return self._filter_data(data, filters)
+        return self._filter_data(TimePeriod.MONTHLY, filters)
     
     def get_daily_hsi(self, filters: FilterParams = None) -> List[Dict]:
         """Get daily HSI data with optional filters"""
-        if "error" in self.data:
-            return []
-        
-        data = self.data.get('daily', [])
-        return self._filter_data(data, filters)
+        return self._filter_data(TimePeriod.DAILY, filters)
     
     def get_articles(self, filters: FilterParams = None) -> List[Dict]:
-        """Get articles with optional filters"""
-        if "error" in self.data:
-            return []
-        
-        data = self.data.get('articles', [])
-        
-        # Apply filters
-        filtered_data = []
-        for article in data:
-            # Apply housing filter
-            if filters and filters.housing_only and not article['contains_housing']:
-                continue
-            
-            # Apply sentiment filter
-            if filters and filters.sentiment and article['sentiment'] != filters.sentiment.value:
-                continue
-            
-            # Apply date filters
-            if filters and filters.start_date:
-                article_date = article['date'].split('T')[0] if 'T' in article['date'] else article['date']
-                if article_date < filters.start_date:
-                    continue
-            
-            if filters and filters.end_date:
-                article_date = article['date'].split('T')[0] if 'T' in article['date'] else article['date']
-                if article_date > filters.end_date:
-                    continue
-            
-            filtered_data.append(article)
-        
-        # Apply limit
-        if filters and filters.limit:
-            filtered_data = filtered_data[:filters.limit]
+        """Get the first page of articles with optional filters"""
+        return self.search_articles(filters)[0]
+    
+    def search_articles(
+        self,
+        filters: FilterParams = None,
+        q: Optional[str] = None,
+        keyword: Optional[str] = None,
+        after: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Get a page of articles and the cursor for the next one"""
+        articles = self.snapshot.articles
+        if articles is None:
+            return [], None
         
-        return filtered_data
+        return articles.search(filters, q=q, keyword=keyword, after=after)
     
     def get_summary(self) -> Dict:
         """Get summary statistics"""
@@ -198,41 +659,12 @@ class DataManager:
         """Get keyword statistics"""
         return self.data.get('keywords', {})
     
-    def _filter_data(self, data: List[Dict], filters: FilterParams = None) -> List[Dict]:
-        """Apply filters to HSI data"""
-        if not filters:
-            return data
-        
-        filtered_data = []
-        
-        for item in data:
-            # Apply HSI filters
-            if filters.min_hsi is not None and item.get('hsi_mean', 0) < filters.min_hsi:
-                continue
-            if filters.max_hsi is not None and item.get('hsi_mean', 0) > filters.max_hsi:
-                continue
-            
-            # Apply article count filter
-            if filters.min_articles is not None and item.get('article_count', 0) < filters.min_articles:
-                continue
-            
-            # Apply date filters
-            item_date = item.get('date', '')
-            if 'T' in item_date:
-                item_date = item_date.split('T')[0]
-            
-            if filters.start_date and item_date < filters.start_date:
-                continue
-            if filters.end_date and item_date > filters.end_date:
-                continue
-            
-            filtered_data.append(item)
-        
-        # Apply limit
-        if filters.limit:
-            filtered_data = filtered_data[:filters.limit]
-        
-        return filtered_data
+    def _filter_data(self, period: TimePeriod, filters: FilterParams = None) -> List[Dict]:
+        """Apply filters to HSI data through the period's columnar store"""
+        series = self.snapshot.series.get(period.value)
+        if series is None:
+            return []
+        return series.query(filters)
     
     def get_latest_hsi(self) -> Dict:
         """Get latest HSI data point"""
@@ -241,6 +673,57 @@ class DataManager:
             return weekly_data[-1]
         return {}
 
+# ==============================
+# RESPONSE CACHE
+# ==============================
+
+class ResponseCache:
+    """LRU cache of serialized JSON response bodies bounded by total size.
+
+    Keys embed the data version, so a snapshot swap makes old entries
+    unreachable and they age out under the memory budget.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key))
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
 # ==============================
 # APP INITIALIZATION
 # ==============================
@@ -266,6 +749,12 @@ app = FastAPI(
 # Initialize data manager
 data_manager = DataManager()
 
+# Seconds between data file checks; 0 disables hot reload
+DATA_RELOAD_INTERVAL = float(os.getenv("HSI_RELOAD_INTERVAL", "5"))
+
+# Serialized responses keyed on (endpoint, params, data version)
+response_cache = ResponseCache(max_bytes=int(os.getenv("HSI_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -288,6 +777,68 @@ def get_data_manager():
     """Dependency to get data manager instance"""
     return data_manager
 
+# ==============================
+# CACHED RESPONSES
+# ==============================
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches the given strong ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+def cached_response(request: Request, snapshot: HSISnapshot, endpoint: str, params: Dict[str, Any], build) -> Response:
+    """Serve `build()`'s JSON bytes from the response cache, with ETag / 304.
+
+    The ETag depends only on the endpoint, normalized params and data
+    version, so a revalidation never needs to rebuild the body.
+    """
+    key = (
+        endpoint,
+        tuple(sorted((name, str(value)) for name, value in params.items() if value is not None)),
+        snapshot.version
+    )
+    etag = f'"{hashlib.sha1(repr(key).encode()).hexdigest()[:20]}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    body = response_cache.get(key)
+    if body is None:
+        body = build()
+        response_cache.put(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def hsi_period_response(request: Request, dm: DataManager, period: TimePeriod,
+                        filters: FilterParams, description: str) -> Response:
+    """Cached HSIResponse for one period"""
+    snapshot = dm.snapshot
+    if not snapshot.ok:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=snapshot.data["error"]
+        )
+    
+    def build() -> bytes:
+        series = snapshot.series.get(period.value)
+        data = series.query(filters) if series is not None else []
+        return HSIResponse(
+            success=True,
+            period=period,
+            data=data,
+            count=len(data),
+            description=description,
+            metadata={
+                "filters_applied": filters.dict(exclude_none=True),
+                "timestamp": datetime.now().isoformat()
+            }
+        ).json().encode('utf-8')
+    
+    return cached_response(request, snapshot, f"/api/hsi/{period.value}", filters.dict(), build)
+
 # ==============================
 # HTML PAGES
 # ==============================
@@ -507,6 +1058,7 @@ async def root():
 
 @app.get("/api/hsi/weekly", response_model=HSIResponse)
 async def get_weekly_hsi(
+    request: Request,
     filters: FilterParams = Depends(),
     dm: DataManager = Depends(get_data_manager)
 ):
@@ -520,80 +1072,37 @@ async def get_weekly_hsi(
     - **min_articles**: Minimum article count
     - **limit**: Maximum number of results (1-1000)
     """
-    data = dm.get_weekly_hsi(filters)
-    
-    if not data and "error" in dm.data:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=dm.data["error"]
-        )
-    
-    return HSIResponse(
-        success=True,
-        period=TimePeriod.WEEKLY,
-        data=data,
-        count=len(data),
-        description="Weekly Housing Sentiment Index (HSI) data",
-        metadata={
-            "filters_applied": filters.dict(exclude_none=True),
-            "timestamp": datetime.now().isoformat()
-        }
+    return hsi_period_response(
+        request, dm, TimePeriod.WEEKLY, filters,
+        "Weekly Housing Sentiment Index (HSI) data"
     )
 
 @app.get("/api/hsi/monthly", response_model=HSIResponse)
 async def get_monthly_hsi(
+    request: Request,
     filters: FilterParams = Depends(),
     dm: DataManager = Depends(get_data_manager)
 ):
     """
     Get monthly Housing Sentiment Index (HSI) data.
     """
-    data = dm.get_monthly_hsi(filters)
-    
-    if not data and "error" in dm.data:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=dm.data["error"]
-        )
-    
-    return HSIResponse(
-        success=True,
-        period=TimePeriod.MONTHLY,
-        data=data,
-        count=len(data),
-        description="Monthly Housing Sentiment Index (HSI) data",
-        metadata={
-            "filters_applied": filters.dict(exclude_none=True),
-            "timestamp": datetime.now().isoformat()
-        }
+    return hsi_period_response(
+        request, dm, TimePeriod.MONTHLY, filters,
+        "Monthly Housing Sentiment Index (HSI) data"
     )
 
 @app.get("/api/hsi/daily", response_model=HSIResponse)
 async def get_daily_hsi(
+    request: Request,
     filters: FilterParams = Depends(),
     dm: DataManager = Depends(get_data_manager)
 ):
     """
     Get daily Housing Sentiment Index (HSI) data.
     """
-    data = dm.get_daily_hsi(filters)
-    
-    if not data and "error" in dm.data:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=dm.data["error"]
-        )
-    
-    return HSIResponse(
-        success=True,
-        period=TimePeriod.DAILY,
-        data=data,
-        count=len(data),
-        description="Daily Housing Sentiment Index (HSI) data",
-        metadata={
-            "filters_applied": filters.dict(exclude_none=True),
-            "timestamp": datetime.now().isoformat()
-        }
+    return hsi_period_response(
+        request, dm, TimePeriod.DAILY, filters,
+        "Daily Housing Sentiment Index (HSI) data"
     )
 
 @app.get("/api/hsi/summary", response_model=SummaryResponse)
@@ -618,6 +1127,9 @@ async def get_summary(dm: DataManager = Depends(get_data_manager)):
 @app.get("/api/hsi/articles", response_model=ArticlesResponse)
 async def get_articles(
     filters: FilterParams = Depends(),
+    q: Optional[str] = Query(None, description="Full-text terms (all must match)"),
+    keyword: Optional[str] = Query(None, description="Housing keyword"),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor"),
     dm: DataManager = Depends(get_data_manager)
 ):
     """
@@ -627,9 +1139,18 @@ async def get_articles(
     - **housing_only**: Return only housing-related articles
     - **start_date**: Filter by start date
     - **end_date**: Filter by end date
-    - **limit**: Maximum number of articles
+    - **q**: Full-text term query
+    - **keyword**: Filter by housing keyword
+    - **after**: Continue after this cursor
+    - **limit**: Maximum number of articles per page
     """
-    data = dm.get_articles(filters)
+    try:
+        data, next_cursor = dm.search_articles(filters, q=q, keyword=keyword, after=after)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     
     if not data and "error" in dm.data:
         raise HTTPException(
@@ -642,6 +1163,37 @@ async def get_articles(
         data=data,
         count=len(data),
         description="Articles with sentiment analysis",
+        next_cursor=next_cursor,
+    )
+
+@app.post("/api/hsi/ingest", response_model=IngestResponse)
+async def ingest_articles(
+    payload: IngestRequest,
+    dm: DataManager = Depends(get_data_manager)
+):
+    """
+    Ingest newly scored articles.
+    
+    The daily, weekly and monthly HSI tables, the article search index
+    and the summary are updated incrementally and served from a new data
+    version immediately. The next notebook export picked up by the file
+    watcher replaces them.
+    """
+    articles = [article.dict() for article in payload.articles]
+    for article in articles:
+        article["sentiment"] = article["sentiment"].value
+    try:
+        snapshot = await asyncio.to_thread(dm.ingest_articles, articles)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+    
+    return IngestResponse(
+        success=True,
+        ingested=len(articles),
+        version=snapshot.version
     )
 
 @app.get("/api/hsi/keywords", response_model=KeywordsResponse)
@@ -687,8 +1239,13 @@ async def get_latest_hsi(dm: DataManager = Depends(get_data_manager)):
 
 @app.get("/api/hsi/timeseries")
 async def get_timeseries_data(
+    request: Request,
     period: TimePeriod = Query(TimePeriod.WEEKLY, description="Time period for aggregation"),
     metric: str = Query("hsi_mean", description="Metric to return (hsi_mean, article_count, housing_ratio)"),
+    downsample: DownsampleMode = Query(DownsampleMode.TAIL, description="tail, lttb, minmax or mean"),
+    points: int = Query(100, ge=3, le=10000, description="Target number of points"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     dm: DataManager = Depends(get_data_manager)
 ):
     """
@@ -696,36 +1253,147 @@ async def get_timeseries_data(
     
     - **period**: Time period (daily, weekly, monthly)
     - **metric**: Metric to return
+    - **downsample**: `tail` returns the last `points` points; `lttb`,
+      `minmax` and `mean` reduce the whole window to about `points` points
+    - **start_date** / **end_date**: Optional date window
     """
-    if period == TimePeriod.WEEKLY:
-        data = dm.get_weekly_hsi()
-    elif period == TimePeriod.MONTHLY:
-        data = dm.get_monthly_hsi()
-    else:
-        data = dm.get_daily_hsi()
+    snapshot = dm.snapshot
+    if not snapshot.ok:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=snapshot.data["error"]
+        )
     
-    if not data and "error" in dm.data:
+    series = snapshot.series.get(period.value)
+    if series is not None and series.column(metric) is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Metric {metric} is not numeric for the {period.value} period"
+        )
+    
+    def build() -> bytes:
+        if series is None:
+            rows, values = np.arange(0), np.array([])
+        else:
+            window = series.date_slice(start_date, end_date)
+            rows = np.arange(window.start, window.stop)
+            values = series.column(metric)[window]
+            if downsample != DownsampleMode.TAIL:
+                # Gaps cannot be charted; reduce over the finite points only
+                finite = np.isfinite(values)
+                rows, values = rows[finite], values[finite]
+            
+            if downsample == DownsampleMode.MEAN:
+                starts, values = downsample_mean(values, points)
+                rows = rows[starts]
+            else:
+                if downsample == DownsampleMode.TAIL:
+                    keep = np.arange(max(0, len(values) - points), len(values))
+                elif downsample == DownsampleMode.LTTB:
+                    times = series.dates[rows].astype(np.int64)
+                    keep = downsample_lttb(times - (times[0] if len(times) else 0), values, points)
+                else:
+                    keep = downsample_minmax(values, points)
+                rows, values = rows[keep], values[keep]
+        
+        timeseries = [
+            {
+                "date": series.records[row]["date"],
+                "value": float(value) if np.isfinite(value) else None
+            }
+            for row, value in zip(rows, values)
+        ]
+        return json.dumps({
+            "success": True,
+            "period": period.value,
+            "metric": metric,
+            "downsample": downsample.value,
+            "data": timeseries,
+            "count": len(timeseries),
+            "description": f"Timeseries data for {metric}"
+        }).encode('utf-8')
+    
+    return cached_response(request, snapshot, "/api/hsi/timeseries", {
+        "period": period.value,
+        "metric": metric,
+        "downsample": downsample.value,
+        "points": points,
+        "start_date": start_date,
+        "end_date": end_date
+    }, build)
+
+@app.get("/api/hsi/analytics")
+async def get_hsi_analytics(
+    request: Request,
+    freq: str = Query("D", description="Resample frequency, e.g. D, W, 2W, M, Q, quarterly"),
+    window: Optional[int] = Query(None, ge=2, le=10000, description="Rolling window in resampled rows"),
+    stat: RollingStat = Query(RollingStat.MEAN, description="Rolling statistic: mean, std, ewma or zscore"),
+    metric: str = Query("hsi_mean", description="Series to roll (hsi_mean, hsi_std, article_count, housing_ratio)"),
+    center: bool = Query(False, description="Center the rolling window"),
+    start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
+    dm: DataManager = Depends(get_data_manager)
+):
+    """
+    Resample the daily HSI base series to any frequency and apply a
+    rolling statistic, computed at request time from prefix sums.
+    
+    - **freq**: Pandas-style frequency; bins are labelled by period start
+    - **window**: Rolling window (rows of the resampled series)
+    - **stat**: mean, std, ewma (span=window) or zscore
+    """
+    snapshot = dm.snapshot
+    if not snapshot.ok:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=dm.data["error"]
+            detail=snapshot.data["error"]
         )
+    try:
+        normalize_freq(freq)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if metric not in ("hsi_mean", "hsi_std", "article_count", "housing_ratio"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown metric: {metric}")
+    if any(value and pd.isna(pd.to_datetime(value, errors="coerce")) for value in (start_date, end_date)):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Dates must be formatted as YYYY-MM-DD")
     
-    # Prepare timeseries data for charts
-    timeseries = []
-    for item in data[-100:]:  # Last 100 points for performance
-        timeseries.append({
-            "date": item["date"],
-            "value": item.get(metric, 0)
-        })
+    def build() -> bytes:
+        table = snapshot.daily_base().resample(freq, start_date, end_date)
+        values = rolling(table[metric], window, stat.value, center) if window else None
+        
+        def clean(value) -> Optional[float]:
+            return float(value) if np.isfinite(value) else None
+        
+        data = [
+            {
+                "date": str(table["date"][i]),
+                "hsi_mean": clean(table["hsi_mean"][i]),
+                "hsi_std": clean(table["hsi_std"][i]),
+                "article_count": int(table["article_count"][i]),
+                "housing_ratio": clean(table["housing_ratio"][i]),
+                **({"value": clean(values[i])} if values is not None else {})
+            }
+            for i in range(len(table["date"]))
+        ]
+        return json.dumps({
+            "success": True,
+            "freq": freq,
+            "metric": metric,
+            "rolling": {"window": window, "stat": stat.value, "center": center} if window else None,
+            "data": data,
+            "count": len(data),
+            "description": f"HSI resampled to {freq}" + (f" with rolling {stat.value}({window})" if window else "")
+        }).encode('utf-8')
     
-    return {
-        "success": True,
-        "period": period,
+    return cached_response(request, snapshot, "/api/hsi/analytics", {
+        "freq": freq,
+        "window": window,
+        "stat": stat.value,
         "metric": metric,
-        "data": timeseries,
-        "count": len(timeseries),
-        "description": f"Timeseries data for {metric}"
-    }
+        "center": center,
+        "start_date": start_date,
+        "end_date": end_date
+    }, build)
 
 # ==============================
 # HEALTH CHECK & SYSTEM ENDPOINTS
@@ -747,13 +1415,22 @@ async def system_info():
     import sys
     import platform
     
+    snapshot = data_manager.snapshot
     return {
         "python_version": sys.version,
         "platform": platform.platform(),
         "api_version": "2.0.0",
         "uptime": "N/A",  # Would need to track start time
         "memory_usage": "N/A",
-        "data_loaded": "error" not in data_manager.data,
+        "data_loaded": snapshot.ok,
+        "data_snapshot": {
+            "version": snapshot.version,
+            "generation": snapshot.generation,
+            "loaded_at": snapshot.loaded_at.isoformat(),
+            "load_duration_ms": round(snapshot.load_duration * 1000, 3),
+            "reload_interval_s": DATA_RELOAD_INTERVAL
+        },
+        "response_cache": response_cache.stats(),
         "timestamp": datetime.now().isoformat()
     }
 
@@ -761,27 +1438,135 @@ async def system_info():
 # FILE DOWNLOAD ENDPOINTS
 # ==============================
 
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+DOWNLOAD_FORMATS = {
+    DownloadEncoding.IDENTITY: ("application/json", ".json"),
+    DownloadEncoding.GZIP: ("application/gzip", ".json.gz"),
+    DownloadEncoding.ZSTD: ("application/zstd", ".json.zst"),
+}
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single-range `bytes=` header into an inclusive (start, end).
+
+    Returns None when the whole body should be sent (no header, or a
+    multi-range request) and raises ValueError when unsatisfiable.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0:
+                raise ValueError
+            start, end = max(0, size - length), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        raise ValueError(f"Invalid range: {header}")
+    if start >= size or start > end:
+        raise ValueError(f"Unsatisfiable range: {header}")
+    return start, end
+
+def iter_bytes(body: bytes, start: int, end: int):
+    """Yield body[start:end + 1] in fixed-size chunks without copying it whole"""
+    view = memoryview(body)
+    for offset in range(start, end + 1, DOWNLOAD_CHUNK_SIZE):
+        yield bytes(view[offset:min(offset + DOWNLOAD_CHUNK_SIZE, end + 1)])
+
+def iter_ndjson(records: List[Dict]):
+    """Yield one JSON document per line, one record at a time"""
+    for record in records:
+        yield json.dumps(record, default=str) + "\n"
+
 @app.get("/download/hsi-data")
-async def download_hsi_data():
+async def download_hsi_data(
+    request: Request,
+    encoding: DownloadEncoding = Query(DownloadEncoding.IDENTITY, description="identity, gzip or zstd")
+):
     """
     Download processed HSI data as JSON.
+    
+    The export is encoded once per data version and served with an ETag;
+    `If-None-Match` and single `Range` requests are supported.
     """
-    if "error" in data_manager.data:
+    snapshot = data_manager.snapshot
+    if not snapshot.ok:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Data not available for download"
         )
+    if encoding == DownloadEncoding.ZSTD and zstandard is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="zstd compression is not available on this server"
+        )
+    
+    etag = f'"{snapshot.version}-{encoding.value}"'
+    media_type, suffix = DOWNLOAD_FORMATS[encoding]
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="hsi_data_{snapshot.version}{suffix}"'
+    }
     
-    # Create a temporary file for download
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
     
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-        json.dump(data_manager.data, tmp, indent=2, default=str)
-        tmp_path = tmp.name
+    body = await asyncio.to_thread(snapshot.encoded, encoding)
+    size = len(body)
     
-    return FileResponse(
-        path=tmp_path,
-        filename=f"hsi_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-        media_type="application/json"
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except ValueError:
+        return Response(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={**headers, "Content-Range": f"bytes */{size}"}
+        )
+    
+    if byte_range is None:
+        start, end = 0, size - 1
+        status_code = status.HTTP_200_OK
+    else:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        iter_bytes(body, start, end),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
+
+@app.get("/download/hsi-data/{period}.ndjson")
+async def download_hsi_ndjson(period: TimePeriod):
+    """
+    Stream one HSI period as newline-delimited JSON, one data point per line.
+    """
+    snapshot = data_manager.snapshot
+    series = snapshot.series.get(period.value)
+    if series is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Data not available for download"
+        )
+    
+    return StreamingResponse(
+        iter_ndjson(series.records),
+        media_type="application/x-ndjson",
+        headers={
+            "ETag": f'"{snapshot.version}-{period.value}-ndjson"',
+            "Content-Disposition": f'attachment; filename="hsi_{period.value}_{snapshot.version}.ndjson"'
+        }
     )
 
 # ==============================
@@ -822,6 +1607,16 @@ async def startup_event():
     logger.info(f"📊 Data file: {data_manager.data_file}")
     logger.info("✅ API Documentation available at /docs")
     logger.info("✅ Interactive UI available at /")
+    if DATA_RELOAD_INTERVAL > 0:
+        app.state.reload_task = asyncio.create_task(data_manager.watch(DATA_RELOAD_INTERVAL))
+        logger.info(f"🔄 Watching data file every {DATA_RELOAD_INTERVAL:g}s")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the data file watcher"""
+    task = getattr(app.state, "reload_task", None)
+    if task:
+        task.cancel()
 
 # ==============================
 # MAIN ENTRY POINT
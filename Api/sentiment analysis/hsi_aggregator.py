@@ -0,0 +1,274 @@
+# ==============================
+# HOUSING SENTIMENT INDEX
+# Incremental aggregation
+# ==============================
+#
+# Keeps the daily, weekly and monthly HSI tables produced by
+# housing_sentiment_analysis.ipynb up to date as new scored articles
+# arrive, without re-running the notebook over the full CSV.
+#
+# Every period bucket holds Welford running accumulators, so ingesting
+# an article touches one bucket per period plus the few rolling-average
+# rows whose window contains it.
+
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+PERIODS = ("daily", "weekly", "monthly")
+
+# Same centered 4-row window as weekly_hsi['hsi_rolling'] in the notebook
+ROLLING_WINDOW = 4
+
+
+def period_start(timestamp: datetime, period: str) -> datetime:
+    """Start of the daily / weekly (Monday) / monthly bucket holding timestamp"""
+    day = datetime(timestamp.year, timestamp.month, timestamp.day)
+    if period == "daily":
+        return day
+    if period == "weekly":
+        return day - timedelta(days=day.weekday())
+    if period == "monthly":
+        return day.replace(day=1)
+    raise ValueError(f"Unknown period: {period}")
+
+
+def parse_date(value) -> datetime:
+    """Parse an article date as exported by the notebook (or any pandas-readable date)"""
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return pd.Timestamp(value).to_pydatetime()
+
+
+class RunningStats:
+    """Welford accumulator for one bucket's sentiment scores"""
+
+    __slots__ = ("count", "mean", "m2", "housing")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0, housing: Optional[int] = 0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        # None when seeded from a table that did not record housing articles
+        self.housing = housing
+
+    def add(self, score: float, contains_housing: bool):
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        if self.housing is not None and contains_housing:
+            self.housing += 1
+
+    @property
+    def std(self) -> Optional[float]:
+        """Sample standard deviation (ddof=1), like pandas"""
+        if self.count < 2:
+            return None
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+    @property
+    def housing_ratio(self) -> Optional[float]:
+        if self.housing is None or not self.count:
+            return None
+        return self.housing / self.count
+
+
+class PeriodTable:
+    """Running HSI table for one period, ordered by bucket start"""
+
+    def __init__(self, period: str, window: int = ROLLING_WINDOW):
+        self.period = period
+        self.window = window
+        self.keys: List[datetime] = []
+        self.stats: Dict[datetime, RunningStats] = {}
+        self.rolling: Dict[datetime, Optional[float]] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def seed(self, records: List[Dict]):
+        """Rebuild accumulators from an exported table (date, hsi_mean, hsi_std, article_count)"""
+        for record in records:
+            count = int(record.get("article_count") or 0)
+            if not count:
+                continue
+            std = record.get("hsi_std")
+            std = 0.0 if std is None or (isinstance(std, float) and math.isnan(std)) else float(std)
+            housing = record.get("housing_articles")
+            key = period_start(parse_date(record["date"]), self.period)
+            self._insert(key, RunningStats(
+                count=count,
+                mean=float(record["hsi_mean"]),
+                m2=std * std * (count - 1),
+                housing=int(housing) if housing is not None else None
+            ))
+        for index in range(len(self.keys)):
+            self._update_rolling(index)
+
+    def seed_articles(self, articles: Iterable[Dict]):
+        """Rebuild accumulators from raw scored articles (date, sentiment_score, contains_housing)"""
+        for article in articles:
+            score = article.get("sentiment_score")
+            if score is None or not article.get("date"):
+                continue
+            key = period_start(parse_date(article["date"]), self.period)
+            stats = self.stats.get(key)
+            if stats is None:
+                stats = self._insert(key, RunningStats())
+            stats.add(float(score), bool(article.get("contains_housing", False)))
+        for index in range(len(self.keys)):
+            self._update_rolling(index)
+
+    def add(self, timestamp: datetime, score: float, contains_housing: bool):
+        key = period_start(timestamp, self.period)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self._insert(key, RunningStats())
+        stats.add(score, contains_housing)
+
+        # Only rows whose centered window contains this bucket change
+        index = bisect_left(self.keys, key)
+        half = self.window // 2
+        for row in range(index - (self.window - half - 1), index + half + 1):
+            self._update_rolling(row)
+
+    def _insert(self, key: datetime, stats: RunningStats) -> RunningStats:
+        if key not in self.stats:
+            # New buckets almost always arrive at the end; bisect keeps gaps ordered
+            if not self.keys or key > self.keys[-1]:
+                self.keys.append(key)
+            else:
+                self.keys.insert(bisect_left(self.keys, key), key)
+        self.stats[key] = stats
+        return stats
+
+    def _update_rolling(self, row: int):
+        """Centered rolling mean of hsi_mean over rows [row - window//2, row + window - window//2 - 1]"""
+        if row < 0 or row >= len(self.keys):
+            return
+        lo = row - self.window // 2
+        hi = lo + self.window
+        if lo < 0 or hi > len(self.keys):
+            self.rolling[self.keys[row]] = None
+            return
+        self.rolling[self.keys[row]] = sum(self.stats[key].mean for key in self.keys[lo:hi]) / self.window
+
+    def records(self) -> List[Dict]:
+        """Table rows in the notebook's export format"""
+        rows = []
+        for key in self.keys:
+            stats = self.stats[key]
+            rows.append({
+                "date": str(key),
+                "hsi_mean": stats.mean,
+                "hsi_std": stats.std,
+                "hsi_rolling": self.rolling.get(key),
+                "article_count": stats.count,
+                "housing_articles": stats.housing,
+                "housing_ratio": stats.housing_ratio
+            })
+        return rows
+
+
+class HSIAggregator:
+    """Daily, weekly and monthly HSI tables updated one article at a time"""
+
+    def __init__(self):
+        self.tables = {period: PeriodTable(period) for period in PERIODS}
+        self.ingested = 0
+
+    @classmethod
+    def from_tables(cls, data: Dict) -> "HSIAggregator":
+        """Seed from the tables in hsi_processed_data.json.
+
+        Periods exported as aggregates (rows carrying hsi_mean) are seeded
+        from their accumulators. The notebook's `daily` export holds raw
+        scored articles instead; those are folded into that period's table
+        so the existing history survives the first ingest.
+        """
+        aggregator = cls()
+        for period in PERIODS:
+            records = data.get(period) or []
+            table = aggregator.tables[period]
+            if records and all("hsi_mean" in record for record in records):
+                table.seed(records)
+            elif records:
+                table.seed_articles(records)
+        return aggregator
+
+    @classmethod
+    def from_articles(cls, articles: Iterable[Dict]) -> "HSIAggregator":
+        """Build all tables in one pass over scored articles (e.g. processed_housing_sentiment.csv rows)"""
+        aggregator = cls()
+        aggregator.ingest_many(articles)
+        return aggregator
+
+    def ingest(self, article: Dict):
+        """Add one scored article (date, sentiment_score, contains_housing)"""
+        timestamp = parse_date(article["date"])
+        score = float(article["sentiment_score"])
+        contains_housing = bool(article.get("contains_housing", False))
+        for table in self.tables.values():
+            table.add(timestamp, score, contains_housing)
+        self.ingested += 1
+
+    def ingest_many(self, articles: Iterable[Dict]) -> int:
+        count = 0
+        for article in articles:
+            self.ingest(article)
+            count += 1
+        return count
+
+    def records(self, period: str) -> List[Dict]:
+        return self.tables[period].records()
+
+
+def update_summary(summary: Dict, articles: List[Dict]) -> Dict:
+    """Notebook summary with newly scored articles folded in.
+
+    Counts, sentiment means and the date range are updated from their
+    previous values; counts keep the type the notebook exported them with.
+    """
+    def count(name: str, added: int):
+        value = summary.get(name, 0)
+        total = int(value or 0) + added
+        return str(total) if isinstance(value, str) else total
+
+    def mean(name: str, before: int, scores: List[float]):
+        previous = summary.get(name)
+        if not scores:
+            return previous
+        if previous is None or not before:
+            return sum(scores) / len(scores)
+        return (float(previous) * before + sum(scores)) / (before + len(scores))
+
+    total = int(summary.get("total_articles", 0) or 0)
+    housing = int(summary.get("housing_related_count", 0) or 0)
+    scores = [float(article["sentiment_score"]) for article in articles]
+    housing_scores = [float(a["sentiment_score"]) for a in articles if a.get("contains_housing")]
+    other_scores = [float(a["sentiment_score"]) for a in articles if not a.get("contains_housing")]
+    sentiments = [str(article.get("sentiment")) for article in articles]
+
+    updated = dict(summary)
+    updated["total_articles"] = count("total_articles", len(articles))
+    for sentiment in ("positive", "negative", "neutral"):
+        updated[f"{sentiment}_count"] = count(f"{sentiment}_count", sentiments.count(sentiment))
+    updated["housing_related_count"] = count("housing_related_count", len(housing_scores))
+    updated["overall_sentiment"] = mean("overall_sentiment", total, scores)
+    updated["housing_sentiment"] = mean("housing_sentiment", housing, housing_scores)
+    updated["non_housing_sentiment"] = mean("non_housing_sentiment", total - housing, other_scores)
+
+    days = sorted(parse_date(article["date"]).strftime("%Y-%m-%d") for article in articles)
+    date_range = dict(summary.get("date_range") or {})
+    if days:
+        date_range["start"] = min(filter(None, [date_range.get("start"), days[0]]))
+        date_range["end"] = max(filter(None, [date_range.get("end"), days[-1]]))
+    updated["date_range"] = date_range
+    return updated
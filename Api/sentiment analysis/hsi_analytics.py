@@ -0,0 +1,188 @@
+# ==============================
+# HOUSING SENTIMENT INDEX
+# Request-time analytics
+# ==============================
+#
+# Resampling and rolling statistics computed from a daily base series.
+# The base keeps prefix sums of scores, squared scores, article counts
+# and housing articles, so any bin is a difference of two prefix values
+# and a query costs O(output) instead of O(history).
+
+import re
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+# Period-start aliases so bins are labelled like the notebook's tables
+# (weeks start on Monday, months/quarters/years on their first day)
+FREQ_ALIASES = {
+    "D": "D", "DAILY": "D",
+    "W": "W-MON", "WEEKLY": "W-MON",
+    "M": "MS", "ME": "MS", "MONTHLY": "MS",
+    "Q": "QS", "QE": "QS", "QUARTERLY": "QS",
+    "Y": "YS", "YE": "YS", "A": "YS", "YEARLY": "YS",
+}
+
+ROLLING_STATS = ("mean", "std", "ewma", "zscore")
+
+
+def normalize_freq(freq: str):
+    """Turn '2W', 'Q', 'quarterly', 'MS'... into a pandas offset; raises ValueError"""
+    match = re.fullmatch(r"\s*(\d*)\s*([A-Za-z-]+)\s*", freq or "")
+    if not match:
+        raise ValueError(f"Invalid frequency: {freq}")
+    multiple, base = match.groups()
+    base = FREQ_ALIASES.get(base.upper(), base)
+    try:
+        return to_offset(f"{multiple}{base}")
+    except Exception:
+        raise ValueError(f"Invalid frequency: {freq}")
+
+
+class DailyBase:
+    """Per-day sentiment sums with prefix arrays for O(1) range aggregates"""
+
+    def __init__(self, days: np.ndarray, sums: np.ndarray, sumsq: np.ndarray,
+                 counts: np.ndarray, housing: Optional[np.ndarray] = None):
+        order = np.argsort(days, kind="stable")
+        self.days = days[order].astype("datetime64[D]")
+
+        def prefix(values: np.ndarray) -> np.ndarray:
+            return np.concatenate([[0.0], np.cumsum(values[order], dtype=np.float64)])
+
+        self.sum_prefix = prefix(sums)
+        self.sumsq_prefix = prefix(sumsq)
+        self.count_prefix = prefix(counts)
+        self.housing_prefix = prefix(housing) if housing is not None else None
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    @classmethod
+    def from_table(cls, records: List[Dict]) -> "DailyBase":
+        """From an aggregated daily table (hsi_mean, hsi_std, article_count[, housing_articles])"""
+        records = [r for r in records if r.get("article_count")]
+        counts = np.array([r["article_count"] for r in records], dtype=np.float64)
+        means = np.array([r["hsi_mean"] for r in records], dtype=np.float64)
+        stds = np.array([r.get("hsi_std") if r.get("hsi_std") is not None else np.nan for r in records], dtype=np.float64)
+        stds = np.nan_to_num(stds)
+        housing = None
+        if records and all(r.get("housing_articles") is not None for r in records):
+            housing = np.array([r["housing_articles"] for r in records], dtype=np.float64)
+        return cls(
+            days=pd.to_datetime([r["date"] for r in records], format="mixed").values.astype("datetime64[D]"),
+            sums=means * counts,
+            sumsq=stds ** 2 * np.maximum(counts - 1, 0) + counts * means ** 2,
+            counts=counts,
+            housing=housing
+        )
+
+    @classmethod
+    def from_articles(cls, records: List[Dict]) -> "DailyBase":
+        """From scored articles (date, sentiment_score, contains_housing), grouped by day"""
+        days = pd.to_datetime([r["date"] for r in records], format="mixed").values.astype("datetime64[D]")
+        scores = np.array([r.get("sentiment_score", 0) for r in records], dtype=np.float64)
+        housing = np.array([bool(r.get("contains_housing")) for r in records], dtype=np.float64)
+        unique_days, inverse = np.unique(days, return_inverse=True)
+        size = len(unique_days)
+        return cls(
+            days=unique_days,
+            sums=np.bincount(inverse, weights=scores, minlength=size),
+            sumsq=np.bincount(inverse, weights=scores ** 2, minlength=size),
+            counts=np.bincount(inverse, minlength=size).astype(np.float64),
+            housing=np.bincount(inverse, weights=housing, minlength=size)
+        )
+
+    def resample(self, freq: str, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """Aggregate into period-start bins; empty bins are dropped like a groupby"""
+        offset = normalize_freq(freq)
+        empty = {"date": np.array([], dtype="datetime64[D]"), "hsi_mean": np.array([]),
+                 "hsi_std": np.array([]), "article_count": np.array([]), "housing_ratio": np.array([])}
+        if not len(self.days):
+            return empty
+
+        first = pd.Timestamp(self.days[0])
+        last = pd.Timestamp(self.days[-1])
+        if start_date:
+            first = max(first, pd.Timestamp(start_date).normalize())
+        if end_date:
+            last = min(last, pd.Timestamp(end_date).normalize())
+        if first > last:
+            return empty
+
+        anchor = offset.rollback(first)
+        edges = pd.date_range(anchor, last, freq=offset)
+        edges = edges.append(pd.DatetimeIndex([edges[-1] + offset]))
+        bounds = np.searchsorted(self.days, edges.values.astype("datetime64[D]"), side="left")
+        # Clip the outer bins to the requested window
+        bounds[0] = np.searchsorted(self.days, np.datetime64(first.date(), "D"), side="left")
+        bounds[-1] = np.searchsorted(self.days, np.datetime64(last.date(), "D"), side="right")
+        bounds = np.maximum.accumulate(bounds)
+
+        lo, hi = bounds[:-1], bounds[1:]
+        counts = self.count_prefix[hi] - self.count_prefix[lo]
+        keep = counts > 0
+        lo, hi, counts = lo[keep], hi[keep], counts[keep]
+        sums = self.sum_prefix[hi] - self.sum_prefix[lo]
+        sumsq = self.sumsq_prefix[hi] - self.sumsq_prefix[lo]
+
+        means = sums / counts
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = np.where(counts > 1, (sumsq - counts * means ** 2) / (counts - 1), np.nan)
+        housing_ratio = (
+            (self.housing_prefix[hi] - self.housing_prefix[lo]) / counts
+            if self.housing_prefix is not None else np.full(len(counts), np.nan)
+        )
+        return {
+            "date": edges.values[:-1][keep].astype("datetime64[D]"),
+            "hsi_mean": means,
+            "hsi_std": np.sqrt(np.maximum(variance, 0)),
+            "article_count": counts,
+            "housing_ratio": housing_ratio
+        }
+
+
+def rolling(values: np.ndarray, window: int, stat: str = "mean", center: bool = False) -> np.ndarray:
+    """Rolling mean / std (ddof=1) / z-score over rows via prefix sums, or EWMA with span=window.
+
+    Rows without a full window are NaN, like pandas' default min_periods.
+    """
+    if stat not in ROLLING_STATS:
+        raise ValueError(f"Unknown rolling statistic: {stat}")
+    n = len(values)
+    if stat == "ewma":
+        result = pd.Series(values).ewm(span=window).mean().to_numpy()
+        return result
+
+    out_mean = np.full(n, np.nan)
+    out_std = np.full(n, np.nan)
+    if window <= n:
+        values = np.asarray(values, dtype=np.float64)
+        # NaN / inf rows are zeroed for the sums and mask only the windows holding them
+        bad = ~np.isfinite(values)
+        # Centre on the series mean so sumsq - n*mean^2 does not cancel
+        offset = values[~bad].mean() if not bad.all() else 0.0
+        centred = np.where(bad, 0.0, values - offset)
+        sums = np.concatenate([[0.0], np.cumsum(centred)])
+        sumsq = np.concatenate([[0.0], np.cumsum(centred ** 2)])
+        bad_counts = np.concatenate([[0], np.cumsum(bad)])
+        window_sums = sums[window:] - sums[:-window]
+        window_sumsq = sumsq[window:] - sumsq[:-window]
+        complete = (bad_counts[window:] - bad_counts[:-window]) == 0
+        centred_means = window_sums / window
+        means = np.where(complete, centred_means + offset, np.nan)
+        # Windows end at row i; centering shifts labels like pandas' center=True
+        shift = window // 2 if center else window - 1
+        out_mean[shift:shift + len(means)] = means
+        if window > 1:
+            variance = np.maximum((window_sumsq - window * centred_means ** 2) / (window - 1), 0)
+            out_std[shift:shift + len(means)] = np.where(complete, np.sqrt(variance), np.nan)
+
+    if stat == "mean":
+        return out_mean
+    if stat == "std":
+        return out_std
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(out_std > 0, (values - out_mean) / out_std, np.nan)
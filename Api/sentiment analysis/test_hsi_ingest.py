@@ -0,0 +1,77 @@
+import importlib
+import shutil
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+DATA_FILE = Path(__file__).resolve().parents[2] / "Notebooks" / "hsi_processed_data.json"
+
+ARTICLE = {
+    "date": "2025-06-02 00:00:00",
+    "sentiment": "positive",
+    "sentiment_score": 1.0,
+    "contains_housing": True,
+    "text": "House prices rose again this month.",
+    "housing_keywords": ["house"],
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # app.py creates ./static and loads ./hsi_processed_data.json at import
+    shutil.copy(DATA_FILE, tmp_path / "hsi_processed_data.json")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("HSI_RELOAD_INTERVAL", "0")
+    app_module = importlib.import_module("app")
+    app_module.data_manager.data_file = str(tmp_path / "hsi_processed_data.json")
+    app_module.data_manager.load_data()
+    return TestClient(app_module.app), app_module.data_manager
+
+
+def ndjson_rows(client, period):
+    response = client.get(f"/download/hsi-data/{period}.ndjson")
+    assert response.status_code == 200
+    return [line for line in response.text.splitlines() if line]
+
+
+def test_ingest_keeps_existing_history(client):
+    client, manager = client
+    raw_daily = manager.data["daily"]
+    days_before = {row["date"][:10] for row in raw_daily}
+    months_before = client.get("/api/hsi/analytics", params={"freq": "M"}).json()["data"]
+    weekly_before = len(ndjson_rows(client, "weekly"))
+    monthly_before = len(ndjson_rows(client, "monthly"))
+
+    response = client.post("/api/hsi/ingest", json={"articles": [ARTICLE]})
+    assert response.status_code == 200
+
+    daily_after = ndjson_rows(client, "daily")
+    assert len(daily_after) == len(days_before) + 1
+    assert sum(row["article_count"] for row in manager.data["daily"]) == len(raw_daily) + 1
+
+    months_after = client.get("/api/hsi/analytics", params={"freq": "M"}).json()["data"]
+    assert len(months_after) >= len(months_before) + 1
+    assert sum(row["article_count"] for row in months_after) == sum(row["article_count"] for row in months_before) + 1
+    assert months_after[:len(months_before)] == months_before
+
+    assert len(ndjson_rows(client, "weekly")) == weekly_before + 1
+    assert len(ndjson_rows(client, "monthly")) == monthly_before + 1
+
+
+def test_ingest_updates_summary_and_articles(client):
+    client, manager = client
+    summary_before = client.get("/api/hsi/summary").json()["data"]
+
+    response = client.post("/api/hsi/ingest", json={"articles": [ARTICLE]})
+    assert response.status_code == 200
+
+    summary = client.get("/api/hsi/summary").json()["data"]
+    assert int(summary["total_articles"]) == int(summary_before["total_articles"]) + 1
+    assert int(summary["positive_count"]) == int(summary_before["positive_count"]) + 1
+    assert int(summary["housing_related_count"]) == int(summary_before["housing_related_count"]) + 1
+    assert summary["date_range"] == {"start": summary_before["date_range"]["start"], "end": "2025-06-02"}
+    assert summary["overall_sentiment"] > summary_before["overall_sentiment"]
+
+    found = client.get("/api/hsi/articles", params={"q": "house prices rose"}).json()["data"]
+    assert [article["text"] for article in found] == [ARTICLE["text"]]
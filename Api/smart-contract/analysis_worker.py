@@ -0,0 +1,484 @@
+"""Long-lived static-analysis worker: one compilation per audit, shared by the syntax check and Slither.
+
+Run as `python analysis_worker.py`, the worker imports crytic-compile and
+Slither once, then serves newline-delimited JSON requests on stdin:
+{"id": ..., "code": ..., "timeout": ...} -> {"id": ..., "syntax": {...}, "slither": {...}}.
+Multi-file projects are sent as {"id": ..., "project": {"root", "files",
+"remappings"}} and compiled through solc's standard-JSON interface.
+The source is compiled once with crytic-compile; its compiler messages
+become the syntax result and the same compilation is handed to Slither.
+
+The Flask app talks to a small pool of these processes through
+AnalysisWorkerPool, so requests stop paying interpreter start-up and a
+second solc run; the ASGI app uses AsyncAnalysisWorkerPool, which drives
+the same processes with asyncio subprocess pipes.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+try:
+    from crytic_compile import CryticCompile
+    from crytic_compile.platform.exceptions import InvalidCompilation
+    from crytic_compile.platform.solc_standard_json import SolcStandardJson
+except Exception:
+    CryticCompile = None
+    InvalidCompilation = Exception
+
+try:
+    from slither import Slither
+    from slither.detectors import all_detectors
+    from slither.detectors.abstract_detector import AbstractDetector
+except Exception:
+    Slither = None
+
+
+def parse_solc_messages(stderr):
+    errors = []
+    warnings = []
+    for line in (stderr or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        entry = {"type": "CompilerMessage", "message": line, "source_location": None}
+        lower = line.lower()
+        if "error" in lower:
+            entry["type"] = "Error"
+            errors.append(entry)
+        elif "warning" in lower:
+            entry["type"] = "Warning"
+            warnings.append(entry)
+        else:
+            warnings.append(entry)
+    return errors, warnings
+
+
+def syntax_error(kind, message):
+    return {"valid": False, "errors": [{"type": kind, "message": message, "source_location": None}], "warnings": []}
+
+
+def syntax_from_messages(returncode, stderr):
+    errors, warnings = parse_solc_messages(stderr)
+    if returncode != 0:
+        return {
+            "valid": False,
+            "errors": errors if errors else [{"type": "CompilationFailed", "message": stderr or "Unknown compiler error", "source_location": None}],
+            "warnings": warnings,
+        }
+    return {"valid": True, "errors": [], "warnings": warnings}
+
+
+# -------------------------
+# Worker process side
+# -------------------------
+class _CaptureHandler(logging.Handler):
+    """Collects the compiler output crytic-compile logs while compiling"""
+
+    def __init__(self):
+        super().__init__(level=logging.DEBUG)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def _compiler_output(messages):
+    # crytic-compile prefixes solc's stderr with "Compilation warnings/errors on <file>:"
+    lines = []
+    for message in messages:
+        lines.extend(line for line in message.splitlines() if not line.startswith("Compilation warnings/errors on"))
+    return "\n".join(lines)
+
+
+def solc_timed_out(timeout):
+    return None, syntax_error("Timeout", f"Solidity compiler (solc) did not finish within {timeout:g}s")
+
+
+def compile_source(path, timeout=None):
+    """Compile once; returns (compilation or None, syntax result)"""
+    if CryticCompile is None:
+        # No crytic-compile in this environment: plain solc check, nothing to share with Slither
+        try:
+            result = subprocess.run(["solc", "--ast-json", path], capture_output=True, text=True, timeout=timeout)
+        except FileNotFoundError:
+            return None, syntax_error(
+                "EnvironmentError",
+                "Solidity compiler (solc) not found in PATH. Install solc to enable full grammar / type analysis.",
+            )
+        except subprocess.TimeoutExpired:
+            return solc_timed_out(timeout)
+        return None, syntax_from_messages(result.returncode, result.stderr or "")
+
+    capture = _CaptureHandler()
+    crytic_logger = logging.getLogger("CryticCompile")
+    crytic_logger.setLevel(logging.INFO)
+    crytic_logger.addHandler(capture)
+    try:
+        compilation = CryticCompile(path)
+    except InvalidCompilation as e:
+        return None, syntax_from_messages(1, _compiler_output(capture.messages + [str(e)]))
+    except FileNotFoundError:
+        return None, syntax_error(
+            "EnvironmentError",
+            "Solidity compiler (solc) not found in PATH. Install solc to enable full grammar / type analysis.",
+        )
+    finally:
+        crytic_logger.removeHandler(capture)
+    return compilation, syntax_from_messages(0, _compiler_output(capture.messages))
+
+
+def standard_json_input(files, remappings):
+    return {
+        "language": "Solidity",
+        "sources": {path: {"urls": [path]} for path in files},
+        "settings": {"remappings": remappings, "outputSelection": {"*": {"": ["ast"]}}},
+    }
+
+
+def syntax_from_standard_json(output):
+    errors, warnings = [], []
+    for error in output.get("errors", []):
+        location = error.get("sourceLocation")
+        entry = {
+            "type": "Error" if error.get("severity") == "error" else "Warning",
+            "message": (error.get("formattedMessage") or error.get("message") or "").strip(),
+            "source_location": location,
+        }
+        (errors if error.get("severity") == "error" else warnings).append(entry)
+    return {"valid": not errors, "errors": errors, "warnings": warnings}
+
+
+def compile_project(root, files, remappings, timeout=None):
+    """Compile a materialized multi-file project once (standard JSON, sources read from `root`)"""
+    if CryticCompile is None:
+        try:
+            result = subprocess.run(
+                ["solc", "--standard-json", "--base-path", ".", "--allow-paths", "."],
+                input=json.dumps(standard_json_input(files, remappings)),
+                capture_output=True,
+                text=True,
+                cwd=root,
+                timeout=timeout,
+            )
+        except FileNotFoundError:
+            return None, syntax_error(
+                "EnvironmentError",
+                "Solidity compiler (solc) not found in PATH. Install solc to enable full grammar / type analysis.",
+            )
+        except subprocess.TimeoutExpired:
+            return solc_timed_out(timeout)
+        try:
+            return None, syntax_from_standard_json(json.loads(result.stdout or "{}"))
+        except ValueError:
+            return None, syntax_from_messages(result.returncode or 1, result.stderr or result.stdout)
+
+    platform = SolcStandardJson(standard_json_input([], []))
+    for path in files:
+        platform.add_source_file(path)
+    for remapping in remappings:
+        platform.add_remapping(remapping)
+    capture = _CaptureHandler()
+    crytic_logger = logging.getLogger("CryticCompile")
+    crytic_logger.setLevel(logging.INFO)
+    crytic_logger.addHandler(capture)
+    try:
+        compilation = CryticCompile(platform, solc_working_dir=root)
+    except InvalidCompilation as e:
+        return None, syntax_from_messages(1, _compiler_output(capture.messages + [str(e)]))
+    except FileNotFoundError:
+        return None, syntax_error(
+            "EnvironmentError",
+            "Solidity compiler (solc) not found in PATH. Install solc to enable full grammar / type analysis.",
+        )
+    finally:
+        crytic_logger.removeHandler(capture)
+    return compilation, syntax_from_messages(0, _compiler_output(capture.messages))
+
+
+def run_slither(compilation):
+    """Run every registered detector on an existing compilation; output shaped like `slither --json -`"""
+    if Slither is None:
+        return {"error": "Slither not installed in the analysis worker"}
+    if compilation is None:
+        return {"error": "Compilation failed; Slither analysis skipped"}
+    slither = Slither(compilation)
+    for detector in vars(all_detectors).values():
+        if isinstance(detector, type) and issubclass(detector, AbstractDetector):
+            slither.register_detector(detector)
+    detectors = [result for results in slither.run_detectors() for result in results]
+    return {"success": True, "results": {"detectors": detectors}}
+
+
+def _analyze_compilation(compilation, syntax):
+    try:
+        slither = run_slither(compilation)
+    except Exception as e:
+        slither = {"error": str(e)}
+    return {"syntax": syntax, "slither": slither}
+
+
+def analyze(code, timeout=None):
+    workdir = tempfile.mkdtemp(prefix="audit-")
+    try:
+        path = os.path.join(workdir, "Contract.sol")
+        with open(path, "w") as f:
+            f.write(code)
+        return _analyze_compilation(*compile_source(path, timeout))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def analyze_project(project, timeout=None):
+    """Same as analyze() for a project directory: {"root", "files", "remappings"}"""
+    return _analyze_compilation(*compile_project(project["root"], project["files"], project.get("remappings") or [], timeout))
+
+
+def serve(stdin=sys.stdin, stdout=sys.stdout):
+    for line in stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        try:
+            timeout = request.get("timeout")
+            if "project" in request:
+                response = analyze_project(request["project"], timeout)
+            else:
+                response = analyze(request["code"], timeout)
+        except Exception as e:
+            response = {"syntax": syntax_error("UnknownError", str(e)), "slither": {"error": str(e)}}
+        response["id"] = request.get("id")
+        stdout.write(json.dumps(response, default=str) + "\n")
+        stdout.flush()
+
+
+# -------------------------
+# Flask app side
+# -------------------------
+def kill_group(pid):
+    """SIGKILL a worker started in its own session, with any solc it spawned"""
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class AnalysisWorker:
+    """One worker subprocess; requests are serialized by the pool"""
+
+    def __init__(self):
+        self.process = None
+        self.responses = None
+        self.sequence = 0
+
+    def _start(self):
+        # The worker's logs go to the inherited stderr; stdout carries only responses.
+        # Its own session, so stop() also kills the solc processes it started
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            start_new_session=True,
+        )
+        self.responses = queue.Queue()
+        threading.Thread(target=self._read, args=(self.process, self.responses), daemon=True).start()
+
+    @staticmethod
+    def _read(process, responses):
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)
+
+    def stop(self):
+        if self.process is not None:
+            kill_group(self.process.pid)
+            self.process.wait()
+        self.process = None
+
+    def analyze(self, request, deadline):
+        """Send one request and wait for its answer until `deadline` (time.monotonic())"""
+        if self.process is None or self.process.poll() is not None:
+            self._start()
+        self.sequence += 1
+        timeout = max(deadline - time.monotonic(), 0)
+        self.process.stdin.write(json.dumps(dict(request, id=self.sequence, timeout=timeout)) + "\n")
+        self.process.stdin.flush()
+        while True:
+            line = self.responses.get(timeout=max(deadline - time.monotonic(), 0))
+            if line is None:
+                self.process = None
+                raise RuntimeError("Analysis worker exited unexpectedly")
+            response = json.loads(line)
+            # Answers to requests abandoned after a timeout are skipped
+            if response.get("id") == self.sequence:
+                return response
+
+
+class AnalysisWorkerPool:
+    """Bounded pool of warm analysis workers, started lazily"""
+
+    def __init__(self, size=2):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        for _ in range(size):
+            self._idle.put(AnalysisWorker())
+
+    def analyze(self, code, timeout=30):
+        """Returns {"syntax": ..., "slither": ...}; never raises"""
+        return self._run({"code": code}, timeout)
+
+    def analyze_project(self, root, files, remappings=(), timeout=30):
+        """Compile and analyze a multi-file project directory in one go"""
+        return self._run({"project": {"root": root, "files": list(files), "remappings": list(remappings)}}, timeout)
+
+    def _run(self, request, timeout):
+        # One deadline for waiting on a worker and for the analysis itself
+        deadline = time.monotonic() + timeout
+        try:
+            worker = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            return self._failed("Timeout", "No analysis worker became available in time")
+        try:
+            return worker.analyze(request, deadline)
+        except queue.Empty:
+            # A stuck solc/Slither run: kill it so the next request gets a fresh worker
+            worker.stop()
+            return self._failed("Timeout", "Static analysis (solc/Slither) timed out")
+        except Exception as e:
+            worker.stop()
+            return self._failed("UnknownError", str(e))
+        finally:
+            self._idle.put(worker)
+
+    @staticmethod
+    def _failed(kind, message):
+        return {"syntax": syntax_error(kind, message), "slither": {"error": message}}
+
+    def shutdown(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+
+
+# -------------------------
+# ASGI app side
+# -------------------------
+# Slither results for large projects are single JSON lines well past asyncio's 64 KiB default
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class AsyncAnalysisWorker:
+    """One worker subprocess driven through asyncio pipes"""
+
+    def __init__(self):
+        self.process = None
+        self.sequence = 0
+
+    async def _start(self):
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            os.path.abspath(__file__),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=STREAM_LIMIT,
+            start_new_session=True,
+        )
+
+    async def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            kill_group(self.process.pid)
+            await self.process.wait()
+        self.process = None
+
+    async def analyze(self, request, timeout):
+        if self.process is None or self.process.returncode is not None:
+            await self._start()
+        self.sequence += 1
+        self.process.stdin.write((json.dumps(dict(request, id=self.sequence, timeout=timeout)) + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                self.process = None
+                raise RuntimeError("Analysis worker exited unexpectedly")
+            response = json.loads(line)
+            if response.get("id") == self.sequence:
+                return response
+
+
+class AsyncAnalysisWorkerPool:
+    """asyncio counterpart of AnalysisWorkerPool; create it on the loop that will use it.
+
+    `busy` and `waiting` let the caller shed load before the pool's queue
+    grows without bound.
+    """
+
+    def __init__(self, size=2):
+        self.size = size
+        self.busy = 0
+        self.waiting = 0
+        self._idle = asyncio.LifoQueue()
+        for _ in range(size):
+            self._idle.put_nowait(AsyncAnalysisWorker())
+
+    @property
+    def saturated(self):
+        return self.busy >= self.size
+
+    async def analyze(self, code, timeout=30):
+        """Returns {"syntax": ..., "slither": ...}; never raises"""
+        return await self._run({"code": code}, timeout)
+
+    async def analyze_project(self, root, files, remappings=(), timeout=30):
+        return await self._run({"project": {"root": root, "files": list(files), "remappings": list(remappings)}}, timeout)
+
+    async def _run(self, request, timeout):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        self.waiting += 1
+        try:
+            worker = await asyncio.wait_for(self._idle.get(), timeout)
+        except asyncio.TimeoutError:
+            return AnalysisWorkerPool._failed("Timeout", "No analysis worker became available in time")
+        finally:
+            self.waiting -= 1
+        self.busy += 1
+        try:
+            remaining = max(deadline - loop.time(), 0)
+            return await asyncio.wait_for(worker.analyze(request, remaining), remaining)
+        except asyncio.TimeoutError:
+            await worker.stop()
+            return AnalysisWorkerPool._failed("Timeout", "Static analysis (solc/Slither) timed out")
+        except asyncio.CancelledError:
+            # Abandoned mid-response: the pipe is out of step, start the next request on a fresh worker
+            await asyncio.shield(worker.stop())
+            raise
+        except Exception as e:
+            await worker.stop()
+            return AnalysisWorkerPool._failed("UnknownError", str(e))
+        finally:
+            self.busy -= 1
+            self._idle.put_nowait(worker)
+
+    def stats(self):
+        return {"size": self.size, "busy": self.busy, "waiting": self.waiting}
+
+    async def shutdown(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(stream=sys.stderr, level=logging.INFO)
+    # Anything the analyzers print must not end up in the response stream
+    protocol, sys.stdout = sys.stdout, sys.stderr
+    serve(stdout=protocol)
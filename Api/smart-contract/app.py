@@ -1,20 +1,35 @@
 import os
 import re
 import json
-import tempfile
+import time
+import bisect
+import hashlib
+import functools
+import asyncio
+import threading
 import subprocess
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from cache_store import SQLiteCache
+from audit_jobs import AuditJobQueue, AuditMetrics
+from compliance_rules import solidity_rules
+from analysis_worker import AnalysisWorkerPool
+from mirror_client import MirrorNodeClient
+from llm_analysis import ChunkedLLMAnalyzer, dedupe_findings, merge_results
+from etherscan_sources import EtherscanError, EtherscanSourceStore
+
 # optional LLM client (used for Solidity analysis if configured)
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except Exception:
     OpenAI = None
+    AsyncOpenAI = None
 
 load_dotenv()
 
@@ -26,18 +41,176 @@ OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openrouter/openai/gpt-4o-mini"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+# Any OpenAI-compatible endpoint (e.g. llm_stub.py for local testing)
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")
+
 llm_client = None
+async_llm_client = None
 LLM_MODEL = None
-if OPENROUTER_API_KEY and OpenAI:
+if LLM_BASE_URL and OpenAI:
+    llm_client = OpenAI(base_url=LLM_BASE_URL, api_key=OPENAI_API_KEY or "local")
+    async_llm_client = AsyncOpenAI(base_url=LLM_BASE_URL, api_key=OPENAI_API_KEY or "local")
+    LLM_MODEL = os.getenv("LLM_MODEL", OPENAI_MODEL)
+elif OPENROUTER_API_KEY and OpenAI:
     llm_client = OpenAI(
         base_url="https://openrouter.ai/api/v1",
         api_key=OPENROUTER_API_KEY,
     )
+    async_llm_client = AsyncOpenAI(
+        base_url="https://openrouter.ai/api/v1",
+        api_key=OPENROUTER_API_KEY,
+    )
     LLM_MODEL = OPENROUTER_MODEL
 elif OPENAI_API_KEY and OpenAI:
     llm_client = OpenAI(api_key=OPENAI_API_KEY)
+    async_llm_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
     LLM_MODEL = OPENAI_MODEL
 
+# Audit pipeline: solc and Slither run in warm worker processes fed from a
+# bounded thread pool; the LLM call runs on a background asyncio loop. A whole
+# audit gets one deadline and reports whatever stages finished in time.
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", "4"))
+AUDIT_DEADLINE = float(os.getenv("AUDIT_DEADLINE", "45"))
+STAGE_TIMEOUT = float(os.getenv("AUDIT_STAGE_TIMEOUT", "30"))
+
+analysis_pool = ThreadPoolExecutor(max_workers=AUDIT_WORKERS, thread_name_prefix="audit")
+# Warm worker processes that keep crytic-compile/Slither imported between audits
+analysis_workers = AnalysisWorkerPool(size=int(os.getenv("AUDIT_ANALYSIS_WORKERS", "2")))
+
+_async_loop = asyncio.new_event_loop()
+threading.Thread(target=_async_loop.run_forever, name="audit-async", daemon=True).start()
+
+
+def run_async(coro):
+    """Schedule a coroutine on the background loop; returns a concurrent Future"""
+    return asyncio.run_coroutine_threadsafe(coro, _async_loop)
+
+
+def iterate_async(agen):
+    """Drive an async generator on the background loop from a synchronous caller"""
+    try:
+        while True:
+            try:
+                yield run_async(agen.__anext__()).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        run_async(agen.aclose()).result()
+
+
+# Large sources are split per contract / function and reviewed concurrently
+llm_analyzer = ChunkedLLMAnalyzer(
+    async_llm_client,
+    LLM_MODEL,
+    max_chars=int(os.getenv("LLM_CHUNK_CHARS", "24000")),
+    concurrency=int(os.getenv("LLM_CONCURRENCY", "4")),
+    max_tokens=int(os.getenv("LLM_MAX_TOKENS", "2000")),
+) if async_llm_client else None
+
+
+# Content-addressed cache of audit stage outputs, keyed by normalized
+# source hash plus the tool version / model that produced them
+AUDIT_CACHE_DIR = os.getenv("AUDIT_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+audit_cache = SQLiteCache(
+    os.path.join(AUDIT_CACHE_DIR, "audit_results.sqlite"),
+    max_bytes=int(float(os.getenv("AUDIT_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    default_ttl=float(os.getenv("AUDIT_CACHE_TTL", str(7 * 24 * 3600))),
+)
+
+audit_metrics = AuditMetrics()
+
+# Verified Etherscan sources: content-addressed blobs plus per-address manifests
+etherscan_sources = EtherscanSourceStore(os.getenv("ETHERSCAN_CACHE_DIR", os.path.join(AUDIT_CACHE_DIR, "etherscan")))
+
+# Hedera mirror node: one pooled keep-alive client shared by single and batch HTS audits,
+# with a SQLite response cache (per-endpoint TTLs, background revalidation)
+mirror_client = MirrorNodeClient(
+    per_host=int(os.getenv("MIRROR_MAX_PER_HOST", "8")),
+    max_retries=int(os.getenv("MIRROR_MAX_RETRIES", "4")),
+    cache=SQLiteCache(
+        os.path.join(AUDIT_CACHE_DIR, "mirror_cache.sqlite"),
+        max_bytes=int(float(os.getenv("MIRROR_CACHE_MAX_MB", "64")) * 1024 * 1024),
+    ) if os.getenv("MIRROR_CACHE", "1") != "0" else None,
+    max_stale=float(os.getenv("MIRROR_CACHE_MAX_STALE", str(24 * 3600))),
+)
+HTS_BATCH_MAX_TOKENS = int(os.getenv("HTS_BATCH_MAX_TOKENS", "500"))
+hts_pool = ThreadPoolExecutor(max_workers=int(os.getenv("HTS_BATCH_WORKERS", "16")), thread_name_prefix="hts")
+
+
+def hts_base_url(mirror_node_url=None):
+    # mirror_node_url is for server-side callers only; never pass a URL taken from a request
+    mirror_node = mirror_node_url or os.getenv("HEDERA_MIRROR_NODE_URL", "https://testnet.mirrornode.hedera.com/api/v1")
+    return mirror_node.rstrip('/')
+
+
+def normalize_source(code):
+    """Normalize line endings and trailing whitespace; line numbers are preserved"""
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n") + "\n"
+
+
+def source_hash(code):
+    return hashlib.sha256(normalize_source(code).encode("utf-8")).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def tool_version(command):
+    """First line of `<command> --version`, or 'unavailable' if the tool is missing"""
+    try:
+        result = subprocess.run([command, "--version"], capture_output=True, text=True, timeout=15)
+        lines = [line for line in (result.stdout or result.stderr or "").splitlines() if line.strip()]
+        return lines[-1].strip() if lines else "unknown"
+    except Exception:
+        return "unavailable"
+
+
+def stage_fingerprint(stage):
+    """Versions of everything that can change a stage's output"""
+    if stage == "syntax":
+        return f"solc={tool_version('solc')}"
+    if stage == "slither":
+        return f"slither={tool_version('slither')};solc={tool_version('solc')}"
+    if stage == "llm":
+        return llm_analyzer.fingerprint if llm_analyzer else f"model={LLM_MODEL}"
+    raise ValueError(f"Unknown stage: {stage}")
+
+
+def stage_cache_key(stage, digest):
+    return hashlib.sha256(f"{stage}|{stage_fingerprint(stage)}|{digest}".encode("utf-8")).hexdigest()
+
+
+def is_cacheable(stage, result):
+    """Only keep results that reflect a real analysis, not environment failures"""
+    if not isinstance(result, dict) or result.get("error") or result.get("note"):
+        return False
+    if result.get("chunk_errors"):
+        # Partial LLM review (a chunk timed out or was rate limited): retry next time
+        return False
+    if stage == "syntax":
+        return not any(e.get("type") in ("EnvironmentError", "Timeout", "UnknownError") for e in result.get("errors", []))
+    return True
+
+
+def stage_status(stage, result):
+    """(status, error) for a stage that returned: "completed", or "unavailable" / "failed" when it did no real analysis"""
+    if not isinstance(result, dict):
+        return "unavailable", "Stage returned no result"
+    if result.get("note"):
+        return "unavailable", result["note"]
+    if stage == "syntax":
+        errors = result.get("errors", [])
+        for kind, status in (("EnvironmentError", "unavailable"), ("Timeout", "failed"), ("UnknownError", "failed")):
+            for error in errors:
+                if error.get("type") == kind:
+                    return status, error.get("message")
+        return "completed", None
+    if result.get("error"):
+        return "failed", result["error"]
+    if result.get("chunk_errors"):
+        # Findings from the chunks that answered are kept, but the review is incomplete
+        return "failed", f"{len(result['chunk_errors'])} of {result['chunks']['total']} LLM chunks failed"
+    return "completed", None
+
 
 class SmartContractAuditor:
     def __init__(self):
@@ -47,98 +220,27 @@ class SmartContractAuditor:
     # Solidity / EVM analysis
     # -------------------------
     def analyze_syntax(self, code, timeout=30):
-        try:
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".sol", delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            result = subprocess.run(
-                ["solc", "--ast-json", temp_file],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-        except FileNotFoundError:
-            return {
-                "valid": False,
-                "errors": [
-                    {
-                        "type": "EnvironmentError",
-                        "message": "Solidity compiler (solc) not found in PATH. Install solc to enable full grammar / type analysis.",
-                        "source_location": None,
-                    }
-                ],
-                "warnings": [],
-            }
-        except subprocess.TimeoutExpired:
-            return {
-                "valid": False,
-                "errors": [
-                    {"type": "Timeout", "message": "Solidity compiler (solc) timed out while analyzing the contract.", "source_location": None}
-                ],
-                "warnings": [],
-            }
-        except Exception as e:
-            return {
-                "valid": False,
-                "errors": [{"type": "UnknownError", "message": str(e), "source_location": None}],
-                "warnings": [],
-            }
-        finally:
-            try:
-                if "temp_file" in locals() and os.path.exists(temp_file):
-                    os.unlink(temp_file)
-            except Exception:
-                pass
-
-        def _parse_solc_messages(stderr: str):
-            errors = []
-            warnings = []
-            for line in (stderr or "").splitlines():
-                line = line.strip()
-                if not line:
-                    continue
-                entry = {"type": "CompilerMessage", "message": line, "source_location": None}
-                lower = line.lower()
-                if "error" in lower:
-                    entry["type"] = "Error"
-                    errors.append(entry)
-                elif "warning" in lower:
-                    entry["type"] = "Warning"
-                    warnings.append(entry)
-                else:
-                    warnings.append(entry)
-            return errors, warnings
-
-        errors, warnings = _parse_solc_messages(result.stderr or "")
-        if result.returncode != 0:
-            return {
-                "valid": False,
-                "errors": errors if errors else [{"type": "CompilationFailed", "message": result.stderr or "Unknown compiler error", "source_location": None}],
-                "warnings": warnings,
-            }
-        return {"valid": True, "errors": [], "warnings": warnings}
+        return self.static_analysis(code, timeout)["syntax"]
 
     def run_slither_analysis(self, code, timeout=30):
-        try:
-            with tempfile.NamedTemporaryFile(mode="w", suffix=".sol", delete=False) as f:
-                f.write(code)
-                temp_file = f.name
-            result = subprocess.run(['slither', temp_file, '--json', '-'], capture_output=True, text=True, timeout=timeout)
-            os.unlink(temp_file)
-            if result.returncode == 0:
-                try:
-                    slither_output = json.loads(result.stdout or "{}")
-                    return self.parse_slither_results(slither_output)
-                except json.JSONDecodeError:
-                    return {'issues': [], 'error': 'Failed to parse Slither output'}
-            else:
-                return {'issues': [], 'error': result.stderr}
-        except FileNotFoundError:
-            return {'issues': [], 'error': 'Slither not found in PATH'}
-        except subprocess.TimeoutExpired:
-            return {'issues': [], 'error': 'Slither analysis timed out'}
-        except Exception as e:
-            return {'issues': [], 'error': str(e)}
+        return self.static_analysis(code, timeout)["slither"]
+
+    def static_analysis(self, code, timeout=30):
+        """Compile once in a warm worker; returns {"syntax": ..., "slither": ...} from that one compilation"""
+        return self._static_result(analysis_workers.analyze(code, timeout=timeout))
+
+    def static_analysis_project(self, project, timeout=30):
+        """Same as static_analysis for a materialized multi-file project (one standard-JSON compilation)"""
+        output = analysis_workers.analyze_project(project.root, sorted(project.files), project.remappings, timeout=timeout)
+        return self._static_result(output)
+
+    def _static_result(self, output):
+        slither_output = output.get("slither") or {}
+        if slither_output.get("error"):
+            slither_result = {'issues': [], 'error': slither_output["error"]}
+        else:
+            slither_result = self.parse_slither_results(slither_output)
+        return {"syntax": output["syntax"], "slither": slither_result}
 
     def parse_slither_results(self, slither_output):
         issues = []
@@ -151,6 +253,13 @@ class SmartContractAuditor:
                     'line': detector.get('line', 0),
                     'fix': self.generate_fix_suggestion(detector.get('check', ''))
                 }
+                # Slither's JSON locates findings through the source mapping of the first element
+                elements = detector.get('elements') or []
+                mapping = (elements[0].get('source_mapping') or {}) if elements else {}
+                if not issue['line'] and mapping.get('lines'):
+                    issue['line'] = mapping['lines'][0]
+                if mapping.get('filename_relative'):
+                    issue['file'] = mapping['filename_relative']
                 issues.append(issue)
         return {'issues': issues}
 
@@ -170,54 +279,232 @@ class SmartContractAuditor:
         return fixes.get(issue_type.lower(), 'Review and fix according to best practices')
 
     def analyze_with_gpt4(self, code):
-        if not llm_client:
-            return {"vulnerabilities": [], "gas_optimizations": [], "best_practices": [], "note": "LLM client not configured"}
-        prompt = f"""Analyze this Solidity smart contract for security vulnerabilities and best practices. Provide a detailed analysis including:
-1. Security vulnerabilities (critical, high, medium, low)
-2. Gas optimization opportunities
-3. Best practices violations
-4. Specific line numbers and fixes
+        return run_async(self.analyze_with_gpt4_async(code)).result()
 
-Contract code:
-{code}
-
-Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
-"""
+    async def analyze_with_gpt4_async(self, code, timeout=None):
+        if not llm_analyzer:
+            return {"vulnerabilities": [], "gas_optimizations": [], "best_practices": [], "note": "LLM client not configured"}
         try:
-            response = llm_client.chat.completions.create(
-                model=LLM_MODEL,
-                messages=[
-                    {"role": "system", "content": "You are a smart contract security expert."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.1,
-            )
-            try:
-                content = response.choices[0].message.content
-                gpt_analysis = json.loads(content)
-                return gpt_analysis
-            except Exception:
-                return {"vulnerabilities": [], "gas_optimizations": [], "best_practices": [], "raw_response": getattr(response.choices[0].message, "content", str(response))}
+            return await llm_analyzer.analyze(code, timeout=timeout)
         except Exception as e:
             return {"vulnerabilities": [], "gas_optimizations": [], "best_practices": [], "error": str(e)}
 
+    # -------------------------
+    # Concurrent audit pipeline
+    # -------------------------
+    def audit_solidity(self, code, deadline=None):
+        """Run solc, Slither and the LLM concurrently under one deadline.
+
+        Returns (report, syntax_result). Stages still running at the
+        deadline are reported as timed out and left out of the report.
+        """
+        return run_async(self.audit_solidity_async(code, deadline)).result()
+
+    async def audit_solidity_async(self, code, deadline=None, workers=None):
+        """audit_solidity as a coroutine; `workers` is an AsyncAnalysisWorkerPool on the calling loop (ASGI)"""
+        return await self._audit_async(
+            source_hash(code),
+            self._static_runner(code=code, workers=workers),
+            {"llm": code},
+            rules_code=code,
+            deadline=deadline,
+        )
+
+    def audit_project(self, project, deadline=None):
+        """Audit a multi-file project: one compilation for solc/Slither, LLM review per file.
+
+        LLM results are cached per file content, so re-auditing an upgraded
+        contract only reviews the files that changed. Vendored dependencies
+        (@openzeppelin/..., lib/...) are compiled but not sent to the LLM.
+        """
+        return run_async(self.audit_project_async(project, deadline)).result()
+
+    async def audit_project_async(self, project, deadline=None, workers=None):
+        files = await asyncio.to_thread(lambda: {path: project.read(path) for path in sorted(project.files)})
+        reviewed = {f"llm:{path}": content for path, content in files.items() if not project.is_dependency(path)}
+        rules = await asyncio.to_thread(self.analyze_compliance_rules_for_files, files)
+        report, syntax_result = await self._audit_async(
+            project.digest,
+            self._static_runner(project=project, workers=workers),
+            reviewed,
+            rules=rules,
+            deadline=deadline,
+        )
+        report["files"] = [
+            {
+                "path": path,
+                "dependency": project.is_dependency(path),
+                "llm": report["stages"]["llm"].get("files", {}).get(path, "skipped"),
+            }
+            for path in files
+        ]
+        return report, syntax_result
+
+    def _static_runner(self, code=None, project=None, workers=None):
+        """Coroutine function (timeout) -> {"syntax", "slither"} for one compilation.
+
+        With `workers` the worker processes are driven straight from the
+        event loop; otherwise the blocking pool call runs on analysis_pool.
+        """
+        async def run(timeout):
+            if workers is None:
+                call = functools.partial(self.static_analysis_project, project) if project else functools.partial(self.static_analysis, code)
+                return await asyncio.get_running_loop().run_in_executor(analysis_pool, call, timeout)
+            if project:
+                output = await workers.analyze_project(project.root, sorted(project.files), project.remappings, timeout=timeout)
+            else:
+                output = await workers.analyze(code, timeout=timeout)
+            return self._static_result(output)
+        return run
+
+    async def _audit_async(self, digest, static, llm_sources, rules_code=None, rules=None, deadline=None):
+        deadline = deadline or AUDIT_DEADLINE
+        stage_timeout = min(STAGE_TIMEOUT, deadline)
+        started = time.monotonic()
+
+        # llm_sources maps "llm" (whole source) or "llm:<path>" (one project file) to code
+        keys = {name: stage_cache_key(name, digest) for name in ("syntax", "slither")}
+        for name, source in llm_sources.items():
+            keys[name] = stage_cache_key("llm", digest if name == "llm" else source_hash(source))
+
+        results, stages, tasks, timings = {}, {}, {}, {}
+        cached = await asyncio.to_thread(lambda: {name: audit_cache.get(key) for name, key in keys.items()})
+        for name, entry in cached.items():
+            if entry is not None:
+                results[name] = entry.value
+                stages[name] = {"status": "cached"}
+
+        # The syntax check and Slither share one compilation in the analysis worker
+        static_stages = [name for name in ("syntax", "slither") if name not in results]
+        if static_stages:
+            static_task = asyncio.ensure_future(self._timed_async(timings, "static", static(stage_timeout)))
+            tasks.update((name, static_task) for name in static_stages)
+        for name, source in llm_sources.items():
+            if name not in results:
+                # The LLM client's connection pool belongs to the background loop, whichever loop runs the audit
+                review = run_async(self._timed_async(timings, name, self.analyze_with_gpt4_async(source, timeout=stage_timeout)))
+                tasks[name] = asyncio.wrap_future(review)
+        for name, task in tasks.items():
+            # Store late finishers too, so a timed-out stage is warm next time
+            task.add_done_callback(functools.partial(self._store_stage, name, keys[name]))
+        if tasks:
+            await asyncio.wait(set(tasks.values()), timeout=deadline)
+
+        for name, task in tasks.items():
+            if task.done() and not task.cancelled():
+                if task.exception() is None:
+                    results[name] = task.result()[name] if name in ("syntax", "slither") else task.result()
+                    # solc/Slither missing or no LLM client: the stage returned but analysed nothing
+                    status, error = stage_status(name, results[name])
+                    stages[name] = {"status": status} if error is None else {"status": status, "error": error}
+                else:
+                    results[name] = None
+                    stages[name] = {"status": "failed", "error": str(task.exception())}
+            else:
+                # solc/Slither stop at their own stage timeout and are still cached; the LLM review is dropped
+                if name not in ("syntax", "slither"):
+                    task.cancel()
+                results[name] = None
+                stages[name] = {"status": "timeout", "error": f"Stage did not finish within {deadline:g}s"}
+        for name in tasks:
+            seconds = timings.get("static" if name in ("syntax", "slither") else name)
+            if seconds is not None and stages[name]["status"] != "timeout":
+                stages[name]["duration_ms"] = round(seconds * 1000, 1)
+
+        syntax_result = results["syntax"] or {
+            "valid": False,
+            "errors": [{"type": "Timeout", "message": stages["syntax"].get("error", "Syntax check unavailable"), "source_location": None}],
+            "warnings": [],
+        }
+        if "llm" in llm_sources:
+            llm_results = results["llm"]
+        else:
+            llm_results, stages["llm"] = self._merge_file_reviews(llm_sources, results, stages)
+        stages = {name: stages[name] for name in ("syntax", "slither", "llm")}
+        report = await asyncio.to_thread(
+            self.generate_report, rules_code, results["slither"], llm_results, hts_report=None, stages=stages, rules=rules
+        )
+        report["source_hash"] = digest
+        report["duration_ms"] = round((time.monotonic() - started) * 1000, 1)
+        return report, syntax_result
+
+    def _merge_file_reviews(self, llm_sources, results, stages):
+        """Combine per-file LLM reviews into one result plus an aggregate "llm" stage"""
+        reviews, statuses = [], {}
+        for name in llm_sources:
+            path = name.split(":", 1)[1]
+            statuses[path] = stages[name]["status"]
+            if results.get(name):
+                vulnerabilities = [dict(v, file=path) for v in results[name].get("vulnerabilities") or []]
+                reviews.append(dict(results[name], vulnerabilities=vulnerabilities))
+        if not statuses:
+            return None, {"status": "skipped", "files": {}}
+        counts = {}
+        for status in statuses.values():
+            counts[status] = counts.get(status, 0) + 1
+        if set(counts) <= {"completed", "cached"}:
+            status = "cached" if set(counts) == {"cached"} else "completed"
+        else:
+            status = next(name for name in ("timeout", "failed", "unavailable") if name in counts)
+        return merge_results(reviews), {"status": status, "counts": counts, "files": statuses}
+
+    async def _timed_async(self, timings, stage, coro):
+        started = time.monotonic()
+        try:
+            return await coro
+        finally:
+            timings[stage] = time.monotonic() - started
+            audit_metrics.observe(f"stage_{stage.split(':', 1)[0]}", timings[stage])
+
+    def _store_stage(self, stage, key, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        if stage in ("syntax", "slither"):
+            result = result[stage]
+        if is_cacheable(stage, result):
+            audit_cache.set(key, result)
+
     # -------------------------
     # Hedera HTS token analysis
     # -------------------------
     def analyze_hts_token(self, token_id, mirror_node_url=None, timeout=10):
-        mirror_node = mirror_node_url or os.getenv("HEDERA_MIRROR_NODE_URL", "https://testnet.mirrornode.hedera.com/api/v1")
-        base_url = mirror_node.rstrip('/')
-        token_url = f"{base_url}/tokens/{token_id}"
+        base_url = hts_base_url(mirror_node_url)
         try:
-            r = requests.get(token_url, timeout=timeout)
+            r = mirror_client.get(f"{base_url}/tokens/{token_id}", timeout=timeout)
         except Exception as e:
             return {"error": f"Failed to contact mirror node: {e}"}
+        if r.status_code != 200:
+            return {"error": f"Mirror node returned status {r.status_code}", "mirror_response": r.text}
 
+        # optional: fetch recent transactions summary for token transfers
+        try:
+            tr = mirror_client.get(f"{base_url}/tokens/{token_id}/transactions?limit=1", timeout=timeout)
+            transactions = tr.json() if tr.status_code == 200 else None
+        except Exception:
+            transactions = None
+        return self.hts_report(token_id, r.json(), transactions)
+
+    async def analyze_hts_token_async(self, token_id, client, mirror_node_url=None, timeout=10):
+        """analyze_hts_token over an AsyncMirrorNodeClient; both mirror-node calls are made concurrently"""
+        base_url = hts_base_url(mirror_node_url)
+        r, tr = await asyncio.gather(
+            client.get(f"{base_url}/tokens/{token_id}", timeout=timeout),
+            client.get(f"{base_url}/tokens/{token_id}/transactions?limit=1", timeout=timeout),
+            return_exceptions=True,
+        )
+        if isinstance(r, Exception):
+            return {"error": f"Failed to contact mirror node: {r}"}
         if r.status_code != 200:
             return {"error": f"Mirror node returned status {r.status_code}", "mirror_response": r.text}
+        try:
+            transactions = tr.json() if not isinstance(tr, Exception) and tr.status_code == 200 else None
+        except ValueError:
+            transactions = None
+        return self.hts_report(token_id, r.json(), transactions)
 
-        token = r.json()
+    def hts_report(self, token_id, token, transactions=None):
+        """Heuristic HTS report from the mirror node's token metadata and latest transactions page"""
         issues = []
 
         # Basic properties
@@ -269,17 +556,9 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
         if isinstance(total_supply, int) and total_supply > 1_000_000_000:
             issues.append({"severity": "medium", "title": "Very high supply", "description": "Total supply is large; confirm tokenomics and potential inflation concerns."})
 
-        # optional: fetch recent transactions summary for token transfers
-        try:
-            tx_url = f"{base_url}/tokens/{token_id}/transactions?limit=1"
-            tr = requests.get(tx_url, timeout=timeout)
-            if tr.status_code == 200:
-                tx_payload = tr.json()
-                if tx_payload.get("transactions") and len(tx_payload["transactions"]) > 0:
-                    last_tx = tx_payload["transactions"][0]
-                    issues.append({"severity": "info", "title": "Recent activity detected", "description": f"Last transaction: {last_tx.get('transaction_id')}"})
-        except Exception:
-            pass
+        if transactions and transactions.get("transactions"):
+            last_tx = transactions["transactions"][0]
+            issues.append({"severity": "info", "title": "Recent activity detected", "description": f"Last transaction: {last_tx.get('transaction_id')}"})
 
         severity_map = {"critical": 10, "high": 7, "medium": 4, "low": 1, "info": 0}
         score = 100
@@ -335,7 +614,7 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
     # -------------------------
     # Report generation (unified)
     # -------------------------
-    def generate_report(self, code=None, slither_results=None, gpt_results=None, hts_report=None):
+    def generate_report(self, code=None, slither_results=None, gpt_results=None, hts_report=None, stages=None, rules=None):
         if hts_report:
             return hts_report
 
@@ -350,6 +629,8 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
                     'line': issue.get('line'),
                     'fix': issue.get('fix'),
                 })
+                if issue.get('file'):
+                    all_vulnerabilities[-1]['file'] = issue['file']
 
         if gpt_results and 'vulnerabilities' in gpt_results:
             for vuln in gpt_results['vulnerabilities']:
@@ -361,6 +642,11 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
                     'line': vuln.get('line'),
                     'fix': vuln.get('fix'),
                 })
+                if vuln.get('file'):
+                    all_vulnerabilities[-1]['file'] = vuln['file']
+
+        # Chunked LLM runs and overlapping tools can report the same finding twice
+        all_vulnerabilities = dedupe_findings(all_vulnerabilities)
 
         severity_weights = {'critical': 10, 'high': 7, 'medium': 4, 'low': 1}
         total_score = 100
@@ -369,13 +655,13 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
             total_score -= weight
         security_score = max(0, total_score)
 
-        rules = []
-        try:
-            rules = self.analyze_compliance_rules(code or "")
-        except Exception:
-            rules = []
+        if rules is None:
+            try:
+                rules = self.analyze_compliance_rules(code or "")
+            except Exception:
+                rules = []
 
-        return {
+        report = {
             'security_score': security_score,
             'vulnerabilities': all_vulnerabilities,
             'gas_optimizations': (gpt_results.get('gas_optimizations') if gpt_results else []),
@@ -389,160 +675,140 @@ Return JSON with fields: vulnerabilities, gas_optimizations, best_practices
                 'low_issues': len([v for v in all_vulnerabilities if v['severity'] == 'low']),
             }
         }
+        if stages is not None:
+            report['stages'] = stages
+            report['partial'] = any(stage.get('status') not in ('completed', 'cached') for stage in stages.values())
+        return report
 
     # Reuse earlier ERC/compliance function from user's original flow with small tweaks
     def analyze_compliance_rules(self, code: str):
-        rules = []
-        normalized = code.lower()
-        erc20_signatures = [
-            "function totalsupply(", "function balanceof(", "function transfer(", "function transferfrom(",
-            "function approve(", "function allowance(", "event transfer(", "event approval(",
-        ]
-        erc20_hits = [sig for sig in erc20_signatures if sig in normalized]
-        if erc20_hits:
-            missing = [sig for sig in erc20_signatures if sig not in normalized]
-            if missing:
-                rules.append({
-                    "category": "erc_standard",
-                    "standard": "ERC20",
-                    "severity": "medium",
-                    "title": "Partial ERC20 interface detected",
-                    "description": "Some ERC20 functions detected but others are missing.",
-                    "details": {"present": erc20_hits, "missing": missing},
-                })
-            else:
-                rules.append({
-                    "category": "erc_standard",
-                    "standard": "ERC20",
-                    "severity": "low",
-                    "title": "ERC20 interface detected",
-                    "description": "Contract exposes core ERC20 interface elements.",
-                })
-        erc721_signatures = ["function ownerof(", "function safetransferfrom(", "function transferfrom(", "event transfer(", "event approval("]
-        erc721_hits = [sig for sig in erc721_signatures if sig in normalized]
-        if erc721_hits:
-            rules.append({
-                "category": "erc_standard",
-                "standard": "ERC721",
-                "severity": "low",
-                "title": "ERC721-like interface detected",
-                "description": "The contract exposes ERC721-like functions/events.",
-                "details": {"present": erc721_hits},
-            })
-        sensitive_patterns = [r"function\s+mint\s*\(", r"function\s+burn\s*\(", r"function\s+pause\s*\("]
-        uses_oz_access = "@openzeppelin" in normalized or "openzeppelin/contracts/access" in normalized
-        has_only_owner = "onlyowner" in normalized
-        has_access_control = "accesscontrol" in normalized
-        for pattern in sensitive_patterns:
-            for match in re.finditer(pattern, code, flags=re.IGNORECASE):
-                line_no = code[: match.start()].count("\n") + 1
-                line_start = code.rfind("\n", 0, match.start()) + 1
-                line_end = code.find("\n", match.start())
-                if line_end == -1:
-                    line_end = len(code)
-                signature_line = code[line_start:line_end].lower()
-                if "onlyowner" not in signature_line and "only_role" not in signature_line:
-                    rules.append({
-                        "category": "access_control",
-                        "standard": "AccessControl / Ownable",
-                        "severity": "high",
-                        "title": "Sensitive function without explicit access control",
-                        "description": "Sensitive function is not obviously protected by an access-control modifier.",
-                        "line": line_no,
-                        "details": {"signature": signature_line.strip(), "hint": "Consider OpenZeppelin Ownable / AccessControl."},
-                    })
-        if uses_oz_access or has_only_owner or has_access_control:
-            rules.append({
-                "category": "access_control",
-                "standard": "OpenZeppelin",
-                "severity": "low",
-                "title": "Access control pattern detected",
-                "description": "Contract appears to use OpenZeppelin-style access control.",
-            })
-        has_blacklist = "blacklist" in normalized or "blocked" in normalized
-        has_whitelist = "whitelist" in normalized or "kyc" in normalized
-        has_pause = "pause" in normalized or "paused" in normalized
-        if not (has_blacklist or has_whitelist or has_pause):
-            rules.append({
-                "category": "kyc_aml",
-                "severity": "medium",
-                "title": "No explicit transfer restrictions detected",
-                "description": "No blacklist/whitelist/pausable mechanics detected.",
-            })
-        else:
-            rules.append({
-                "category": "kyc_aml",
-                "severity": "low",
-                "title": "Basic restriction mechanics detected",
-                "description": "Blacklists/whitelists/pausable logic found; ensure consistent enforcement.",
-                "details": {"blacklist": has_blacklist, "whitelist": has_whitelist, "pause": has_pause},
-            })
+        # ERC20/721 signatures, sensitive functions and restriction keywords live in compliance_rules.SOLIDITY_RULES
+        return solidity_rules.evaluate(code)
+
+    def analyze_compliance_rules_for_files(self, files):
+        """Rules over a whole project; line-level findings are mapped back to (file, line)"""
+        starts, parts, line = [], [], 1
+        for path, content in files.items():
+            starts.append((line, path))
+            parts.append(content.rstrip("\n"))
+            line += parts[-1].count("\n") + 1
+        rules = self.analyze_compliance_rules("\n".join(parts))
+        first_lines = [start for start, _ in starts]
+        for rule in rules:
+            if rule.get("line"):
+                start, path = starts[bisect.bisect_right(first_lines, rule["line"]) - 1]
+                rule["file"] = path
+                rule["line"] = rule["line"] - start + 1
         return rules
 
 
 auditor = SmartContractAuditor()
 
 
+def run_audit_request(data):
+    """Audit Solidity code, an HTS token or a verified Ethereum address; returns (body, status_code)"""
+    # If user passed Solidity code
+    code = data.get('code', '') or data.get('solidity_code', '')
+    token_id = data.get('token_id') or data.get('hedera_token') or data.get('hts_token')
+    address = data.get('address')  # ethereum address for etherscan flow
+
+    if code and code.strip():
+        report, syntax_result = auditor.audit_solidity(code)
+        return {'success': True, 'report': report, 'syntax': syntax_result}, 200
+
+    if token_id:
+        hts_report = auditor.analyze_hts_token(token_id)
+        return {'success': True, 'report': hts_report}, 200
+
+    if address:
+        # Verified source from Etherscan, kept content-addressed on disk
+        try:
+            project = etherscan_sources.get(
+                address,
+                chainid=data.get('chainid', 1),
+                api_key=os.getenv('ETHERSCAN_API_KEY'),
+                refresh=bool(data.get('refresh')),
+            )
+        except EtherscanError as e:
+            body = {'error': str(e)}
+            if e.payload is not None:
+                body['etherscan_raw_response'] = e.payload
+            return body, e.status_code
+        if not project.multi_file:
+            source_code = project.read(project.main_path)
+            report, syntax_result = auditor.audit_solidity(source_code)
+            return {'success': True, 'report': report, 'syntax': syntax_result, 'source': source_code}, 200
+        report, syntax_result = auditor.audit_project(project)
+        source_code = '\n\n'.join(f'// File: {path}\n{project.read(path)}' for path in sorted(project.files))
+        return {'success': True, 'report': report, 'syntax': syntax_result, 'source': source_code, 'project': project.summary()}, 200
+
+    return {'error': 'No input provided. Send either "code" (Solidity) or "token_id" (Hedera HTS) or "address" (Ethereum)'}, 400
+
+
+audit_jobs = AuditJobQueue(
+    os.path.join(AUDIT_CACHE_DIR, "audit_jobs.sqlite"),
+    handler=run_audit_request,
+    workers=int(os.getenv("AUDIT_JOB_WORKERS", "2")),
+    metrics=audit_metrics,
+    lease=float(os.getenv("AUDIT_JOB_LEASE", "60")),
+    callback_hosts=[host.strip() for host in os.getenv("AUDIT_CALLBACK_ALLOWED_HOSTS", "").split(",") if host.strip()],
+)
+
+
 @app.route('/api/audit', methods=['POST'])
 def audit_contract_or_token():
     try:
         data = request.get_json() or {}
-        # If user passed Solidity code
-        code = data.get('code', '') or data.get('solidity_code', '')
-        token_id = data.get('token_id') or data.get('hedera_token') or data.get('hts_token')
-        address = data.get('address')  # ethereum address for etherscan flow
-
-        if code and code.strip():
-            syntax_result = auditor.analyze_syntax(code)
-            slither_result = auditor.run_slither_analysis(code)
-            gpt_result = auditor.analyze_with_gpt4(code)
-            report = auditor.generate_report(code, slither_result, gpt_result, hts_report=None)
-            return jsonify({'success': True, 'report': report, 'syntax': syntax_result}), 200
-
-        if token_id:
-            hts_report = auditor.analyze_hts_token(token_id)
-            return jsonify({'success': True, 'report': hts_report}), 200
-
-        if address:
-            # fallback: use the Ethereum address Etherscan flow from previous app
-            etherscan_key = os.getenv('ETHERSCAN_API_KEY')
-            if not etherscan_key:
-                return jsonify({'error': 'ETHERSCAN_API_KEY not configured in backend environment'}), 500
-            url = ('https://api.etherscan.io/v2/api'
-                   f'?chainid=1&module=contract&action=getsourcecode&address={address}&apikey={etherscan_key}')
-            r = requests.get(url, timeout=15)
-            if r.status_code != 200:
-                return jsonify({'error': 'Failed to fetch contract source from Etherscan'}), 502
-            payload = r.json()
-            result_list = payload.get('result', [])
-            if not result_list:
-                return jsonify({'error': 'Contract source not found or not verified on Etherscan', 'etherscan_raw_response': payload}), 404
-            result = result_list[0]
-            source_code = result.get('SourceCode', '') or result.get('sourceCode', '')
-            if not source_code:
-                return jsonify({'error': 'Contract source empty or not verified on Etherscan'}), 404
-            if source_code.strip().startswith('{'):
-                try:
-                    parsed = json.loads(source_code)
-                    parts = []
-                    for filename, meta in parsed.get('sources', {}).items():
-                        content = meta.get('content') if isinstance(meta, dict) else ''
-                        if content:
-                            parts.append(content)
-                    source_code = '\n\n'.join(parts)
-                except Exception:
-                    pass
-            syntax_result = auditor.analyze_syntax(source_code)
-            slither_result = auditor.run_slither_analysis(source_code)
-            gpt_result = auditor.analyze_with_gpt4(source_code)
-            report = auditor.generate_report(source_code, slither_result, gpt_result, hts_report=None)
-            return jsonify({'success': True, 'report': report, 'syntax': syntax_result, 'source': source_code}), 200
-
-        return jsonify({'error': 'No input provided. Send either "code" (Solidity) or "token_id" (Hedera HTS) or "address" (Ethereum)'}), 400
+        # Job mode: queue the audit and return immediately
+        if data.get('async') or request.args.get('mode') == 'async':
+            payload = {k: v for k, v in data.items() if k not in ('async', 'callback_url')}
+            try:
+                job_id = audit_jobs.submit(payload, callback_url=data.get('callback_url'))
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify({'success': True, 'job_id': job_id, 'status': 'queued', 'status_url': f'/api/audit/{job_id}'}), 202
+
+        body, status_code = run_audit_request(data)
+        return jsonify(body), status_code
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/audit/llm', methods=['POST'])
+def audit_llm_stream():
+    """LLM review only, streamed as NDJSON: one line per source chunk, then the merged findings"""
+    data = request.get_json() or {}
+    code = data.get('code', '') or data.get('solidity_code', '')
+    if not code.strip():
+        return jsonify({'error': 'No Solidity code provided'}), 400
+    if not llm_analyzer:
+        return jsonify({'error': 'LLM client not configured'}), 503
+
+    def generate():
+        results = []
+        for event in iterate_async(llm_analyzer.stream(code, timeout=STAGE_TIMEOUT)):
+            if 'result' in event:
+                results.append((event['start_line'], event['result']))
+            yield json.dumps(event, default=str) + '\n'
+        merged = merge_results(result for _, result in sorted(results, key=lambda item: item[0]))
+        yield json.dumps({'done': True, 'merged': merged}, default=str) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@app.route('/api/audit/metrics', methods=['GET'])
+def audit_metrics_endpoint():
+    return jsonify({'jobs': audit_jobs.stats(), 'audit_cache': audit_cache.stats()})
+
+
+@app.route('/api/audit/<job_id>', methods=['GET'])
+def audit_job_status(job_id):
+    job = audit_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Audit job not found'}), 404
+    return jsonify({'success': True, **job}), 200
+
+
 @app.route('/api/audit-hts', methods=['POST'])
 def audit_hts_endpoint():
     try:
@@ -556,10 +822,62 @@ def audit_hts_endpoint():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/audit-hts/batch', methods=['POST'])
+def audit_hts_batch_endpoint():
+    """Audit many HTS tokens concurrently; streams one NDJSON line per token as it finishes"""
+    data = request.get_json() or {}
+    token_ids = data.get('token_ids') or data.get('tokens') or []
+    if not isinstance(token_ids, list) or not token_ids:
+        return jsonify({'error': 'No token_ids provided'}), 400
+    token_ids = list(dict.fromkeys(str(token_id).strip() for token_id in token_ids if str(token_id).strip()))
+    if len(token_ids) > HTS_BATCH_MAX_TOKENS:
+        return jsonify({'error': f'At most {HTS_BATCH_MAX_TOKENS} token_ids per batch'}), 400
+
+    def generate():
+        started = time.monotonic()
+        futures = {
+            hts_pool.submit(auditor.analyze_hts_token, token_id): token_id
+            for token_id in token_ids
+        }
+        failed = 0
+        try:
+            for future in as_completed(futures):
+                token_id = futures[future]
+                try:
+                    report = future.result()
+                except Exception as e:
+                    report = {'error': str(e)}
+                ok = 'error' not in report
+                failed += not ok
+                line = {'token_id': token_id, 'success': ok, 'report': report}
+                yield json.dumps(line, default=str) + '\n'
+            yield json.dumps({
+                'done': True,
+                'total': len(token_ids),
+                'failed': failed,
+                'duration_ms': round((time.monotonic() - started) * 1000, 1),
+            }) + '\n'
+        finally:
+            # Client went away: drop the tokens that have not started yet
+            for future in futures:
+                future.cancel()
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({'status': 'healthy', 'timestamp': datetime.utcnow().isoformat() + 'Z'})
+    return jsonify({
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'audit_cache': audit_cache.stats(),
+        'mirror_client': mirror_client.stats(),
+    })
 
 
 if __name__ == '__main__':
+    # Started with the server, so jobs queued before a restart resume without a new submission.
+    # In debug mode only the reloader's serving child (WERKZEUG_RUN_MAIN) runs the workers.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        audit_jobs.start()
     app.run(debug=True, host='0.0.0.0', port=int(os.getenv('PORT', 5000)))
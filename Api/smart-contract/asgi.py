@@ -0,0 +1,378 @@
+"""ASGI entry point for the smart-contract auditor: `uvicorn asgi:app`.
+
+Same routes and responses as the Flask app, but every wait is
+non-blocking: mirror-node and Etherscan calls go through httpx async
+clients, solc/Slither run in warm worker processes driven by asyncio
+pipes, and cache I/O runs in threads. A single process can hold hundreds
+of HTS lookups open while long audits are compiling.
+
+Admission control keeps the analysis pool from queueing without bound:
+when AUDIT_MAX_QUEUED audits are already waiting for an analysis worker
+(or HTS_MAX_IN_FLIGHT token lookups are running), new requests get 429
+with a Retry-After header instead of waiting. Audit results, the job
+queue and the mirror-node cache are the same SQLite files the Flask app
+uses; the job queue's workers run in this process once it starts.
+"""
+import os
+import json
+import time
+import asyncio
+import functools
+from datetime import datetime
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app import (
+    auditor,
+    audit_cache,
+    audit_jobs,
+    etherscan_sources,
+    llm_analyzer,
+    mirror_client,
+    run_async,
+    HTS_BATCH_MAX_TOKENS,
+    STAGE_TIMEOUT,
+)
+from analysis_worker import AsyncAnalysisWorkerPool
+from mirror_client import AsyncMirrorNodeClient
+from llm_analysis import merge_results
+from etherscan_sources import EtherscanError
+
+AUDIT_ANALYSIS_WORKERS = int(os.getenv("AUDIT_ANALYSIS_WORKERS", "2"))
+# Audits allowed to wait for a busy analysis worker; audits served from the cache never wait
+AUDIT_MAX_QUEUED = int(os.getenv("AUDIT_MAX_QUEUED", str(AUDIT_ANALYSIS_WORKERS * 4)))
+HTS_MAX_IN_FLIGHT = int(os.getenv("HTS_MAX_IN_FLIGHT", "1000"))
+HTS_BATCH_WORKERS = int(os.getenv("HTS_BATCH_WORKERS", "16"))
+RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+
+class Admission:
+    """Non-blocking in-flight counter: admit() either takes `weight` slots or refuses"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+        self.rejected = 0
+
+    def admit(self, weight=1):
+        if self.in_flight + weight > self.limit:
+            self.rejected += 1
+            return False
+        self.in_flight += weight
+        return True
+
+    def release(self, weight=1):
+        self.in_flight -= weight
+
+    def stats(self):
+        return {"limit": self.limit, "in_flight": self.in_flight, "rejected": self.rejected}
+
+
+class WorkerQueueAdmission:
+    """Refuses audits while `limit` of them already wait for an analysis worker.
+
+    Load is read from the pool itself, so audits answered from the cache
+    (which never take a worker) do not count towards the limit.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.pool = None
+        self.rejected = 0
+
+    def admit(self):
+        if self.pool is not None and self.pool.saturated and self.pool.waiting >= self.limit:
+            self.rejected += 1
+            return False
+        return True
+
+    def release(self):
+        pass
+
+    def stats(self):
+        return {"limit": self.limit, "waiting": self.pool.waiting if self.pool else 0, "rejected": self.rejected}
+
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """StreamingResponse that runs `release` once it is over, however it ends.
+
+    The release runs even if the client disconnects before the body
+    generator starts, when neither its finally block nor a background
+    task would run.
+    """
+
+    def __init__(self, content, release, **kwargs):
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+app = FastAPI(title="Smart Contract Auditor")
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+audit_admission = WorkerQueueAdmission(AUDIT_MAX_QUEUED)
+hts_admission = Admission(HTS_MAX_IN_FLIGHT)
+
+# Loop-bound resources, created on startup
+workers = None
+mirror = None
+http = None
+
+
+@app.on_event("startup")
+async def startup():
+    global workers, mirror, http
+    workers = AsyncAnalysisWorkerPool(size=AUDIT_ANALYSIS_WORKERS)
+    audit_admission.pool = workers
+    # Shares the Flask client's SQLite response cache and settings
+    mirror = AsyncMirrorNodeClient(
+        per_host=mirror_client.per_host,
+        max_retries=mirror_client.max_retries,
+        pool_size=int(os.getenv("MIRROR_POOL_SIZE", "100")),
+        cache=mirror_client.cache,
+        max_stale=mirror_client.max_stale,
+    )
+    await mirror.start()
+    http = httpx.AsyncClient()
+    # Jobs queued before a restart resume without waiting for a new submission
+    audit_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await workers.shutdown()
+    await mirror.close()
+    await http.aclose()
+
+
+def too_busy(kind, admission):
+    return JSONResponse(
+        {"error": f"Too many {kind} in progress, retry later", "retry_after": RETRY_AFTER, "limit": admission.limit},
+        status_code=429,
+        headers={"Retry-After": str(RETRY_AFTER)},
+    )
+
+
+async def read_json(request):
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def ndjson(events):
+    return StreamingResponse(events, media_type="application/x-ndjson")
+
+
+async def run_audit_request_async(data):
+    """run_audit_request for the event loop; returns (body, status_code)"""
+    code = data.get('code', '') or data.get('solidity_code', '')
+    token_id = data.get('token_id') or data.get('hedera_token') or data.get('hts_token')
+    address = data.get('address')
+
+    if code and code.strip():
+        report, syntax_result = await auditor.audit_solidity_async(code, workers=workers)
+        return {'success': True, 'report': report, 'syntax': syntax_result}, 200
+
+    if token_id:
+        hts_report = await auditor.analyze_hts_token_async(token_id, mirror)
+        return {'success': True, 'report': hts_report}, 200
+
+    if address:
+        try:
+            project = await etherscan_sources.get_async(
+                http,
+                address,
+                chainid=data.get('chainid', 1),
+                api_key=os.getenv('ETHERSCAN_API_KEY'),
+                refresh=bool(data.get('refresh')),
+            )
+        except EtherscanError as e:
+            body = {'error': str(e)}
+            if e.payload is not None:
+                body['etherscan_raw_response'] = e.payload
+            return body, e.status_code
+        if not project.multi_file:
+            source_code = await asyncio.to_thread(project.read, project.main_path)
+            report, syntax_result = await auditor.audit_solidity_async(source_code, workers=workers)
+            return {'success': True, 'report': report, 'syntax': syntax_result, 'source': source_code}, 200
+        report, syntax_result = await auditor.audit_project_async(project, workers=workers)
+        source_code = await asyncio.to_thread(
+            lambda: '\n\n'.join(f'// File: {path}\n{project.read(path)}' for path in sorted(project.files))
+        )
+        return {'success': True, 'report': report, 'syntax': syntax_result, 'source': source_code, 'project': project.summary()}, 200
+
+    return {'error': 'No input provided. Send either "code" (Solidity) or "token_id" (Hedera HTS) or "address" (Ethereum)'}, 400
+
+
+@app.post("/api/audit")
+async def audit_contract_or_token(request: Request):
+    try:
+        data = await read_json(request)
+        if data.get('async') or request.query_params.get('mode') == 'async':
+            payload = {k: v for k, v in data.items() if k not in ('async', 'callback_url')}
+            try:
+                job_id = await asyncio.to_thread(audit_jobs.submit, payload, data.get('callback_url'))
+            except ValueError as e:
+                return JSONResponse({'error': str(e)}, status_code=400)
+            return JSONResponse({'success': True, 'job_id': job_id, 'status': 'queued', 'status_url': f'/api/audit/{job_id}'}, status_code=202)
+
+        # Token lookups only wait on the mirror node; everything else needs the analysis pool
+        is_hts = not (data.get('code') or data.get('solidity_code') or '').strip() and bool(
+            data.get('token_id') or data.get('hedera_token') or data.get('hts_token'))
+        admission = hts_admission if is_hts else audit_admission
+        if not admission.admit():
+            return too_busy('HTS lookups' if is_hts else 'audits', admission)
+        try:
+            body, status_code = await run_audit_request_async(data)
+        finally:
+            admission.release()
+        return JSONResponse(json.loads(json.dumps(body, default=str)), status_code=status_code)
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+@app.post("/api/audit/llm")
+async def audit_llm_stream(request: Request):
+    """LLM review only, streamed as NDJSON: one line per source chunk, then the merged findings"""
+    data = await read_json(request)
+    code = data.get('code', '') or data.get('solidity_code', '')
+    if not code.strip():
+        return JSONResponse({'error': 'No Solidity code provided'}, status_code=400)
+    if not llm_analyzer:
+        return JSONResponse({'error': 'LLM client not configured'}, status_code=503)
+
+    async def generate():
+        # The LLM client lives on app.py's background loop; step the stream there
+        stream = llm_analyzer.stream(code, timeout=STAGE_TIMEOUT)
+        results = []
+        try:
+            while True:
+                try:
+                    event = await asyncio.wrap_future(run_async(stream.__anext__()))
+                except StopAsyncIteration:
+                    break
+                if 'result' in event:
+                    results.append((event['start_line'], event['result']))
+                yield json.dumps(event, default=str) + '\n'
+        finally:
+            await asyncio.wrap_future(run_async(stream.aclose()))
+        merged = merge_results(result for _, result in sorted(results, key=lambda item: item[0]))
+        yield json.dumps({'done': True, 'merged': merged}, default=str) + '\n'
+
+    return ndjson(generate())
+
+
+@app.get("/api/audit/metrics")
+async def audit_metrics_endpoint():
+    jobs, cache = await asyncio.gather(asyncio.to_thread(audit_jobs.stats), asyncio.to_thread(audit_cache.stats))
+    return {'jobs': jobs, 'audit_cache': cache}
+
+
+@app.get("/api/audit/{job_id}")
+async def audit_job_status(job_id: str):
+    job = await asyncio.to_thread(audit_jobs.get, job_id)
+    if job is None:
+        return JSONResponse({'error': 'Audit job not found'}, status_code=404)
+    return JSONResponse(json.loads(json.dumps({'success': True, **job}, default=str)))
+
+
+@app.post("/api/audit-hts")
+async def audit_hts_endpoint(request: Request):
+    try:
+        data = await read_json(request)
+        token_id = data.get('token_id') or data.get('hedera_token') or data.get('hts_token')
+        if not token_id:
+            return JSONResponse({'error': 'No token_id provided'}, status_code=400)
+        if not hts_admission.admit():
+            return too_busy('HTS lookups', hts_admission)
+        try:
+            report = await auditor.analyze_hts_token_async(token_id, mirror)
+        finally:
+            hts_admission.release()
+        return {'success': True, 'report': report}
+    except Exception as e:
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+@app.post("/api/audit-hts/batch")
+async def audit_hts_batch_endpoint(request: Request):
+    """Audit many HTS tokens concurrently; streams one NDJSON line per token as it finishes"""
+    data = await read_json(request)
+    token_ids = data.get('token_ids') or data.get('tokens') or []
+    if not isinstance(token_ids, list) or not token_ids:
+        return JSONResponse({'error': 'No token_ids provided'}, status_code=400)
+    token_ids = list(dict.fromkeys(str(token_id).strip() for token_id in token_ids if str(token_id).strip()))
+    if len(token_ids) > HTS_BATCH_MAX_TOKENS:
+        return JSONResponse({'error': f'At most {HTS_BATCH_MAX_TOKENS} token_ids per batch'}, status_code=400)
+    # A batch holds as many slots as lookups it runs at once
+    weight = min(len(token_ids), HTS_BATCH_WORKERS)
+    if not hts_admission.admit(weight):
+        return too_busy('HTS lookups', hts_admission)
+
+    async def generate():
+        started = time.monotonic()
+        limit = asyncio.Semaphore(HTS_BATCH_WORKERS)
+
+        async def audit(token_id):
+            async with limit:
+                try:
+                    return token_id, await auditor.analyze_hts_token_async(token_id, mirror)
+                except Exception as e:
+                    return token_id, {'error': str(e)}
+
+        tasks = [asyncio.ensure_future(audit(token_id)) for token_id in token_ids]
+        failed = 0
+        try:
+            for finished in asyncio.as_completed(tasks):
+                token_id, report = await finished
+                ok = 'error' not in report
+                failed += not ok
+                yield json.dumps({'token_id': token_id, 'success': ok, 'report': report}, default=str) + '\n'
+            yield json.dumps({
+                'done': True,
+                'total': len(token_ids),
+                'failed': failed,
+                'duration_ms': round((time.monotonic() - started) * 1000, 1),
+            }) + '\n'
+        finally:
+            # Client went away: drop the lookups still pending
+            for task in tasks:
+                task.cancel()
+
+    return ReleasingStreamingResponse(
+        generate(), functools.partial(hts_admission.release, weight), media_type="application/x-ndjson"
+    )
+
+
+@app.get("/api/health")
+async def health_check():
+    return {
+        'status': 'healthy',
+        'timestamp': datetime.utcnow().isoformat() + 'Z',
+        'audit_cache': await asyncio.to_thread(audit_cache.stats),
+        'mirror_client': mirror.stats(),
+        'analysis_workers': workers.stats(),
+        'admission': {'audits': audit_admission.stats(), 'hts': hts_admission.stats()},
+    }
+
+
+if __name__ == '__main__':
+    uvicorn.run(app, host='0.0.0.0', port=int(os.getenv('PORT', 5000)))
@@ -0,0 +1,285 @@
+import ipaddress
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def check_callback_url(url, allowed_hosts=None):
+    """Raise ValueError unless `url` is a webhook the server may POST to.
+
+    Only http(s) is accepted. With `allowed_hosts` the host must be listed;
+    otherwise every address it resolves to must be public (no loopback,
+    private, link-local or reserved ranges).
+    """
+    parts = urlsplit(url) if isinstance(url, str) else None
+    if parts is None or parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http(s) URL")
+    host = parts.hostname.lower()
+    if allowed_hosts:
+        if host not in allowed_hosts:
+            raise ValueError(f"callback_url host {host} is not allowed")
+        return
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        addresses = {info[4][0] for info in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, ValueError) as e:
+        raise ValueError(f"callback_url host {host} does not resolve: {e}")
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url host {host} resolves to a non-public address")
+
+
+class AuditMetrics:
+    """In-process counters for queue sizing: job wait/run times and per-stage timings"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings = {}
+
+    def observe(self, name, seconds):
+        with self._lock:
+            entry = self.timings.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = seconds * 1000
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: {
+                    "count": entry["count"],
+                    "avg_ms": round(entry["total_ms"] / entry["count"], 1) if entry["count"] else 0.0,
+                    "max_ms": round(entry["max_ms"], 1),
+                }
+                for name, entry in self.timings.items()
+            }
+
+
+class AuditJobQueue:
+    """Durable audit job queue on SQLite, drained by a bounded pool of worker threads.
+
+    `handler(payload)` must return (body, status_code). Several processes
+    may share the database: a claimed job carries its worker process as
+    owner and a lease that a heartbeat thread renews every lease/3
+    seconds. Only jobs whose lease expired (their process died) are put
+    back in the queue. If a job carries a callback_url, the finished job
+    is POSTed there; submit() rejects callback URLs that fail
+    check_callback_url, and the address is checked again before posting.
+    """
+
+    def __init__(self, path, handler, workers=2, metrics=None, retention=24 * 3600, callback_timeout=10, lease=60,
+                 callback_hosts=None):
+        self.path = path
+        self.handler = handler
+        self.workers = workers
+        self.metrics = metrics or AuditMetrics()
+        self.retention = retention
+        self.callback_timeout = callback_timeout
+        self.lease = lease
+        self.callback_hosts = {host.lower() for host in callback_hosts or ()}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wakeup = threading.Condition()
+        self._threads = []
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                callback_url TEXT,
+                result TEXT,
+                status_code INTEGER,
+                error TEXT,
+                callback_status TEXT,
+                created REAL NOT NULL,
+                started REAL,
+                finished REAL,
+                owner TEXT,
+                lease_until REAL
+            )"""
+        )
+        # Databases created before leases existed
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created)")
+
+    def start(self):
+        """Re-queue jobs whose lease expired and start the worker and heartbeat threads (idempotent)"""
+        with self._start_lock:
+            if self._threads:
+                return
+            self._requeue_expired()
+            threads = [threading.Thread(target=self._heartbeat, name="audit-job-heartbeat", daemon=True)]
+            threads += [
+                threading.Thread(target=self._worker, name=f"audit-job-{index}", daemon=True)
+                for index in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            self._threads = threads
+
+    def submit(self, payload, callback_url=None):
+        """Queue a job; raises ValueError for a callback_url the server must not call"""
+        if callback_url:
+            check_callback_url(callback_url, self.callback_hosts)
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, payload, callback_url, created) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(payload), callback_url, time.time()),
+            )
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, result, status_code, error, callback_status, created, started, finished "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, status, result, status_code, error, callback_status, created, started, finished = row
+        job = {
+            "job_id": job_id,
+            "status": status,
+            "created_at": created,
+            "started_at": started,
+            "finished_at": finished,
+        }
+        if status in ("queued", "running"):
+            job["queue_position"] = self._position(created) if status == "queued" else 0
+        if result is not None:
+            job["status_code"] = status_code
+            job["result"] = json.loads(result)
+        if error:
+            job["error"] = error
+        if callback_status:
+            job["callback_status"] = callback_status
+        return job
+
+    def _position(self, created):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created < ?", (created,)
+            ).fetchone()[0] + 1
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {
+            "workers": self.workers,
+            "queue_depth": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "timings": self.metrics.snapshot(),
+        }
+
+    def _claim(self):
+        """Atomically move the oldest queued job to running, leased to this process"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "UPDATE jobs SET status = 'running', started = ?, owner = ?, lease_until = ? "
+                "WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created LIMIT 1) "
+                "AND status = 'queued' RETURNING id, payload, callback_url, created",
+                (now, self.owner, now + self.lease),
+            ).fetchone()
+        return row
+
+    def _requeue_expired(self):
+        """Put back running jobs whose owner stopped renewing its lease"""
+        with self._lock:
+            requeued = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started = NULL, owner = NULL, lease_until = NULL "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (time.time(),),
+            ).rowcount
+        if requeued:
+            logger.warning("Re-queued %d audit jobs with expired leases", requeued)
+            with self._wakeup:
+                self._wakeup.notify_all()
+
+    def _heartbeat(self):
+        while True:
+            time.sleep(self.lease / 3)
+            try:
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE jobs SET lease_until = ? WHERE status = 'running' AND owner = ?",
+                        (time.time() + self.lease, self.owner),
+                    )
+                self._requeue_expired()
+            except sqlite3.Error as e:
+                logger.warning("Audit job heartbeat failed: %s", e)
+
+    def _worker(self):
+        while True:
+            claimed = self._claim()
+            if claimed is None:
+                # Other processes may share the database, so poll as well as wait
+                with self._wakeup:
+                    self._wakeup.wait(timeout=1.0)
+                continue
+            job_id, payload, callback_url, created = claimed
+            started = time.time()
+            self.metrics.observe("job_wait", started - created)
+            try:
+                body, status_code = self.handler(json.loads(payload))
+                status, error = ("done" if status_code < 500 else "failed"), None
+            except Exception as e:
+                body, status_code, status, error = {"error": str(e)}, 500, "failed", str(e)
+            finished = time.time()
+            self.metrics.observe("job_run", finished - started)
+            with self._lock:
+                updated = self._conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, status_code = ?, error = ?, finished = ?, lease_until = NULL "
+                    "WHERE id = ? AND owner = ? AND status = 'running'",
+                    (status, json.dumps(body, default=str), status_code, error, finished, job_id, self.owner),
+                ).rowcount
+            if not updated:
+                # Lease lost (e.g. a long stall) and the job was handed to another worker
+                logger.warning("Audit job %s was re-queued while running here; dropping this result", job_id)
+                continue
+            if callback_url:
+                self._notify(job_id, callback_url)
+            self._prune(finished)
+
+    def _notify(self, job_id, callback_url):
+        try:
+            # The host may resolve elsewhere by now; redirects could point anywhere
+            check_callback_url(callback_url, self.callback_hosts)
+            r = requests.post(callback_url, json=self.get(job_id), timeout=self.callback_timeout, allow_redirects=False)
+            callback_status = f"delivered ({r.status_code})"
+        except Exception as e:
+            callback_status = f"failed: {e}"
+            logger.warning("Audit job %s callback to %s failed: %s", job_id, callback_url, e)
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET callback_status = ? WHERE id = ?", (callback_status, job_id))
+
+    def _prune(self, now):
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished < ?", (now - self.retention,)
+            )
@@ -0,0 +1,113 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+CacheEntry = namedtuple("CacheEntry", ["value", "created", "expires", "meta", "fresh"])
+
+
+class SQLiteCache:
+    """Small key/value cache on SQLite with per-entry TTL and a total size budget.
+
+    Values are JSON-encoded. The database runs in WAL mode so several
+    worker processes can share one file. When the stored payloads exceed
+    max_bytes, the least recently read entries are evicted first.
+
+    Each process keeps an estimate of the stored bytes, raised by its own
+    writes; the exact total is only summed when the estimate crosses
+    max_bytes, and writes from other processes are picked up then.
+    Eviction frees down to EVICT_TO of the budget so that a full cache
+    does not recount on every write.
+    """
+
+    EVICT_TO = 0.9
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, default_ttl=7 * 24 * 3600):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL,
+                meta TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._estimated_bytes = self._total()
+
+    def get(self, key, allow_stale=False):
+        """Return a CacheEntry, or None if missing (or expired unless allow_stale)"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created, expires, meta FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (row[2] <= now and not allow_stale):
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        value, created, expires, meta = row
+        return CacheEntry(json.loads(value), created, expires, json.loads(meta) if meta else None, expires > now)
+
+    def set(self, key, value, ttl=None, meta=None):
+        payload = json.dumps(value, default=str)
+        if len(payload) > self.max_bytes:
+            return
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created, expires, accessed, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now + ttl, now, json.dumps(meta) if meta is not None else None),
+            )
+            # Replaced entries are not subtracted: the estimate only errs high
+            self._estimated_bytes += len(payload)
+            if self._estimated_bytes > self.max_bytes:
+                self._evict(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _total(self):
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def _evict(self, now):
+        total = self._total()
+        if total <= self.max_bytes:
+            self._estimated_bytes = total
+            return
+        # Drop long-expired entries first, then the least recently read ones
+        self._conn.execute("DELETE FROM entries WHERE expires <= ?", (now - self.default_ttl,))
+        total = self._total()
+        rows = self._conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC").fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes * self.EVICT_TO:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+        self._estimated_bytes = total
+
+    def stats(self):
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
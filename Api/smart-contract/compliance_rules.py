@@ -0,0 +1,290 @@
+import re
+from bisect import bisect_right
+from collections import defaultdict
+
+
+class Token:
+    """A named pattern the scanner looks for: literal text (the name by default) or a lowercase regex"""
+
+    __slots__ = ("name", "literal", "pattern", "first_char")
+
+    def __init__(self, name, pattern=None, regex=False):
+        self.name = name
+        source = name if pattern is None else pattern
+        self.literal = None if regex else source.lower()
+        self.pattern = source if regex else re.escape(self.literal)
+        # Regex tokens that start with a plain character can still use the first-character prefilter
+        self.first_char = source[0] if regex and re.escape(source[0]) == source[0] else None
+
+
+def literals(*names):
+    return [Token(name) for name in names]
+
+
+class Scan:
+    """Token hits for one (lowercased) source: name -> match offsets, plus a line-offset table"""
+
+    def __init__(self, code, hits):
+        self.code = code
+        self.hits = hits
+        self._line_starts = None
+
+    def has(self, name):
+        return name in self.hits
+
+    def has_any(self, names):
+        return any(name in self.hits for name in names)
+
+    @property
+    def line_starts(self):
+        if self._line_starts is None:
+            starts = [0]
+            starts.extend(match.end() for match in re.finditer("\n", self.code))
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_of(self, offset):
+        return bisect_right(self.line_starts, offset)
+
+    def line_text(self, line_no):
+        starts = self.line_starts
+        start = starts[line_no - 1]
+        end = starts[line_no] - 1 if line_no < len(starts) else len(self.code)
+        return self.code[start:end]
+
+    def lines_with(self, names):
+        return {self.line_of(offset) for name in names for offset in self.hits.get(name, ())}
+
+
+class InterfaceRule:
+    """Reports which signatures of a standard interface are present (and, optionally, missing)"""
+
+    def __init__(self, standard, signatures, found, partial=None):
+        self.standard = standard
+        self.signatures = signatures
+        self.found = found
+        self.partial = partial
+
+    def tokens(self):
+        return literals(*self.signatures)
+
+    def evaluate(self, scan):
+        present = [sig for sig in self.signatures if scan.has(sig)]
+        if not present:
+            return []
+        missing = [sig for sig in self.signatures if not scan.has(sig)]
+        if self.partial and missing:
+            return [dict(self.partial, standard=self.standard, details={"present": present, "missing": missing})]
+        finding = dict(self.found, standard=self.standard)
+        if not self.partial:
+            finding["details"] = {"present": present}
+        return [finding]
+
+
+class MatchRule:
+    """One finding per match of `patterns`, unless its line also carries one of the `unless_on_line` tokens"""
+
+    def __init__(self, patterns, finding, unless_on_line=(), hint=None):
+        self.patterns = patterns
+        self.finding = finding
+        self.unless_on_line = unless_on_line
+        self.hint = hint
+
+    def tokens(self):
+        return self.patterns + literals(*self.unless_on_line)
+
+    def evaluate(self, scan):
+        guarded = scan.lines_with(self.unless_on_line)
+        findings = []
+        for token in self.patterns:
+            for offset in scan.hits.get(token.name, ()):
+                line_no = scan.line_of(offset)
+                if line_no in guarded:
+                    continue
+                details = {"signature": scan.line_text(line_no).strip()}
+                if self.hint:
+                    details["hint"] = self.hint
+                findings.append(dict(self.finding, line=line_no, details=details))
+        return findings
+
+
+class PresenceRule:
+    """`found` when any keyword of any group occurs, `absent` otherwise; groups are reported as flags"""
+
+    def __init__(self, groups, found=None, absent=None, report_groups=False):
+        self.groups = groups
+        self.found = found
+        self.absent = absent
+        self.report_groups = report_groups
+
+    def tokens(self):
+        return literals(*(name for names in self.groups.values() for name in names))
+
+    def evaluate(self, scan):
+        flags = {group: scan.has_any(names) for group, names in self.groups.items()}
+        if not any(flags.values()):
+            return [dict(self.absent)] if self.absent else []
+        if not self.found:
+            return []
+        finding = dict(self.found)
+        if self.report_groups:
+            finding["details"] = flags
+        return [finding]
+
+
+class RuleEngine:
+    """Compiles every rule's tokens into one regex and evaluates all rules from a single scan.
+
+    Literal tokens are folded into a prefix trie, so the cost per offset
+    does not grow with the number of signatures; regex tokens are tried
+    after the trie. The whole alternation sits in a lookahead, so
+    overlapping tokens (e.g. "pause" inside "function pause(") are all
+    reported, and a leading first-character class lets the regex engine
+    skip offsets that cannot start a token. Matching runs on the
+    lowercased source (regex tokens must be written in lowercase); when
+    several tokens start at the same offset, the longest literal wins.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names, patterns = [], {}
+        for rule in self.rules:
+            for token in rule.tokens():
+                if token.name not in patterns:
+                    names.append(token.name)
+                    patterns[token.name] = token
+        self.token_names = names
+
+        literal_index, alternatives, first_chars = {}, [], set()
+        for index, name in enumerate(names):
+            token = patterns[name]
+            if token.literal is not None:
+                literal_index[token.literal] = index
+                first_chars.add(token.literal[0])
+            else:
+                alternatives.append(f"(?P<t{index}>{token.pattern})")
+                first_chars.add(token.first_char)
+        if literal_index:
+            alternatives.insert(0, self._trie(literal_index))
+        combined = f"(?=(?:{'|'.join(alternatives)}))"
+        if None not in first_chars:
+            combined = f"(?=[{''.join(re.escape(ch) for ch in sorted(first_chars))}])" + combined
+        self.regex = re.compile(combined)
+
+    @staticmethod
+    def _trie(words):
+        root = {}
+        for word, index in words.items():
+            node = root
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[""] = index
+
+        def emit(node):
+            # Longer continuations first so the longest literal wins
+            branches = [re.escape(ch) + emit(child) for ch, child in node.items() if ch]
+            if "" in node:
+                branches.append(f"(?P<t{node['']}>)")
+            return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+        return emit(root)
+
+    def scan(self, code):
+        # lower() never adds or removes newlines, so line numbers match the original
+        lowered = code.lower()
+        hits = defaultdict(list)
+        names = self.token_names
+        for match in self.regex.finditer(lowered):
+            hits[names[int(match.lastgroup[1:])]].append(match.start())
+        return Scan(lowered, hits)
+
+    def evaluate(self, code):
+        scan = self.scan(code)
+        findings = []
+        for rule in self.rules:
+            findings.extend(rule.evaluate(scan))
+        return findings
+
+
+ERC20_SIGNATURES = [
+    "function totalsupply(", "function balanceof(", "function transfer(", "function transferfrom(",
+    "function approve(", "function allowance(", "event transfer(", "event approval(",
+]
+ERC721_SIGNATURES = ["function ownerof(", "function safetransferfrom(", "function transferfrom(", "event transfer(", "event approval("]
+
+SOLIDITY_RULES = [
+    InterfaceRule(
+        "ERC20",
+        ERC20_SIGNATURES,
+        found={
+            "category": "erc_standard",
+            "severity": "low",
+            "title": "ERC20 interface detected",
+            "description": "Contract exposes core ERC20 interface elements.",
+        },
+        partial={
+            "category": "erc_standard",
+            "severity": "medium",
+            "title": "Partial ERC20 interface detected",
+            "description": "Some ERC20 functions detected but others are missing.",
+        },
+    ),
+    InterfaceRule(
+        "ERC721",
+        ERC721_SIGNATURES,
+        found={
+            "category": "erc_standard",
+            "severity": "low",
+            "title": "ERC721-like interface detected",
+            "description": "The contract exposes ERC721-like functions/events.",
+        },
+    ),
+    MatchRule(
+        [
+            Token("sensitive:mint", r"function\s+mint\s*\(", regex=True),
+            Token("sensitive:burn", r"function\s+burn\s*\(", regex=True),
+            Token("sensitive:pause", r"function\s+pause\s*\(", regex=True),
+        ],
+        finding={
+            "category": "access_control",
+            "standard": "AccessControl / Ownable",
+            "severity": "high",
+            "title": "Sensitive function without explicit access control",
+            "description": "Sensitive function is not obviously protected by an access-control modifier.",
+        },
+        unless_on_line=("onlyowner", "only_role"),
+        hint="Consider OpenZeppelin Ownable / AccessControl.",
+    ),
+    PresenceRule(
+        {"access": ["@openzeppelin", "openzeppelin/contracts/access", "onlyowner", "accesscontrol"]},
+        found={
+            "category": "access_control",
+            "standard": "OpenZeppelin",
+            "severity": "low",
+            "title": "Access control pattern detected",
+            "description": "Contract appears to use OpenZeppelin-style access control.",
+        },
+    ),
+    PresenceRule(
+        {
+            "blacklist": ["blacklist", "blocked"],
+            "whitelist": ["whitelist", "kyc"],
+            "pause": ["paused", "pause"],
+        },
+        found={
+            "category": "kyc_aml",
+            "severity": "low",
+            "title": "Basic restriction mechanics detected",
+            "description": "Blacklists/whitelists/pausable logic found; ensure consistent enforcement.",
+        },
+        absent={
+            "category": "kyc_aml",
+            "severity": "medium",
+            "title": "No explicit transfer restrictions detected",
+            "description": "No blacklist/whitelist/pausable mechanics detected.",
+        },
+        report_groups=True,
+    ),
+]
+
+solidity_rules = RuleEngine(SOLIDITY_RULES)
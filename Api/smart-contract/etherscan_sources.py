@@ -0,0 +1,257 @@
+import asyncio
+import hashlib
+import json
+import os
+import posixpath
+import re
+import tempfile
+import time
+
+import requests
+
+ETHERSCAN_API = "https://api.etherscan.io/v2/api"
+
+# Vendored dependencies are compiled and run through Slither, but not sent to the LLM
+DEPENDENCY_PREFIXES = ("@", "lib/", "node_modules/", "dependencies/")
+
+ADDRESS_RE = re.compile(r"0x[0-9a-fA-F]{40}")
+
+
+class EtherscanError(Exception):
+    def __init__(self, message, status_code=502, payload=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.payload = payload
+
+
+def _sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _checked_target(address, chainid):
+    """Validate request input before it reaches a cache path or Etherscan; returns (address, chainid)"""
+    if not isinstance(address, str) or not ADDRESS_RE.fullmatch(address):
+        raise EtherscanError(f"Invalid address: {address!r}", 400)
+    try:
+        chainid = int(chainid)
+    except (TypeError, ValueError):
+        raise EtherscanError(f"Invalid chainid: {chainid!r}", 400)
+    if chainid <= 0:
+        raise EtherscanError(f"Invalid chainid: {chainid!r}", 400)
+    return address, chainid
+
+
+def _safe_path(path):
+    """Project-relative POSIX path; rejects absolute paths and '..' escapes"""
+    normalized = posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+    if not normalized or normalized == "." or normalized.startswith("../") or normalized == "..":
+        raise EtherscanError(f"Unsafe source path in Etherscan response: {path}", 502)
+    return normalized
+
+
+def parse_etherscan_source(result):
+    """Split one getsourcecode result into ({path: content}, remappings, main_path).
+
+    Etherscan returns either a plain source, a JSON object of
+    {path: {"content": ...}}, or a standard-JSON input wrapped in an
+    extra pair of braces ("{{...}}").
+    """
+    source = result.get("SourceCode", "") or result.get("sourceCode", "")
+    name = result.get("ContractName") or "Contract"
+    text = source.strip()
+    if not text.startswith("{"):
+        path = f"{name}.sol"
+        return {path: source}, [], path
+
+    if text.startswith("{{") and text.endswith("}}"):
+        text = text[1:-1]
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        path = f"{name}.sol"
+        return {path: source}, [], path
+    sources = parsed.get("sources", parsed) if isinstance(parsed, dict) else {}
+    remappings = list((parsed.get("settings") or {}).get("remappings") or [])
+    files = {}
+    for path, meta in sources.items():
+        content = meta.get("content") if isinstance(meta, dict) else None
+        if content:
+            files[_safe_path(path)] = content
+
+    # The verified contract is the file declaring ContractName, preferring non-dependency paths
+    declaration = re.compile(rf"\b(?:contract|library|interface)\s+{re.escape(name)}\b")
+    candidates = [path for path, content in files.items() if declaration.search(content)]
+    candidates.sort(key=lambda path: (path.startswith(DEPENDENCY_PREFIXES), len(path)))
+    main_path = candidates[0] if candidates else next(iter(files), None)
+    return files, remappings, main_path
+
+
+class SourceProject:
+    """A verified contract's sources, materialized as a directory solc can compile with its remappings"""
+
+    def __init__(self, root, files, remappings, main_path, contract_name=None, compiler_version=None):
+        self.root = root
+        self.files = files  # path -> sha256 of content
+        self.remappings = remappings
+        self.main_path = main_path
+        self.contract_name = contract_name
+        self.compiler_version = compiler_version
+
+    @property
+    def digest(self):
+        """Identity of the whole compilation: every file's hash plus the remappings"""
+        manifest = json.dumps({"files": sorted(self.files.items()), "remappings": self.remappings})
+        return _sha256(manifest)
+
+    @property
+    def multi_file(self):
+        return len(self.files) > 1
+
+    def read(self, path):
+        with open(os.path.join(self.root, path), encoding="utf-8") as f:
+            return f.read()
+
+    def is_dependency(self, path):
+        return path.startswith(DEPENDENCY_PREFIXES)
+
+    def summary(self):
+        return {
+            "contract_name": self.contract_name,
+            "compiler_version": self.compiler_version,
+            "main_file": self.main_path,
+            "files": sorted(self.files),
+            "remappings": self.remappings,
+            "source_hash": self.digest,
+        }
+
+
+class EtherscanSourceStore:
+    """Content-addressed on-disk store of verified sources fetched from Etherscan.
+
+    Layout under `root`:
+      blobs/<aa>/<sha256>            file contents, shared across contracts
+      addresses/<chain>/<addr>.json  manifest: path -> sha256, remappings, metadata
+      projects/<digest>/             materialized project directories
+
+    Verified source for an address does not change, so manifests are
+    reused until `refresh=True`.
+    """
+
+    def __init__(self, root, api_url=ETHERSCAN_API, session=None, timeout=15):
+        self.root = root
+        self.api_url = api_url
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        for directory in ("blobs", "addresses", "projects"):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _manifest_path(self, chainid, address):
+        return os.path.join(self.root, "addresses", str(chainid), f"{address.lower()}.json")
+
+    @staticmethod
+    def _write_atomic(path, data):
+        # Several worker processes may write the same entry; rename keeps readers consistent
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def put_blob(self, content):
+        digest = _sha256(content)
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            self._write_atomic(path, content)
+        return digest
+
+    def get(self, address, chainid=1, api_key=None, refresh=False):
+        """Return the SourceProject for a verified address, fetching from Etherscan on a miss"""
+        address, chainid = _checked_target(address, chainid)
+        manifest = None if refresh else self._load_manifest(chainid, address)
+        if manifest is None:
+            params = self._params(address, chainid, api_key)
+            response = self.session.get(self.api_url, params=params, timeout=self.timeout)
+            manifest = self._save_manifest(address, chainid, response)
+        return self.materialize(manifest)
+
+    async def get_async(self, client, address, chainid=1, api_key=None, refresh=False):
+        """get() for the ASGI app: the Etherscan call goes through an httpx.AsyncClient, disk work runs in a thread"""
+        address, chainid = _checked_target(address, chainid)
+        manifest = None if refresh else await asyncio.to_thread(self._load_manifest, chainid, address)
+        if manifest is None:
+            params = self._params(address, chainid, api_key)
+            response = await client.get(self.api_url, params=params, timeout=self.timeout)
+            manifest = await asyncio.to_thread(self._save_manifest, address, chainid, response)
+        return await asyncio.to_thread(self.materialize, manifest)
+
+    def _load_manifest(self, chainid, address):
+        manifest_path = self._manifest_path(chainid, address)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if not all(os.path.exists(self._blob_path(digest)) for digest in manifest["files"].values()):
+            return None
+        return manifest
+
+    @staticmethod
+    def _params(address, chainid, api_key):
+        if not api_key:
+            raise EtherscanError("ETHERSCAN_API_KEY not configured in backend environment", 500)
+        return {"chainid": chainid, "module": "contract", "action": "getsourcecode", "address": address, "apikey": api_key}
+
+    def _save_manifest(self, address, chainid, response):
+        """Store the sources from a getsourcecode response (requests or httpx) and write the address manifest"""
+        if response.status_code != 200:
+            raise EtherscanError("Failed to fetch contract source from Etherscan", 502)
+        payload = response.json()
+        result_list = payload.get("result", [])
+        if not result_list or not isinstance(result_list, list):
+            raise EtherscanError("Contract source not found or not verified on Etherscan", 404, payload)
+        result = result_list[0]
+        files, remappings, main_path = parse_etherscan_source(result)
+        if not files:
+            raise EtherscanError("Contract source empty or not verified on Etherscan", 404)
+        manifest = {
+            "address": address.lower(),
+            "chainid": chainid,
+            "contract_name": result.get("ContractName"),
+            "compiler_version": result.get("CompilerVersion"),
+            "fetched_at": time.time(),
+            "main_path": main_path,
+            "remappings": remappings,
+            "files": {path: self.put_blob(content) for path, content in files.items()},
+        }
+        self._write_atomic(self._manifest_path(chainid, address), json.dumps(manifest, indent=2))
+        return manifest
+
+    def materialize(self, manifest):
+        """Write (once) a project directory for this exact set of files"""
+        project = SourceProject(
+            root=None,
+            files=dict(manifest["files"]),
+            remappings=manifest.get("remappings") or [],
+            main_path=manifest.get("main_path"),
+            contract_name=manifest.get("contract_name"),
+            compiler_version=manifest.get("compiler_version"),
+        )
+        root = os.path.join(self.root, "projects", project.digest)
+        marker = os.path.join(root, ".complete")
+        if not os.path.exists(marker):
+            for path, digest in project.files.items():
+                target = os.path.join(root, path)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                if not os.path.exists(target):
+                    try:
+                        os.link(self._blob_path(digest), target)
+                    except OSError:
+                        with open(self._blob_path(digest), encoding="utf-8") as f:
+                            self._write_atomic(target, f.read())
+            if project.remappings:
+                self._write_atomic(os.path.join(root, "remappings.txt"), "\n".join(project.remappings) + "\n")
+            self._write_atomic(marker, "")
+        project.root = root
+        return project
@@ -0,0 +1,309 @@
+"""Chunked LLM review of Solidity sources.
+
+Large (flattened) sources are split at contract boundaries, and oversized
+contracts at function boundaries, so every prompt stays under a size
+budget. Chunks are sent concurrently under a semaphore and each one's
+findings are reported as soon as it returns; the merged result drops
+duplicates that several chunks report for the same line.
+
+Chunks are line-numbered with their position in the full source, so the
+line numbers in findings refer to the original contract.
+"""
+import asyncio
+import json
+import re
+
+SEVERITY_ORDER = {"critical": 4, "high": 3, "medium": 2, "low": 1, "info": 0}
+
+SYSTEM_PROMPT = "You are a smart contract security expert. Answer with a single JSON object and nothing else."
+
+# Comments and string literals are skipped so their braces do not count
+_BRACES = re.compile(r"//[^\n]*|/\*.*?\*/|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|[{}]", re.S)
+_DECLARATION = re.compile(r"^\s*(?:abstract\s+)?(?:contract|library|interface)\s+(\w+)", re.M)
+
+
+def _brace_ends(code):
+    """Offsets just after every '}' that closes back to depth 0 (units) or depth 1 (members)"""
+    units, members = [], []
+    depth = 0
+    for match in _BRACES.finditer(code):
+        token = match.group()
+        if token == "{":
+            depth += 1
+        elif token == "}":
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                units.append(match.end())
+            elif depth == 1:
+                members.append(match.end())
+    return units, members
+
+
+def _line_pieces(text, max_chars):
+    pieces, current = [], ""
+    for line in text.splitlines(keepends=True):
+        if current and len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_source(code, max_chars=24000):
+    """Split into chunks of at most ~max_chars: {"name", "start_line", "end_line", "code"}"""
+    units, members = _brace_ends(code)
+    # Top-level units (contract/library/interface plus the pragmas and comments before them)
+    bounds = [0] + units
+    if bounds[-1] < len(code):
+        bounds.append(len(code))
+    segments = []
+    for start, end in zip(bounds, bounds[1:]):
+        segment = code[start:end]
+        if len(segment) <= max_chars:
+            segments.append((start, segment))
+            continue
+        # Oversized contract: cut after its functions / modifiers / structs
+        cuts = [start] + [offset for offset in members if start < offset < end] + [end]
+        for piece_start, piece_end in zip(cuts, cuts[1:]):
+            piece = code[piece_start:piece_end]
+            offset = piece_start
+            for part in (_line_pieces(piece, max_chars) if len(piece) > max_chars else [piece]):
+                segments.append((offset, part))
+                offset += len(part)
+
+    # Pack consecutive segments greedily so small contracts share a prompt
+    chunks, current_start, current = [], 0, ""
+    for start, segment in segments:
+        if current and len(current) + len(segment) > max_chars and segment.strip():
+            chunks.append((current_start, current))
+            current = ""
+        if not current:
+            current_start = start
+        current += segment
+    if current.strip():
+        chunks.append((current_start, current))
+
+    result = []
+    for start, text in chunks:
+        start_line = code.count("\n", 0, start) + 1
+        names = _DECLARATION.findall(text)
+        if not names:
+            # A continuation of a split contract: name it after the declaration it belongs to
+            previous = _DECLARATION.findall(code, 0, start)
+            names = [f"{previous[-1]} (continued)"] if previous else ["source"]
+        result.append({
+            "name": ", ".join(names),
+            "start_line": start_line,
+            "end_line": start_line + text.rstrip("\n").count("\n"),
+            "code": text,
+        })
+    return result
+
+
+def number_lines(text, start_line):
+    return "\n".join(f"{start_line + index:>5} | {line}" for index, line in enumerate(text.rstrip("\n").split("\n")))
+
+
+def build_prompt(chunk, total_chunks):
+    scope = (
+        f"This is part of a larger source ({chunk['name']}, lines {chunk['start_line']}-{chunk['end_line']}); "
+        "only report issues visible in this part.\n"
+        if total_chunks > 1 else ""
+    )
+    return f"""Analyze this Solidity smart contract for security vulnerabilities and best practices. Provide a detailed analysis including:
+1. Security vulnerabilities (critical, high, medium, low)
+2. Gas optimization opportunities
+3. Best practices violations
+4. Specific line numbers and fixes
+{scope}
+Each line is prefixed with its line number; use those numbers for "line".
+
+Contract code:
+{number_lines(chunk['code'], chunk['start_line'])}
+
+Return JSON with fields: vulnerabilities (list of {{"severity", "title", "description", "line", "fix"}}), gas_optimizations, best_practices
+"""
+
+
+def extract_json(content):
+    """Parse a JSON object from model output, tolerating code fences and surrounding prose"""
+    if not content:
+        return None
+    text = content.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.S)
+    candidates = [text] + ([fenced.group(1)] if fenced else [])
+    start, end = text.find("{"), text.rfind("}")
+    if start != -1 and end > start:
+        candidates.append(text[start:end + 1])
+    for candidate in candidates:
+        try:
+            parsed = json.loads(candidate)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return parsed
+    return None
+
+
+def _normalize_vulnerability(vuln):
+    if not isinstance(vuln, dict):
+        vuln = {"title": str(vuln)}
+    severity = str(vuln.get("severity") or "low").lower()
+    line = vuln.get("line")
+    try:
+        line = int(line) if line not in (None, "") else None
+    except (TypeError, ValueError):
+        line = None
+    return {
+        "severity": severity if severity in SEVERITY_ORDER else "low",
+        "title": vuln.get("title") or vuln.get("name") or "Untitled finding",
+        "description": vuln.get("description", ""),
+        "line": line,
+        "fix": vuln.get("fix") or vuln.get("recommendation"),
+    }
+
+
+def _text_key(value):
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+    return re.sub(r"\W+", " ", text.lower()).strip()
+
+
+def dedupe_findings(vulnerabilities):
+    """One finding per (file, title, line); the most severe copy wins, first-seen order is kept.
+
+    Findings without a line number are only merged when their descriptions match too.
+    """
+    merged = {}
+    for vuln in vulnerabilities:
+        line = vuln.get("line") or None
+        key = (vuln.get("file"), _text_key(vuln.get("title") or ""), line,
+               None if line else _text_key(vuln.get("description") or ""))
+        current = merged.get(key)
+        if current is None or SEVERITY_ORDER.get(vuln.get("severity"), 0) > SEVERITY_ORDER.get(current.get("severity"), 0):
+            merged[key] = vuln
+    return list(merged.values())
+
+
+def dedupe_notes(notes):
+    seen, result = set(), []
+    for note in notes:
+        key = _text_key(note)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(note)
+    return result
+
+
+def merge_results(results):
+    merged = {"vulnerabilities": [], "gas_optimizations": [], "best_practices": []}
+    for result in results:
+        merged["vulnerabilities"].extend(result.get("vulnerabilities") or [])
+        merged["gas_optimizations"].extend(result.get("gas_optimizations") or [])
+        merged["best_practices"].extend(result.get("best_practices") or [])
+    merged["vulnerabilities"] = dedupe_findings(merged["vulnerabilities"])
+    merged["gas_optimizations"] = dedupe_notes(merged["gas_optimizations"])
+    merged["best_practices"] = dedupe_notes(merged["best_practices"])
+    return merged
+
+
+class ChunkedLLMAnalyzer:
+    """Runs the Solidity review prompt over source chunks with bounded concurrency"""
+
+    def __init__(self, client, model, max_chars=24000, concurrency=4, max_tokens=2000, temperature=0.1):
+        self.client = client
+        self.model = model
+        self.max_chars = max_chars
+        self.concurrency = concurrency
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    @property
+    def fingerprint(self):
+        return f"model={self.model};chunk={self.max_chars}"
+
+    def _limit(self):
+        # Shared by every audit on the event loop, so concurrency is a global cap
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def analyze_chunk(self, chunk, total_chunks, timeout=None):
+        async with self._limit():
+            response = await self.client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": build_prompt(chunk, total_chunks)},
+                ],
+                max_tokens=self.max_tokens,
+                temperature=self.temperature,
+                timeout=timeout,
+            )
+        content = response.choices[0].message.content
+        parsed = extract_json(content)
+        if parsed is None:
+            return {"vulnerabilities": [], "gas_optimizations": [], "best_practices": [], "raw_response": content}
+        return {
+            "vulnerabilities": [_normalize_vulnerability(v) for v in parsed.get("vulnerabilities") or []],
+            "gas_optimizations": parsed.get("gas_optimizations") or [],
+            "best_practices": parsed.get("best_practices") or [],
+        }
+
+    async def stream(self, code, timeout=None):
+        """Yield {"chunk", "start_line", "end_line", "result" | "error"} per chunk as each one finishes"""
+        chunks = split_source(code, self.max_chars)
+
+        async def run(chunk):
+            try:
+                return chunk, await self.analyze_chunk(chunk, len(chunks), timeout=timeout), None
+            except Exception as e:
+                return chunk, None, str(e) or type(e).__name__
+
+        tasks = [asyncio.ensure_future(run(chunk)) for chunk in chunks]
+        try:
+            for index, finished in enumerate(asyncio.as_completed(tasks)):
+                chunk, result, error = await finished
+                event = {
+                    "chunk": chunk["name"],
+                    "start_line": chunk["start_line"],
+                    "end_line": chunk["end_line"],
+                    "index": index + 1,
+                    "total": len(chunks),
+                }
+                if error is None:
+                    event["result"] = result
+                else:
+                    event["error"] = error
+                yield event
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def analyze(self, code, timeout=None):
+        """Merged findings over all chunks; failed chunks are listed under "chunk_errors" """
+        results, errors, raw = [], [], []
+        total = 0
+        async for event in self.stream(code, timeout=timeout):
+            total = event["total"]
+            if "error" in event:
+                errors.append({"chunk": event["chunk"], "start_line": event["start_line"], "error": event["error"]})
+                continue
+            results.append((event["start_line"], event["result"]))
+            if event["result"].get("raw_response"):
+                raw.append(event["result"]["raw_response"])
+        # Merge in source order, not completion order, so reports are stable
+        merged = merge_results(result for _, result in sorted(results, key=lambda item: item[0]))
+        merged["chunks"] = {"total": total, "completed": len(results), "failed": len(errors)}
+        if errors:
+            merged["chunk_errors"] = errors
+            if not results:
+                merged["error"] = errors[0]["error"]
+        if raw:
+            merged["raw_response"] = "\n\n".join(raw)
+        return merged
@@ -0,0 +1,157 @@
+"""Local OpenAI-compatible stand-in for the audit LLM.
+
+Implements POST /v1/chat/completions well enough for the auditor: it
+reads the line-numbered contract out of the prompt, flags a few
+well-known risky constructs and answers with the JSON the auditor asks
+for. Latency, fenced (```json) answers, failing prompts (`fail_on`, a
+regex answered with HTTP 500) and request / concurrency counters are
+configurable, so chunking, the concurrency cap, partial failures and
+the JSON extraction can be exercised offline:
+
+    python llm_stub.py --port 8089 --latency 0.5
+    LLM_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub python app.py
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# (pattern, severity, title, fix)
+CHECKS = [
+    (r"tx\.origin", "high", "Authorization through tx.origin", "Use msg.sender for authorization."),
+    (r"\.delegatecall\s*\(", "high", "Delegatecall to untrusted callee", "Restrict delegatecall targets to trusted, immutable addresses."),
+    (r"\.call\s*\{\s*value\s*:", "medium", "Low-level call with value", "Check the return value and follow checks-effects-interactions."),
+    (r"\bselfdestruct\s*\(", "high", "Unprotected selfdestruct", "Remove selfdestruct or guard it with access control."),
+    (r"block\.timestamp", "low", "Dependence on block.timestamp", "Avoid using block.timestamp for critical logic or randomness."),
+]
+
+NUMBERED_LINE = re.compile(r"^\s*(\d+) \| (.*)$", re.M)
+
+
+def review(prompt):
+    vulnerabilities = []
+    for line_no, text in NUMBERED_LINE.findall(prompt):
+        for pattern, severity, title, fix in CHECKS:
+            if re.search(pattern, text):
+                vulnerabilities.append({
+                    "severity": severity,
+                    "title": title,
+                    "description": f"Line {line_no}: {text.strip()}",
+                    "line": int(line_no),
+                    "fix": fix,
+                })
+    return {
+        "vulnerabilities": vulnerabilities,
+        "gas_optimizations": ["Cache storage reads in local variables inside loops."] if "for (" in prompt else [],
+        "best_practices": ["Pin the compiler version instead of using a floating pragma."] if "pragma solidity ^" in prompt else [],
+    }
+
+
+class StubLLM:
+    """Threaded HTTP server on 127.0.0.1 speaking the chat-completions API"""
+
+    def __init__(self, latency=0.0, fenced=False, fail_on=None, port=0):
+        self.latency = latency
+        self.fenced = fenced
+        self.fail_on = re.compile(fail_on) if fail_on else None
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send(200, {"object": "list", "data": [{"id": "stub", "object": "model", "owned_by": "stub"}]})
+                else:
+                    self._send(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, {"error": {"message": "Not found"}})
+                    return
+                stub._enter()
+                try:
+                    time.sleep(stub.latency)
+                    prompt = "\n".join(m.get("content") or "" for m in request.get("messages", []) if m.get("role") == "user")
+                    failed = stub.fail_on is not None and stub.fail_on.search(prompt)
+                    content = json.dumps(review(prompt))
+                    if stub.fenced:
+                        content = f"Here is the analysis:\n```json\n{content}\n```"
+                finally:
+                    stub._leave()
+                if failed:
+                    self._send(500, {"error": {"message": "Stub failure", "type": "server_error"}})
+                    return
+                self._send(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "stub"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                              "total_tokens": (len(prompt) + len(content)) // 4},
+                })
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def _enter(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="llm-stub", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stub for the smart-contract auditor")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fenced", action="store_true", help="wrap answers in ```json fences")
+    parser.add_argument("--fail-on", help="answer 500 to prompts matching this regex")
+    args = parser.parse_args()
+    stub = StubLLM(latency=args.latency, fenced=args.fenced, fail_on=args.fail_on, port=args.port)
+    print(f"Stub LLM listening on {stub.url}")
+    stub.server.serve_forever()
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Cache lifetimes by mirror-node path (first match wins); 0 disables caching.
+# Token metadata (keys, treasury, decimals, fees) rarely changes; activity does.
+DEFAULT_TTLS = [
+    (r"/tokens/[^/]+/transactions$", 30),
+    (r"/tokens/[^/]+/balances$", 60),
+    (r"/tokens/[^/]+/nfts", 60),
+    (r"/tokens/[^/]+$", 3600),
+    (r"/accounts/[^/]+$", 300),
+]
+
+
+class CachedResponse:
+    """The parts of a requests.Response the auditor uses, rebuilt from the cache"""
+
+    def __init__(self, status_code, text, headers=None, cache_status="hit"):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.cache_status = cache_status
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _MirrorClientBase:
+    """Retry policy, per-endpoint TTLs and cache counters shared by the sync and async clients"""
+
+    RETRY_STATUSES = (429, 503)
+
+    def __init__(self, per_host=8, max_retries=4, backoff=0.5, max_backoff=8.0, cache=None, ttls=None, max_stale=24 * 3600):
+        self.per_host = per_host
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._limits = {}
+        self.cache = cache
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (DEFAULT_TTLS if ttls is None else ttls)]
+        self.max_stale = max_stale
+        self._revalidating = set()
+        self.counters = {"retries": 0, "hits": 0, "stale": 0, "misses": 0, "revalidated": 0, "not_modified": 0}
+        self._counters_lock = threading.Lock()
+
+    def _delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                try:
+                    return min(max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        # Full jitter so a batch that hit the limit together does not retry together
+        return random.uniform(0, min(self.backoff * 2 ** attempt, self.max_backoff))
+
+    def ttl_for(self, url):
+        path = urlsplit(url).path.rstrip("/")
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return 0
+
+    def _count(self, name):
+        with self._counters_lock:
+            self.counters[name] += 1
+
+    def _cached(self, key, entry):
+        """CachedResponse for a usable entry (None if missing or too stale), plus whether to revalidate"""
+        if entry is None or not (entry.fresh or time.time() - entry.expires <= self.max_stale):
+            return None, False
+        if entry.fresh:
+            self._count("hits")
+            return CachedResponse(200, entry.value), False
+        self._count("stale")
+        with self._counters_lock:
+            revalidate = key not in self._revalidating
+            self._revalidating.add(key)
+        return CachedResponse(200, entry.value, cache_status="stale"), revalidate
+
+    @staticmethod
+    def _validators(entry):
+        headers = {}
+        meta = entry.meta or {}
+        if meta.get("ETag"):
+            headers["If-None-Match"] = meta["ETag"]
+        if meta.get("Last-Modified"):
+            headers["If-Modified-Since"] = meta["Last-Modified"]
+        return headers
+
+    def _store(self, key, response, ttl):
+        if response.status_code != 200:
+            return
+        validators = {name: response.headers[name] for name in ("ETag", "Last-Modified") if response.headers.get(name)}
+        self.cache.set(key, response.text, ttl=ttl, meta=validators or None)
+
+    def _revalidated(self, key, ttl, entry, response):
+        if response.status_code == 304:
+            # Unchanged upstream: keep the body, restart its TTL
+            self.cache.set(key, entry.value, ttl=ttl, meta=entry.meta)
+            self._count("not_modified")
+        elif response.status_code == 200:
+            self._store(key, response, ttl)
+            self._count("revalidated")
+
+    def _revalidation_done(self, key):
+        with self._counters_lock:
+            self._revalidating.discard(key)
+
+    def stats(self):
+        with self._counters_lock:
+            counters = dict(self.counters)
+        stats = {"per_host": self.per_host, "hosts": len(self._limits), "retries": counters.pop("retries")}
+        if self.cache is not None:
+            lookups = counters["hits"] + counters["stale"] + counters["misses"]
+            counters["hit_ratio"] = round((counters["hits"] + counters["stale"]) / lookups, 3) if lookups else None
+            stats["cache"] = counters
+        return stats
+
+
+class MirrorNodeClient(_MirrorClientBase):
+    """Shared HTTP client for Hedera mirror-node calls.
+
+    One keep-alive connection pool for every request, at most
+    `per_host` requests in flight per host, and retries with exponential
+    backoff (honouring Retry-After) when the mirror node answers 429/503.
+
+    With a `cache` (a SQLiteCache, so every worker process shares it),
+    successful GETs are kept for a per-endpoint TTL. A stale entry is
+    served at once and revalidated in the background with
+    If-None-Match / If-Modified-Since; entries older than `max_stale`
+    past expiry are refetched before answering.
+    """
+
+    def __init__(self, per_host=8, max_retries=4, backoff=0.5, max_backoff=8.0, pool_size=32,
+                 cache=None, ttls=None, max_stale=24 * 3600):
+        super().__init__(per_host, max_retries, backoff, max_backoff, cache, ttls, max_stale)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._limits_lock = threading.Lock()
+        self._revalidate_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mirror-revalidate")
+
+    def _limit(self, url):
+        host = urlsplit(url).netloc
+        with self._limits_lock:
+            if host not in self._limits:
+                self._limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._limits[host]
+
+    def _fetch(self, url, timeout=10, **kwargs):
+        """GET through the pool; the last response is returned even if it is still a 429"""
+        limit = self._limit(url)
+        for attempt in range(self.max_retries + 1):
+            with limit:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            self._count("retries")
+            # Sleep outside the semaphore so other tokens keep using the slot
+            time.sleep(self._delay(response, attempt))
+        return response
+
+    def get(self, url, timeout=10):
+        """GET a mirror-node URL, answering from the cache when the endpoint has a TTL"""
+        ttl = self.ttl_for(url)
+        if self.cache is None or ttl <= 0:
+            return self._fetch(url, timeout=timeout)
+
+        key = f"mirror|{url}"
+        entry = self.cache.get(key, allow_stale=True)
+        cached, revalidate = self._cached(key, entry)
+        if cached is not None:
+            if revalidate:
+                self._revalidate_pool.submit(self._run_revalidation, key, url, ttl, entry, timeout)
+            return cached
+
+        self._count("misses")
+        response = self._fetch(url, timeout=timeout)
+        self._store(key, response, ttl)
+        return response
+
+    def _run_revalidation(self, key, url, ttl, entry, timeout):
+        try:
+            self._revalidated(key, ttl, entry, self._fetch(url, timeout=timeout, headers=self._validators(entry)))
+        except Exception:
+            # Keep serving the stale copy; the next read after expiry tries again
+            pass
+        finally:
+            self._revalidation_done(key)
+
+
+class AsyncMirrorNodeClient(_MirrorClientBase):
+    """asyncio twin of MirrorNodeClient on an httpx.AsyncClient, for the ASGI service.
+
+    Same per-host limit, retry policy and (shared) SQLite cache; cache
+    reads and writes run in a thread so the event loop never blocks on
+    SQLite.
+    """
+
+    def __init__(self, per_host=8, max_retries=4, backoff=0.5, max_backoff=8.0, pool_size=100,
+                 cache=None, ttls=None, max_stale=24 * 3600):
+        super().__init__(per_host, max_retries, backoff, max_backoff, cache, ttls, max_stale)
+        self.pool_size = pool_size
+        self.client = None
+        self._tasks = set()
+
+    async def start(self):
+        if self.client is None:
+            limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            self.client = httpx.AsyncClient(limits=limits)
+        return self
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    def _limit(self, url):
+        host = urlsplit(url).netloc
+        if host not in self._limits:
+            self._limits[host] = asyncio.Semaphore(self.per_host)
+        return self._limits[host]
+
+    async def _fetch(self, url, timeout=10, **kwargs):
+        await self.start()
+        limit = self._limit(url)
+        for attempt in range(self.max_retries + 1):
+            async with limit:
+                response = await self.client.get(url, timeout=timeout, **kwargs)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.max_retries:
+                return response
+            self._count("retries")
+            await asyncio.sleep(self._delay(response, attempt))
+        return response
+
+    async def get(self, url, timeout=10):
+        ttl = self.ttl_for(url)
+        if self.cache is None or ttl <= 0:
+            return await self._fetch(url, timeout=timeout)
+
+        key = f"mirror|{url}"
+        entry = await asyncio.to_thread(self.cache.get, key, True)
+        cached, revalidate = self._cached(key, entry)
+        if cached is not None:
+            if revalidate:
+                task = asyncio.ensure_future(self._run_revalidation(key, url, ttl, entry, timeout))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return cached
+
+        self._count("misses")
+        response = await self._fetch(url, timeout=timeout)
+        await asyncio.to_thread(self._store, key, response, ttl)
+        return response
+
+    async def _run_revalidation(self, key, url, ttl, entry, timeout):
+        try:
+            response = await self._fetch(url, timeout=timeout, headers=self._validators(entry))
+            await asyncio.to_thread(self._revalidated, key, ttl, entry, response)
+        except Exception:
+            pass
+        finally:
+            self._revalidation_done(key)
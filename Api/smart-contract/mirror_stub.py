@@ -0,0 +1,140 @@
+"""Local stand-in for the Hedera mirror node REST API.
+
+Serves /api/v1/tokens/{id} and /api/v1/tokens/{id}/transactions with a
+configurable latency, ETag / 304 support and request counters, so the
+HTS audit path and the mirror-node cache can be exercised offline:
+
+    with StubMirrorNode(latency=0.05) as stub:
+        client = MirrorNodeClient(cache=SQLiteCache(path))
+        client.get(f"{stub.url}/tokens/0.0.1001")
+
+Run `python mirror_stub.py` for a quick hit-ratio / latency comparison
+of the client with and without its cache.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def stub_token(token_id):
+    """Deterministic token metadata shaped like the mirror node's /tokens/{id}"""
+    number = int(token_id.rsplit(".", 1)[-1]) if token_id.rsplit(".", 1)[-1].isdigit() else 0
+    keyed = {"_type": "ED25519", "key": "%064x" % number}
+    return {
+        "token_id": token_id,
+        "name": f"Stub token {number}",
+        "symbol": f"STB{number}",
+        "type": "NON_FUNGIBLE_UNIQUE" if number % 5 == 0 else "FUNGIBLE_COMMON",
+        "decimals": "0" if number % 5 == 0 else "8",
+        "total_supply": str(10 ** (6 + number % 6)),
+        "treasury_account_id": f"0.0.{1000 + number}",
+        "admin_key": keyed,
+        "kyc_key": keyed if number % 2 else None,
+        "freeze_key": keyed if number % 3 else None,
+        "wipe_key": keyed if number % 4 == 0 else None,
+        "pause_key": None,
+        "supply_key": keyed,
+        "custom_fees": {"fixed_fees": [], "fractional_fees": []},
+    }
+
+
+class StubMirrorNode:
+    """Threaded HTTP server on 127.0.0.1 answering a small subset of the mirror-node API"""
+
+    def __init__(self, latency=0.0, port=0):
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                stub._count("requests")
+                time.sleep(stub.latency)
+                status, payload = stub.route(self.path.split("?", 1)[0])
+                body = json.dumps(payload).encode("utf-8")
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if status == 200 and self.headers.get("If-None-Match") == etag:
+                    stub._count("not_modified")
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if status == 200:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/api/v1"
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def route(self, path):
+        match = re.fullmatch(r"/api/v1/tokens/([\d.]+)(/transactions)?/?", path)
+        if not match:
+            return 404, {"_status": {"messages": [{"message": "Not found"}]}}
+        token_id, transactions = match.groups()
+        if transactions:
+            return 200, {"transactions": [{"transaction_id": f"0.0.2-1700000000-000000000-{token_id}"}], "links": {"next": None}}
+        return 200, stub_token(token_id)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, name="mirror-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _benchmark(tokens=50, rounds=4, latency=0.05):
+    import tempfile
+    from cache_store import SQLiteCache
+    from mirror_client import MirrorNodeClient
+
+    token_ids = [f"0.0.{1000 + i}" for i in range(tokens)]
+    with tempfile.TemporaryDirectory() as directory, StubMirrorNode(latency=latency) as stub:
+        for label, cache in (("no cache", None), ("cache", SQLiteCache(f"{directory}/mirror.sqlite"))):
+            client = MirrorNodeClient(cache=cache)
+            before = stub.requests
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for token_id in token_ids:
+                    client.get(f"{stub.url}/tokens/{token_id}").json()
+            elapsed = time.perf_counter() - started
+            lookups = tokens * rounds
+            print(f"{label:>8}: {lookups} lookups, {stub.requests - before} upstream requests, "
+                  f"{elapsed / lookups * 1000:.2f} ms/lookup, stats={client.stats().get('cache')}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,84 @@
+import asyncio
+import importlib
+import time
+
+import pytest
+from openai import AsyncOpenAI
+
+from llm_analysis import ChunkedLLMAnalyzer, merge_results, split_source
+from llm_stub import StubLLM
+
+CONTRACT = """contract Vault{index} {{
+    address owner;
+
+    function withdraw(uint amount) public {{
+        require(tx.origin == owner);
+        for (uint i = 0; i < amount; i++) {{}}
+    }}
+}}
+"""
+
+SOURCE = "pragma solidity ^0.8.0;\n\n" + "\n".join(CONTRACT.format(index=index) for index in range(6))
+
+
+def review(stub, code, concurrency=4, max_chars=400):
+    client = AsyncOpenAI(base_url=stub.url, api_key="stub", max_retries=0)
+    analyzer = ChunkedLLMAnalyzer(client, "stub", max_chars=max_chars, concurrency=concurrency)
+    return asyncio.run(analyzer.analyze(code, timeout=10))
+
+
+def test_large_source_is_reviewed_in_parallel_chunks():
+    chunks = split_source(SOURCE, max_chars=400)
+    assert len(chunks) == 3
+    with StubLLM(latency=0.3) as stub:
+        started = time.monotonic()
+        result = review(stub, SOURCE)
+        elapsed = time.monotonic() - started
+
+    assert stub.requests == len(chunks)
+    assert stub.max_in_flight == len(chunks)
+    assert elapsed < 0.3 * len(chunks)
+    assert result["chunks"] == {"total": 3, "completed": 3, "failed": 0}
+    # One tx.origin finding per contract, numbered against the full source, in source order
+    lines = [vuln["line"] for vuln in result["vulnerabilities"]]
+    expected = [number for number, line in enumerate(SOURCE.splitlines(), 1) if "tx.origin" in line]
+    assert lines == expected
+    # Every chunk suggests the same gas optimization; the merge keeps one
+    assert result["gas_optimizations"] == ["Cache storage reads in local variables inside loops."]
+
+
+def test_concurrency_is_capped():
+    with StubLLM(latency=0.1) as stub:
+        review(stub, SOURCE, concurrency=2)
+    assert stub.requests == 3
+    assert stub.max_in_flight == 2
+
+
+def test_merge_dedupes_findings_across_chunks():
+    finding = {"severity": "medium", "title": "Reentrancy", "description": "", "line": 12, "fix": None}
+    merged = merge_results([
+        {"vulnerabilities": [finding], "best_practices": ["Use a fixed pragma."]},
+        {"vulnerabilities": [dict(finding, severity="high")], "best_practices": ["Use a fixed pragma"]},
+    ])
+    assert merged["vulnerabilities"] == [dict(finding, severity="high")]
+    assert merged["best_practices"] == ["Use a fixed pragma."]
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("AUDIT_CACHE_DIR", str(tmp_path))
+    return importlib.import_module("app")
+
+
+def test_review_with_a_failed_chunk_is_not_cached(app_module):
+    with StubLLM(fail_on=r"contract Vault3\b") as stub:
+        result = review(stub, SOURCE)
+
+    assert result["chunks"] == {"total": 3, "completed": 2, "failed": 1}
+    assert [error["chunk"] for error in result["chunk_errors"]] == ["Vault2, Vault3"]
+    assert len(result["vulnerabilities"]) == 4
+    assert not app_module.is_cacheable("llm", result)
+    assert app_module.stage_status("llm", result)[0] == "failed"
+
+    with StubLLM() as stub:
+        assert app_module.is_cacheable("llm", review(stub, SOURCE))
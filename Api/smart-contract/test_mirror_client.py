@@ -0,0 +1,65 @@
+import time
+
+import pytest
+
+from cache_store import SQLiteCache
+from mirror_client import MirrorNodeClient
+from mirror_stub import StubMirrorNode
+
+
+@pytest.fixture
+def stub():
+    with StubMirrorNode() as stub:
+        yield stub
+
+
+def client_for(tmp_path, ttl):
+    cache = SQLiteCache(str(tmp_path / "mirror.sqlite"))
+    return MirrorNodeClient(cache=cache, ttls=[(r"/tokens/[^/]+$", ttl)])
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_repeated_lookups_hit_the_cache(tmp_path, stub):
+    client = client_for(tmp_path, ttl=3600)
+    url = f"{stub.url}/tokens/0.0.1001"
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert first.json() == second.json()
+    assert second.cache_status == "hit"
+    assert stub.requests == 1
+    cache = client.stats()["cache"]
+    assert (cache["hits"], cache["misses"], cache["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_uncached_endpoints_go_upstream(tmp_path, stub):
+    client = client_for(tmp_path, ttl=3600)
+    for _ in range(2):
+        client.get(f"{stub.url}/tokens/0.0.1001/transactions")
+    assert stub.requests == 2
+    assert client.stats()["cache"]["misses"] == 0
+
+
+def test_stale_entry_is_served_and_revalidated_in_background(tmp_path, stub):
+    client = client_for(tmp_path, ttl=0.5)
+    url = f"{stub.url}/tokens/0.0.1002"
+    client.get(url)
+    time.sleep(0.6)
+
+    stale = client.get(url)
+    assert stale.cache_status == "stale"
+    assert stale.json()["token_id"] == "0.0.1002"
+
+    # Unchanged upstream: the ETag round-trip answers 304 and the TTL restarts
+    wait_for(lambda: client.stats()["cache"]["not_modified"] == 1)
+    assert stub.not_modified == 1
+    assert client.get(url).cache_status == "hit"
+    assert client.stats()["cache"]["stale"] == 1
+    assert stub.requests == 2
@@ -0,0 +1,158 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("sample", "ledoit_wolf", "constant_correlation", "ewma")
+
+
+def _shrink_identity(S, Y):
+    """Ledoit-Wolf (2004): S tiré vers mu*I, intensité optimale estimée sur les rendements centrés Y"""
+    T, n = Y.shape
+    mu = np.trace(S) / n
+    F = mu * np.eye(n)
+    d2 = np.sum((S - F) ** 2)
+    if d2 == 0:
+        return S, 0.0
+    # sum_t ||y_t y_t' - S||^2 = sum_t ||y_t||^4 - T ||S||^2
+    b2 = (np.sum(np.sum(Y ** 2, axis=1) ** 2) - T * np.sum(S ** 2)) / T ** 2
+    delta = min(max(b2, 0.0), d2) / d2
+    return delta * F + (1 - delta) * S, delta
+
+
+def _shrink_constant_correlation(S, Y):
+    """Ledoit-Wolf (2003, "Honey, I shrunk..."): S tiré vers une matrice à corrélation constante"""
+    T, n = Y.shape
+    var = np.diag(S)
+    sd = np.sqrt(var)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.nan_to_num(S / np.outer(sd, sd))
+    off = ~np.eye(n, dtype=bool)
+    r_bar = corr[off].mean() if n > 1 else 0.0
+    F = r_bar * np.outer(sd, sd)
+    np.fill_diagonal(F, var)
+
+    Y2 = Y ** 2
+    pi_mat = Y2.T @ Y2 / T - S ** 2
+    # theta[i, j] = mean_t (y_ti^2 - s_ii)(y_ti y_tj - s_ij)
+    theta = (Y ** 3).T @ Y / T - var[:, None] * S
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.nan_to_num(np.sqrt(np.outer(1 / var, var)), posinf=0.0)
+    rho_terms = ratio * theta + ratio.T * theta.T
+    rho = np.trace(pi_mat) + r_bar / 2 * np.sum(rho_terms[off])
+    gamma = np.sum((F - S) ** 2)
+    if gamma == 0:
+        return S, 0.0
+    delta = min(max((pi_mat.sum() - rho) / gamma / T, 0.0), 1.0)
+    return delta * F + (1 - delta) * S, delta
+
+
+class CovarianceEngine:
+    """
+    Matrice de covariance des rendements à partir de prices_matrix (dates x symboles).
+
+    method: "sample", "ledoit_wolf" (cible mu*I), "constant_correlation"
+    ou "ewma" (RiskMetrics, ewma_lambda). Les sommes des moments et la
+    covariance EWMA sont mises à jour en O(n^2) par nouvelle ligne de prix
+    (update); l'intensité de shrinkage est réestimée à la demande par deux
+    produits matriciels sur l'historique des rendements. Le résultat est
+    mis en cache jusqu'à la prochaine mise à jour (self.version).
+    """
+
+    def __init__(self, prices_matrix, method="ledoit_wolf", ewma_lambda=0.94):
+        if method not in METHODS:
+            raise ValueError(f"Unknown covariance method {method!r}; expected one of {METHODS}")
+        self.method = method
+        self.ewma_lambda = ewma_lambda
+        self.symbols = list(prices_matrix.columns)
+        self._index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        n = len(self.symbols)
+        self._last_prices = None
+        self._returns = np.empty((0, n))
+        self._sum = np.zeros(n)
+        self._sum_outer = np.zeros((n, n))
+        self._ewma = np.zeros((n, n))
+        self._ewma_weight = 0.0
+        self.version = 0
+        self.shrinkage = None
+        self._cached = None
+        self._corr = None
+        self._lock = threading.Lock()
+        self.update(prices_matrix)
+
+    @property
+    def n_obs(self):
+        return len(self._returns)
+
+    def update(self, new_prices):
+        """Ajoute des lignes de prix (mêmes colonnes, dates croissantes) et met à jour les statistiques"""
+        prices = new_prices.reindex(columns=self.symbols).to_numpy(dtype=float)
+        if self._last_prices is not None:
+            prices = np.vstack([self._last_prices, prices])
+        if len(prices) == 0:
+            return self
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = prices[1:] / prices[:-1] - 1
+        # Comme prepare_features: une date n'est utilisée que si tous les actifs ont un rendement
+        returns = returns[np.isfinite(returns).all(axis=1)]
+        with self._lock:
+            self._last_prices = prices[-1:]
+            if len(returns):
+                self._returns = np.vstack([self._returns, returns])
+                self._sum += returns.sum(axis=0)
+                self._sum_outer += returns.T @ returns
+                # S <- lam*S + (1-lam) r r' pour chaque nouvelle ligne, en un seul produit pondéré
+                lam, k = self.ewma_lambda, len(returns)
+                weights = (1 - lam) * lam ** np.arange(k - 1, -1, -1)
+                self._ewma = lam ** k * self._ewma + (returns * weights[:, None]).T @ returns
+                self._ewma_weight = lam ** k * self._ewma_weight + weights.sum()
+                self.version += 1
+                self._cached = None
+                self._corr = None
+        return self
+
+    def matrix(self):
+        """Covariance complète (n x n, ordre de self.symbols)"""
+        with self._lock:
+            if self._cached is not None:
+                return self._cached
+            n, T = len(self.symbols), self.n_obs
+            if T < 2:
+                cov = np.zeros((n, n))
+            elif self.method == "ewma":
+                cov = self._ewma / self._ewma_weight
+            else:
+                mean = self._sum / T
+                S = self._sum_outer / T - np.outer(mean, mean)
+                if self.method == "sample":
+                    cov = S * T / (T - 1)
+                else:
+                    Y = self._returns - mean
+                    shrink = _shrink_identity if self.method == "ledoit_wolf" else _shrink_constant_correlation
+                    cov, self.shrinkage = shrink(S, Y)
+            self._cached = cov
+            return cov
+
+    def correlation(self, symbols=None):
+        """
+        Corrélation pour `symbols` (tous par défaut), dans cet ordre.
+        Les symboles sans historique de prix sont supposés non corrélés.
+        """
+        corr = self._corr
+        if corr is None:
+            cov = self.matrix()
+            sd = np.sqrt(np.diag(cov))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr = np.nan_to_num(cov / np.outer(sd, sd))
+            np.fill_diagonal(corr, 1.0)
+            self._corr = corr
+        if symbols is None:
+            return corr
+        idx = np.array([self._index.get(symbol, -1) for symbol in symbols], dtype=int)
+        known = idx >= 0
+        result = np.eye(len(idx))
+        result[np.ix_(known, known)] = corr[np.ix_(idx[known], idx[known])]
+        return result
+
+    def to_frame(self):
+        return pd.DataFrame(self.matrix(), index=self.symbols, columns=self.symbols)
@@ -0,0 +1,131 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Même ordre que les colonnes vues par le scaler et les régresseurs
+FEATURE_COLS = ["hist_return", "hist_volatility", "total_supply", "total_volume", "tx_count"]
+
+
+class FeatureStore:
+    """
+    Features par actif pour MLOptimizer, calculées une fois puis mises à jour
+    par incréments.
+
+    symbols: une entrée par ligne de MLOptimizer.data (doublons possibles);
+    les statistiques sont tenues par symbole unique et redistribuées aux
+    lignes par un tableau d'indices.
+      - hist_return / hist_volatility: moyenne et écart-type (ddof=1) des
+        rendements journaliers, fusionnés par lots (Chan/Welford) en O(n)
+        par nouvelle ligne de prix. Comme pct_change().dropna(), une date
+        n'est retenue que si tous les actifs ont un rendement fini.
+      - total_volume / tx_count: somme de `value` et nombre de `txhash`
+        des transferts, par bincount.
+    Symboles sans historique de prix: NaN; sans transferts: 0.
+    total_volume / tx_count (par ligne) servent de point de départ quand
+    les transferts bruts ne sont pas fournis.
+    """
+
+    def __init__(self, symbols, prices_matrix, tx_df=None, total_supply=None, total_volume=None, tx_count=None):
+        self.symbols = pd.Index(pd.unique(np.asarray(symbols, dtype=object)))
+        self._rows = self.symbols.get_indexer(symbols)
+        n = len(self.symbols)
+
+        # Colonnes de prices_matrix -> position dans self.symbols (-1: actif hors de data)
+        self._price_columns = list(prices_matrix.columns)
+        self._price_index = self.symbols.get_indexer(self._price_columns)
+        self._last_prices = None
+        self._n_obs = 0
+        self._mean = np.zeros(len(self._price_columns))
+        self._m2 = np.zeros(len(self._price_columns))
+
+        self._volume = np.zeros(n)
+        self._tx_count = np.zeros(n)
+        if total_volume is not None:
+            self._volume[self._rows] = np.nan_to_num(np.asarray(total_volume, dtype=float))
+        if tx_count is not None:
+            self._tx_count[self._rows] = np.nan_to_num(np.asarray(tx_count, dtype=float))
+        self.total_supply = np.zeros(len(symbols)) if total_supply is None else np.asarray(total_supply, dtype=float)
+
+        self.version = 0
+        self._matrix = None
+        self._lock = threading.Lock()
+        self.update_prices(prices_matrix)
+        if tx_df is not None:
+            self.update_transfers(tx_df)
+
+    @property
+    def n_obs(self):
+        return self._n_obs
+
+    def update_prices(self, new_prices):
+        """Ajoute des lignes de prix (dates croissantes, colonnes de prices_matrix)"""
+        prices = new_prices.reindex(columns=self._price_columns).to_numpy(dtype=float)
+        if self._last_prices is not None:
+            prices = np.vstack([self._last_prices, prices])
+        if len(prices) == 0:
+            return self
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = prices[1:] / prices[:-1] - 1
+        returns = returns[np.isfinite(returns).all(axis=1)]
+        with self._lock:
+            self._last_prices = prices[-1:]
+            if len(returns):
+                # Fusion des moments (n, moyenne, M2) existants avec ceux du lot
+                n_a, n_b = self._n_obs, len(returns)
+                mean_b = returns.mean(axis=0)
+                m2_b = ((returns - mean_b) ** 2).sum(axis=0)
+                delta = mean_b - self._mean
+                total = n_a + n_b
+                self._mean = self._mean + delta * n_b / total
+                self._m2 = self._m2 + m2_b + delta ** 2 * n_a * n_b / total
+                self._n_obs = total
+                self._changed()
+        return self
+
+    def update_transfers(self, new_transfers):
+        """Ajoute des transferts (colonnes symbol, value, txhash); les symboles hors de data sont ignorés"""
+        idx = self.symbols.get_indexer(new_transfers["symbol"])
+        known = idx >= 0
+        if not known.any():
+            return self
+        n = len(self.symbols)
+        values = np.nan_to_num(new_transfers["value"].to_numpy(dtype=float)[known])
+        counted = new_transfers["txhash"].notna().to_numpy()[known].astype(float)
+        with self._lock:
+            self._volume = self._volume + np.bincount(idx[known], weights=values, minlength=n)
+            self._tx_count = self._tx_count + np.bincount(idx[known], weights=counted, minlength=n)
+            self._changed()
+        return self
+
+    def _changed(self):
+        self.version += 1
+        self._matrix = None
+
+    def columns(self):
+        """Features par ligne de data, avant remplacement des NaN: {nom: tableau float64}"""
+        n = len(self.symbols)
+        hist_return = np.full(n, np.nan)
+        hist_volatility = np.full(n, np.nan)
+        mapped = self._price_index >= 0
+        if self._n_obs > 0:
+            hist_return[self._price_index[mapped]] = self._mean[mapped]
+        if self._n_obs > 1:
+            hist_volatility[self._price_index[mapped]] = np.sqrt(self._m2[mapped] / (self._n_obs - 1))
+        rows = self._rows
+        return {
+            "hist_return": hist_return[rows],
+            "hist_volatility": hist_volatility[rows],
+            "total_supply": self.total_supply,
+            "total_volume": self._volume[rows],
+            "tx_count": self._tx_count[rows],
+        }
+
+    def matrix(self):
+        """Matrice dense (lignes de data x FEATURE_COLS), NaN remplacés par 0; en cache jusqu'à la prochaine mise à jour"""
+        with self._lock:
+            if self._matrix is None:
+                columns = self.columns()
+                matrix = np.column_stack([columns[name] for name in FEATURE_COLS]).astype(np.float64)
+                self._matrix = np.where(np.isnan(matrix), 0.0, matrix)
+            return self._matrix
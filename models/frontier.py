@@ -0,0 +1,146 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Grille de départ de risk_tolerance: plus dense près de 0, où les poids bougent le plus
+FRONTIER_POINTS = 65
+FRONTIER_MAX_RISK = 10.0
+# Écart max de poids (fraction) entre deux points voisins; la grille est bissectée jusque-là
+FRONTIER_REFINE_TOL = 0.01
+# Garde-fous de la bissection (poids discontinus, ou coût de construction)
+FRONTIER_MAX_POINTS = 4000
+FRONTIER_MIN_STEP = 1e-6
+FRONTIER_CACHE_SIZE = 64
+
+
+def risk_grid(points=FRONTIER_POINTS, max_risk=FRONTIER_MAX_RISK):
+    return max_risk * np.linspace(0.0, 1.0, points) ** 2
+
+
+class Frontier:
+    """
+    Solutions de optimize_portfolio pour une grille de risk_tolerance, à
+    symboles et liquidity_weight fixés. Les poids interpolés entre deux
+    points voisins restent admissibles (combinaison convexe: somme 1,
+    bornes respectées). Immuable une fois construite.
+    """
+
+    def __init__(self, symbols, risk, weights):
+        self.symbols = symbols
+        self.risk = risk
+        self.weights = weights
+
+    def interpolate(self, risk_tolerance):
+        """
+        Retourne (poids, exact) pour un risk_tolerance dans la grille, ou None
+        s'il est hors grille ou entre deux points dont l'écart dépasse
+        FRONTIER_REFINE_TOL (bissection arrêtée par un garde-fou).
+        """
+        risk, weights = self.risk, self.weights
+        if not risk[0] <= risk_tolerance <= risk[-1]:
+            return None
+        i = np.searchsorted(risk, risk_tolerance)
+        if risk[i] == risk_tolerance:
+            return weights[i], True
+        if np.max(np.abs(weights[i] - weights[i - 1])) > FRONTIER_REFINE_TOL:
+            return None
+        t = (risk_tolerance - risk[i - 1]) / (risk[i] - risk[i - 1])
+        return (1 - t) * weights[i - 1] + t * weights[i], False
+
+
+class FrontierCache:
+    """
+    Frontières précalculées par (symboles, liquidity_weight, version des
+    données, version des modèles), construites en arrière-plan.
+
+    La grille est bissectée à la construction jusqu'à ce que deux points
+    voisins diffèrent d'au plus FRONTIER_REFINE_TOL sur chaque poids;
+    optimize() interpole alors sans résoudre. Les requêtes hors grille
+    (risk_tolerance < 0 ou > FRONTIER_MAX_RISK), ou reçues pendant la
+    construction, sont résolues directement et marquées "solver".
+    """
+
+    def __init__(self, max_workers=2, max_entries=FRONTIER_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._frontiers = OrderedDict()
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="frontier")
+        self.stats = {"interpolated": 0, "exact": 0, "solved": 0, "built": 0}
+
+    @staticmethod
+    def key(optimizer, symbols, liquidity_weight):
+        # features.version avance à chaque update_market_data
+        features = getattr(optimizer, "features", None)
+        versions = (getattr(optimizer, "data_version", None), getattr(optimizer, "model_version", None),
+                    features.version if features is not None else None)
+        return frozenset(symbols), float(liquidity_weight), versions
+
+    def prefetch(self, optimizer, symbols, liquidity_weight):
+        """Lance la construction de la frontière si elle n'existe pas encore; retourne la clé"""
+        key = self.key(optimizer, symbols, liquidity_weight)
+        with self._lock:
+            if key in self._frontiers or key in self._pending:
+                return key
+            self._pending.add(key)
+        self._executor.submit(self._build, optimizer, key, list(symbols), liquidity_weight)
+        return key
+
+    def optimize(self, optimizer, symbols, risk_tolerance, liquidity_weight):
+        """Retourne (allocation en %, source) avec source "frontier", "interpolated" ou "solver" """
+        key = self.prefetch(optimizer, symbols, liquidity_weight)
+        frontier = self._frontiers.get(key)
+        point = frontier.interpolate(risk_tolerance) if frontier is not None else None
+        if point is None:
+            self.stats["solved"] += 1
+            allocation = optimizer.optimize_portfolio(
+                risk_tolerance=risk_tolerance, allowed_symbols=symbols, liquidity_weight=liquidity_weight,
+            )
+            return allocation, "solver"
+
+        weights, exact = point
+        self.stats["exact" if exact else "interpolated"] += 1
+        return dict(zip(frontier.symbols, weights * 100)), "frontier" if exact else "interpolated"
+
+    def _build(self, optimizer, key, symbols, liquidity_weight):
+        try:
+            risk = risk_grid()
+            order, weights = self._solve(optimizer, symbols, risk, liquidity_weight)
+            # Bissection des intervalles trop larges, par lots de points milieux
+            while len(risk) < FRONTIER_MAX_POINTS:
+                gaps = np.max(np.abs(np.diff(weights, axis=0)), axis=1)
+                split = (gaps > FRONTIER_REFINE_TOL) & (np.diff(risk) > FRONTIER_MIN_STEP)
+                if not split.any():
+                    break
+                midpoints = ((risk[:-1] + risk[1:]) / 2)[split]
+                midpoints = midpoints[:FRONTIER_MAX_POINTS - len(risk)]
+                _, mid_weights = self._solve(optimizer, symbols, midpoints, liquidity_weight, order)
+                risk = np.concatenate([risk, midpoints])
+                weights = np.concatenate([weights, mid_weights])
+                sort = np.argsort(risk, kind="stable")
+                risk, weights = risk[sort], weights[sort]
+            frontier = Frontier(order, risk, weights)
+            with self._lock:
+                # Les frontières des anciennes versions ne seront plus demandées
+                for stale in [k for k in self._frontiers if k[2] != key[2]]:
+                    del self._frontiers[stale]
+                self._frontiers[key] = frontier
+                while len(self._frontiers) > self.max_entries:
+                    self._frontiers.popitem(last=False)
+            self.stats["built"] += 1
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    @staticmethod
+    def _solve(optimizer, symbols, risk, liquidity_weight, order=None):
+        """Poids (len(risk) x actifs, fractions) pour chaque risk_tolerance; retourne (ordre des symboles, poids)"""
+        results = optimizer.optimize_batch([(r, liquidity_weight) for r in risk], allowed_symbols=symbols, max_workers=1)
+        order = order or list(results[0]["allocation_percent"])
+        weights = np.array([[result["allocation_percent"][s] / 100 for s in order] for result in results])
+        return order, weights
+
+
+frontier_cache = FrontierCache()
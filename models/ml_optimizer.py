@@ -1,16 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-from scipy.optimize import minimize
+
+from .covariance import CovarianceEngine
+from .feature_store import FEATURE_COLS, FeatureStore
+from . import portfolio_solver
+
+# Dernières solutions gardées pour le warm start, par ensemble de symboles
+WARM_START_CACHE_SIZE = 256
 
 class MLOptimizer:
-    def __init__(self, data, prices_matrix, tx_df=None, min_allocation=0.05):
+    def __init__(self, data, prices_matrix, tx_df=None, min_allocation=0.05, risk_model="ledoit_wolf"):
         """
         data: DataFrame avec les colonnes ['symbol', 'expected_return', 'volatility', 'total_supply', ...]
         prices_matrix: DataFrame pivoté historique pour features ML
         tx_df: transactions synthetic_transfers.csv (optionnel)
         min_allocation: fraction minimale par actif pour éviter 0
+        risk_model: corrélations entre actifs ("ledoit_wolf", "constant_correlation", "ewma", "sample")
+                    ou "diagonal" pour les ignorer
         """
         self.data = data.copy()
         self.prices_matrix = prices_matrix
@@ -21,99 +31,198 @@ class MLOptimizer:
         self.cov_matrix = None
         self.scaler = None
         self.min_allocation = min_allocation
+        self.risk_model = risk_model
+        self.covariance = None
+        self.features = None
+        self._warm_starts = {}
 
     def prepare_features(self):
-        # Rendements journaliers
-        daily_returns = self.prices_matrix.pct_change().dropna()
-        self.data["hist_volatility"] = self.data["symbol"].map(daily_returns.std())
-        self.data["hist_return"] = self.data["symbol"].map(daily_returns.mean())
-
-        # Transaction features
-        if self.tx_df is not None and not self.tx_df.empty:
-            tx_features = self.tx_df.groupby("symbol").agg(
-                total_volume=("value", "sum"),
-                tx_count=("txhash", "count")
-            ).reset_index()
-            self.data = self.data.merge(tx_features, on="symbol", how="left")
-
-        # Gestion correcte du merge et NaN
-        for col in ["total_volume", "tx_count"]:
-            if f"{col}_y" in self.data.columns:
-                self.data[col] = self.data[f"{col}_y"].fillna(self.data[f"{col}_x"].fillna(0))
-                self.data = self.data.drop(columns=[f"{col}_x", f"{col}_y"])
-            else:
-                self.data[col] = self.data[col].fillna(0)
+        """Features par actif (FeatureStore, construit une seule fois), recopiées dans self.data"""
+        if self.features is None:
+            has_tx = self.tx_df is not None and not self.tx_df.empty
+            # Sans transferts bruts, on garde les agrégats déjà présents dans data (load_data)
+            previous = {col: self.data[col].to_numpy() for col in ["total_volume", "tx_count"]
+                        if not has_tx and col in self.data.columns}
+            self.features = FeatureStore(
+                self.data["symbol"].to_numpy(),
+                self.prices_matrix,
+                tx_df=self.tx_df if has_tx else None,
+                total_supply=self.data["total_supply"].to_numpy() if "total_supply" in self.data.columns else None,
+                **previous,
+            )
+        self._write_features()
 
         # fallback si expected_return n'existe pas
         if "expected_return" not in self.data.columns:
             self.data["expected_return"] = self.data["hist_return"].fillna(0)
 
+    def _write_features(self):
+        for name, values in self.features.columns().items():
+            self.data[name] = values
+
+    def scaled_features(self):
+        """Matrice des features normalisée par le scaler courant"""
+        X = self.features.matrix()
+        if getattr(self.scaler, "feature_names_in_", None) is not None:
+            # Scaler d'une version du registre entraînée sur un DataFrame
+            X = pd.DataFrame(X, columns=FEATURE_COLS)
+        return self.scaler.transform(X)
+
     def train_models(self):
         """Entraîner les modèles ML pour rendement, liquidité et risque."""
         self.prepare_features()
-        feature_cols = ["hist_return", "hist_volatility", "total_supply", "total_volume", "tx_count"]
-        X = self.data[feature_cols].fillna(0)
 
         # Normalisation
         self.scaler = StandardScaler()
-        X_scaled = self.scaler.fit_transform(X)
+        X_scaled = self.scaler.fit_transform(self.features.matrix())
 
         # Modèle rendement
         y_return = self.data["expected_return"].fillna(0)
         self.model_return = RandomForestRegressor(n_estimators=100, random_state=42)
         self.model_return.fit(X_scaled, y_return)
-        self.data["pred_return"] = self.model_return.predict(X_scaled)
 
         # Modèle liquidité
         y_liquidity = self.data["total_volume"].fillna(0)
         self.model_liquidity = RandomForestRegressor(n_estimators=100, random_state=42)
         self.model_liquidity.fit(X_scaled, y_liquidity)
-        self.data["pred_liquidity"] = self.model_liquidity.predict(X_scaled)
 
         # Modèle risque
         y_risk = self.data["hist_volatility"].fillna(0)
         self.model_risk = RandomForestRegressor(n_estimators=100, random_state=42)
         self.model_risk.fit(X_scaled, y_risk)
+
+        self.apply_models()
+
+    def load_models(self, scaler, model_return, model_liquidity, model_risk):
+        """Utiliser des modèles déjà entraînés (registre) au lieu de réentraîner."""
+        self.prepare_features()
+        self.scaler = scaler
+        self.model_return = model_return
+        self.model_liquidity = model_liquidity
+        self.model_risk = model_risk
+        self.apply_models()
+
+    def apply_models(self):
+        """Prédictions rendement / liquidité / risque pour chaque actif avec les modèles courants."""
+        X_scaled = self.scaled_features()
+        self.data["pred_return"] = self.model_return.predict(X_scaled)
+        self.data["pred_liquidity"] = self.model_liquidity.predict(X_scaled)
         self.data["pred_risk"] = self.model_risk.predict(X_scaled)
 
-        # Covariance pour optimisation
-        self.cov_matrix = np.diag(self.data["hist_volatility"].fillna(0).values ** 2)
+        # Covariance pour optimisation: corrélations historiques (shrinkage), volatilités par actif
+        if self.risk_model != "diagonal" and self.covariance is None:
+            self.covariance = CovarianceEngine(self.prices_matrix, method=self.risk_model)
+        self.cov_matrix = self.risk_matrix(self.data["symbol"].tolist(), self.data["hist_volatility"].fillna(0).values)
 
-    def optimize_portfolio(self, amount_invest=1000, risk_tolerance=0.5, allowed_symbols=None, liquidity_weight=0.3):
-        """Optimisation Mean-Variance avec allocations réalistes."""
+    def update_market_data(self, new_prices=None, new_transfers=None):
+        """
+        Ajoute de nouvelles lignes de prix (dates x symboles) et/ou de transferts
+        sans tout recalculer: features et covariance sont mises à jour par
+        incréments, puis les prédictions des modèles courants sont rafraîchies.
+        """
+        if self.features is None:
+            self.prepare_features()
+        if new_prices is not None and len(new_prices):
+            self.prices_matrix = pd.concat([self.prices_matrix, new_prices])
+            self.features.update_prices(new_prices)
+            if self.covariance is not None:
+                self.covariance.update(new_prices)
+        if new_transfers is not None and len(new_transfers):
+            self.tx_df = new_transfers if self.tx_df is None else pd.concat([self.tx_df, new_transfers], ignore_index=True)
+            self.features.update_transfers(new_transfers)
+        self._write_features()
+        if self.model_return is not None:
+            self.apply_models()
+
+    def risk_matrix(self, symbols, sigma):
+        """Covariance D·C·D pour `symbols`, avec D = diag(sigma) et C la corrélation du moteur de covariance."""
+        if self.covariance is None:
+            return np.diag(sigma ** 2)
+        return self.covariance.correlation(symbols) * np.outer(sigma, sigma)
+
+    def problem(self, allowed_symbols=None):
+        """Données partagées par toutes les résolutions sur un ensemble de symboles: (symbols, mu, liquidity, cov)."""
         if self.model_return is None:
             self.train_models()
 
-        df = self.data.copy()
+        df = self.data
         if allowed_symbols:
             df = df[df["symbol"].isin(allowed_symbols)]
 
         symbols = df["symbol"].tolist()
-        mu = df["pred_return"].values
-        sigma = df["pred_risk"].values
-        liquidity = df["pred_liquidity"].values
-        cov_matrix = np.diag(sigma ** 2)
-        n = len(symbols)
-
-        # Objective: maximize return + liquidity - risk*volatility
-        def objective(weights):
-            port_return = weights @ mu
-            port_vol = np.sqrt(weights @ cov_matrix @ weights.T)
-            port_liquidity = weights @ liquidity
-            return - (port_return + liquidity_weight * port_liquidity - risk_tolerance * port_vol)
+        mu = df["pred_return"].to_numpy(dtype=float)
+        sigma = df["pred_risk"].to_numpy(dtype=float)
+        liquidity = df["pred_liquidity"].to_numpy(dtype=float)
+        return symbols, mu, liquidity, self.risk_matrix(symbols, sigma)
 
-        # Contraintes: somme = 1
-        constraints = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1})
+    def optimize_portfolio(self, amount_invest=1000, risk_tolerance=0.5, allowed_symbols=None, liquidity_weight=0.3,
+                           mean_variance=False, solver="auto"):
+        """
+        Optimisation Mean-Variance avec allocations réalistes.
 
-        # bornes: min_allocation ≤ poids ≤ 1
-        bounds = tuple((self.min_allocation, 1) for _ in range(n))
+        Gradient analytique, et départ depuis la dernière solution pour le
+        même ensemble de symboles. mean_variance=True remplace la pénalité
+        sur la volatilité par risk_tolerance/2 * variance (QP).
+        """
+        symbols, mu, liquidity, cov_matrix = self.problem(allowed_symbols)
 
-        # init uniforme
-        init_guess = np.array([1 / n] * n)
+        # Objective: maximize return + liquidity - risk*volatility
+        score = mu + liquidity_weight * liquidity
 
-        result = minimize(objective, init_guess, bounds=bounds, constraints=constraints)
-        if not result.success:
-            raise Exception("Optimization failed: " + result.message)
+        # bornes: min_allocation ≤ poids ≤ 1, somme = 1
+        key = tuple(symbols)
+        weights = portfolio_solver.solve(
+            score, cov_matrix, risk_tolerance, self.min_allocation, 1.0,
+            x0=self._warm_starts.get(key), mean_variance=mean_variance, method=solver,
+        )
+        self._remember_solution(key, weights)
 
-        allocation_percent = dict(zip(symbols, result.x * 100))
+        allocation_percent = dict(zip(symbols, weights * 100))
         return allocation_percent
+
+    def optimize_batch(self, profiles, allowed_symbols=None, mean_variance=False, solver="auto", max_workers=4):
+        """
+        Résout plusieurs profils (risk_tolerance, liquidity_weight) sur les mêmes données.
+
+        Les matrices sont construites une fois; chaque liquidity_weight est
+        une série de résolutions triées par risk_tolerance, chacune partant
+        de la solution voisine, et les séries tournent en parallèle.
+        Retourne une liste dans l'ordre de `profiles`:
+        {"allocation_percent", "expected_return", "volatility", "liquidity"}.
+        """
+        symbols, mu, liquidity, cov_matrix = self.problem(allowed_symbols)
+        key = tuple(symbols)
+
+        series = {}
+        for index, (risk_tolerance, liquidity_weight) in enumerate(profiles):
+            series.setdefault(liquidity_weight, []).append((risk_tolerance, index))
+
+        def solve_series(liquidity_weight, points):
+            score = mu + liquidity_weight * liquidity
+            x0 = self._warm_starts.get(key)
+            solved = []
+            for risk_tolerance, index in sorted(points):
+                x0 = portfolio_solver.solve(
+                    score, cov_matrix, risk_tolerance, self.min_allocation, 1.0,
+                    x0=x0, mean_variance=mean_variance, method=solver,
+                )
+                solved.append((index, x0))
+            return solved
+
+        results = [None] * len(profiles)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(series)))) as pool:
+            for solved in pool.map(lambda item: solve_series(*item), series.items()):
+                for index, weights in solved:
+                    results[index] = {
+                        "allocation_percent": dict(zip(symbols, weights * 100)),
+                        "expected_return": float(weights @ mu),
+                        "volatility": float(np.sqrt(max(weights @ cov_matrix @ weights, 0.0))),
+                        "liquidity": float(weights @ liquidity),
+                    }
+        return results
+
+    def _remember_solution(self, key, weights):
+        self._warm_starts.pop(key, None)
+        self._warm_starts[key] = weights
+        while len(self._warm_starts) > WARM_START_CACHE_SIZE:
+            self._warm_starts.pop(next(iter(self._warm_starts)), None)
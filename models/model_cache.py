@@ -0,0 +1,49 @@
+import os
+import threading
+
+from scripts.load_data import load_data, data_version
+from .ml_optimizer import MLOptimizer
+from . import model_registry
+from .frontier import frontier_cache
+
+# Un optimiseur prêt par processus, remplacé quand les CSV ou la version publiée des modèles changent
+_lock = threading.Lock()
+_snapshot = None  # ((data_version, model_version), MLOptimizer)
+
+# liquidity_weight par défaut de /optimize
+DEFAULT_LIQUIDITY_WEIGHT = 0.2
+
+
+def get_optimizer():
+    """
+    Retourne un MLOptimizer prêt pour optimize_portfolio.
+
+    Les modèles viennent du registre (version LATEST ou MODEL_VERSION),
+    chargés sans réentraînement; si le registre est vide, ils sont
+    entraînés localement. Les CSV ne sont relus que si data_version() ou
+    la version publiée a changé; sinon l'instance partagée est réutilisée
+    (optimize_portfolio ne modifie pas l'état entraîné).
+    """
+    global _snapshot
+    key = (data_version(), model_registry.latest_version())
+    snapshot = _snapshot
+    if snapshot is not None and snapshot[0] == key:
+        return snapshot[1]
+    with _lock:
+        # Une autre requête a pu le reconstruire pendant l'attente du verrou
+        if _snapshot is not None and _snapshot[0] == key:
+            return _snapshot[1]
+        data, prices_matrix, tx_df = load_data()
+        optimizer = MLOptimizer(data=data, prices_matrix=prices_matrix, tx_df=tx_df, min_allocation=0.05,
+                                risk_model=os.getenv("RISK_MODEL", "ledoit_wolf"))
+        if key[1] is not None:
+            artifacts, _ = model_registry.load(key[1])
+            optimizer.load_models(**artifacts)
+        else:
+            optimizer.train_models()
+        optimizer.data_version, optimizer.model_version = key
+        _snapshot = (key, optimizer)
+    # Frontière de l'univers complet au liquidity_weight par défaut, prête avant le premier curseur;
+    # lancée hors du verrou pour ne pas retenir les requêtes qui attendent l'optimiseur
+    frontier_cache.prefetch(optimizer, optimizer.data["symbol"].tolist(), DEFAULT_LIQUIDITY_WEIGHT)
+    return optimizer
@@ -0,0 +1,114 @@
+import os
+import json
+import shutil
+import tempfile
+from datetime import datetime
+
+import joblib
+import sklearn
+from sklearn.metrics import r2_score
+
+from .ml_optimizer import FEATURE_COLS
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Published versions live in REGISTRY_DIR/models_<YYYYmmdd_HHMMSS>/, LATEST names the current one
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", os.path.join(PROJECT_ROOT, "models", "registry"))
+
+ARTIFACTS = ["scaler", "model_return", "model_liquidity", "model_risk"]
+TARGETS = {"model_return": "expected_return", "model_liquidity": "total_volume", "model_risk": "hist_volatility"}
+
+
+def publish(optimizer, registry_dir=REGISTRY_DIR, data_version=None, promote=True):
+    """
+    Sauvegarde le scaler et les trois régresseurs d'un MLOptimizer entraîné
+    comme nouvelle version du registre, avec un metadata.json.
+
+    Les fichiers sont écrits dans un dossier temporaire puis renommés, pour
+    qu'un worker ne charge jamais une version incomplète.
+    Retourne le nom de la version.
+    """
+    os.makedirs(registry_dir, exist_ok=True)
+    now = datetime.now()
+    version = base = f"models_{now:%Y%m%d_%H%M%S}"
+    suffix = 1
+    while os.path.exists(os.path.join(registry_dir, version)):
+        version = f"{base}_{suffix}"
+        suffix += 1
+
+    X_scaled = optimizer.scaled_features()
+    models = {}
+    for name, target in TARGETS.items():
+        model = getattr(optimizer, name)
+        models[name] = {
+            "type": type(model).__name__,
+            "target": target,
+            "params": {k: v for k, v in model.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+            "train_r2": float(r2_score(optimizer.data[target].fillna(0), model.predict(X_scaled))),
+        }
+    metadata = {
+        "version": version,
+        "training_date": now.strftime("%Y-%m-%d %H:%M:%S"),
+        "training_samples": int(len(optimizer.data)),
+        "symbols": optimizer.data["symbol"].tolist(),
+        "feature_cols": FEATURE_COLS,
+        "data_version": data_version,
+        "sklearn_version": sklearn.__version__,
+        "models": models,
+    }
+
+    staging = tempfile.mkdtemp(dir=registry_dir, prefix=".tmp-")
+    try:
+        for name in ARTIFACTS:
+            # Uncompressed: loading skips decompression, which dominates for forests
+            joblib.dump(getattr(optimizer, name), os.path.join(staging, f"{name}.joblib"))
+        with open(os.path.join(staging, "metadata.json"), "w") as f:
+            json.dump(metadata, f, indent=2)
+        os.rename(staging, os.path.join(registry_dir, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if promote:
+        set_latest(version, registry_dir)
+    return version
+
+
+def set_latest(version, registry_dir=REGISTRY_DIR):
+    if not os.path.exists(os.path.join(registry_dir, version, "metadata.json")):
+        raise ValueError(f"Unknown model version: {version}")
+    fd, tmp = tempfile.mkstemp(dir=registry_dir, prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(registry_dir, "LATEST"))
+
+
+def latest_version(registry_dir=REGISTRY_DIR):
+    """Version à servir: MODEL_VERSION si défini, sinon LATEST (None si le registre est vide)"""
+    pinned = os.getenv("MODEL_VERSION")
+    if pinned:
+        return pinned
+    try:
+        with open(os.path.join(registry_dir, "LATEST")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(v for v in os.listdir(registry_dir) if os.path.exists(os.path.join(registry_dir, v, "metadata.json")))
+
+
+def load(version, registry_dir=REGISTRY_DIR):
+    """
+    Retourne (artifacts, metadata): modèles prêts à prédire, sans réentraînement.
+    Chaque worker garde sa propre copie des arbres (Tree.__setstate__ recopie les tableaux).
+    """
+    path = os.path.join(registry_dir, version)
+    with open(os.path.join(path, "metadata.json")) as f:
+        metadata = json.load(f)
+    if metadata.get("feature_cols") != FEATURE_COLS:
+        raise ValueError(f"Model version {version} was trained on features {metadata.get('feature_cols')}")
+    artifacts = {name: joblib.load(os.path.join(path, f"{name}.joblib")) for name in ARTIFACTS}
+    return artifacts, metadata
@@ -0,0 +1,117 @@
+import numpy as np
+from scipy.optimize import minimize
+
+# Au-delà, SLSQP (O(n^3) par itération) laisse la place au gradient projeté
+SLSQP_MAX_ASSETS = 50
+
+
+def objective(score, cov_matrix, risk_tolerance, mean_variance=False):
+    """
+    Retourne f(w) -> (valeur, gradient) de l'objectif à minimiser:
+      -score·w + risk_tolerance * sqrt(w'Σw)      (rendement + liquidité - risque*volatilité)
+      -score·w + risk_tolerance/2 * w'Σw          (mean_variance: QP)
+    score = mu + liquidity_weight * liquidity, calculé une fois par résolution.
+    """
+    def value_and_grad(w):
+        cov_w = cov_matrix @ w
+        variance = w @ cov_w
+        if mean_variance:
+            return -(score @ w) + risk_tolerance / 2 * variance, -score + risk_tolerance * cov_w
+        vol = np.sqrt(max(variance, 0.0))
+        risk_grad = cov_w / vol if vol > 0 else np.zeros_like(w)
+        return -(score @ w) + risk_tolerance * vol, -score + risk_tolerance * risk_grad
+    return value_and_grad
+
+
+def project_capped_simplex(v, lo, hi):
+    """
+    Projection euclidienne sur {lo <= w <= hi, sum(w) = 1}: w = clip(v - tau, lo, hi).
+
+    sum(clip(v - tau)) est linéaire par morceaux et décroissante en tau; on
+    l'évalue à tous les points de rupture (v - lo, v - hi) en O(n log n)
+    avec des sommes cumulées, puis on interpole sur le bon segment.
+    """
+    n = len(v)
+    order = np.sort(v)
+    prefix = np.concatenate([[0.0], np.cumsum(order)])
+    taus = np.sort(np.concatenate([order - lo, order - hi]))
+    # Pour chaque tau: v_i >= tau + hi -> hi, v_i <= tau + lo -> lo, sinon v_i - tau
+    start = np.searchsorted(order, taus + lo, side="right")
+    stop = np.searchsorted(order, taus + hi, side="left")
+    totals = lo * start + hi * (n - stop) + (prefix[stop] - prefix[start]) - taus * (stop - start)
+    k = np.searchsorted(-totals, -1.0)  # premier point de rupture où la somme passe sous 1
+    if k == 0:
+        tau = taus[0]
+    elif k == len(taus):
+        tau = taus[-1]
+    else:
+        t0, t1, s0, s1 = taus[k - 1], taus[k], totals[k - 1], totals[k]
+        tau = t0 if s0 == s1 else t0 + (s0 - 1.0) * (t1 - t0) / (s0 - s1)
+    return np.clip(v - tau, lo, hi)
+
+
+def solve_slsqp(value_and_grad, x0, lo, hi):
+    n = len(x0)
+    constraints = ({'type': 'eq', 'fun': lambda w: np.sum(w) - 1, 'jac': lambda w: np.ones(n)})
+    result = minimize(value_and_grad, x0, jac=True, bounds=[(lo, hi)] * n, constraints=constraints, method="SLSQP")
+    if not result.success:
+        raise Exception("Optimization failed: " + result.message)
+    return result.x
+
+
+def solve_projected_gradient(value_and_grad, x0, lo, hi, tol=1e-9, max_iter=5000):
+    """
+    Gradient projeté accéléré (FISTA, pas par backtracking, redémarrage
+    adaptatif) sur le simplexe borné. L'objectif est convexe, donc le
+    point atteint est l'optimum global; chaque itération coûte un produit
+    Σw, sans factorisation.
+    """
+    x = project_capped_simplex(np.asarray(x0, dtype=float), lo, hi)
+    fx, _ = value_and_grad(x)
+    y, t, step_l = x, 1.0, 1.0
+    for _ in range(max_iter):
+        fy, gy = value_and_grad(y)
+        while True:
+            x_new = project_capped_simplex(y - gy / step_l, lo, hi)
+            d = x_new - y
+            f_new, _ = value_and_grad(x_new)
+            if f_new <= fy + gy @ d + step_l / 2 * (d @ d) + 1e-15:
+                break
+            step_l *= 2
+        if np.max(np.abs(x_new - x)) <= tol:
+            return x_new
+        if f_new > fx and t > 1:
+            # L'accélération a dépassé: on repart du dernier point, sans momentum
+            y, t = x, 1.0
+            continue
+        t_new = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = x_new + (t - 1) / t_new * (x_new - x)
+        x, fx, t = x_new, f_new, t_new
+        step_l *= 0.9
+    return x
+
+
+def solve(score, cov_matrix, risk_tolerance, lo, hi=1.0, x0=None, mean_variance=False, method="auto"):
+    """Poids optimaux (somme 1, lo <= w <= hi); x0 sert de point de départ (warm start) s'il est fourni"""
+    n = len(score)
+    if n * lo > 1 + 1e-12 or n * hi < 1 - 1e-12:
+        raise Exception(f"Optimization failed: bounds [{lo}, {hi}] are infeasible for {n} assets")
+    if x0 is None:
+        x0 = np.full(n, 1 / n)
+    else:
+        x0 = project_capped_simplex(np.asarray(x0, dtype=float), lo, hi)
+    value_and_grad = objective(score, cov_matrix, risk_tolerance, mean_variance)
+    # Liquidité en unités de volume (~1e6) vs rendements (~1e-2): on normalise pour que la
+    # recherche linéaire de SLSQP reste stable (le minimum ne change pas)
+    scale = np.max(np.abs(value_and_grad(x0)[1])) or 1.0
+    unscaled = value_and_grad
+
+    def value_and_grad(w):
+        value, grad = unscaled(w)
+        return value / scale, grad / scale
+
+    if method == "auto":
+        method = "slsqp" if n <= SLSQP_MAX_ASSETS else "projected_gradient"
+    if method == "slsqp":
+        return solve_slsqp(value_and_grad, x0, lo, hi)
+    return solve_projected_gradient(value_and_grad, x0, lo, hi)
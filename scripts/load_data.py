@@ -1,5 +1,6 @@
 # scripts/load_data.py
 import os
+import hashlib
 import pandas as pd
 
 # folder of this script
@@ -11,6 +12,18 @@ PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, ".."))
 # path to data folder
 DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 
+# Every CSV load_data() reads
+DATA_FILES = ["prices.csv", "apy.csv", "total_supply.csv", "historical_rwa_prices.csv", "synthetic_transfers.csv"]
+
+
+def data_version():
+    """Fingerprint of the input CSVs (size + mtime); changes whenever one of them is rewritten"""
+    digest = hashlib.sha256()
+    for name in DATA_FILES:
+        stat = os.stat(os.path.join(DATA_DIR, name))
+        digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:16]
+
 def load_data():
     # --- Load main data ---
     prices = pd.read_csv(os.path.join(DATA_DIR, "prices.csv"), parse_dates=["timestamp"])
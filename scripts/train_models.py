@@ -0,0 +1,40 @@
+# scripts/train_models.py
+# Entraîne MLOptimizer sur les CSV de data/ et publie une nouvelle version du registre.
+#   python -m scripts.train_models             # entraîne, publie et promeut (LATEST)
+#   python -m scripts.train_models --no-promote
+#   python -m scripts.train_models --promote models_20251203_140830
+#   python -m scripts.train_models --list
+import argparse
+import json
+
+from scripts.load_data import load_data, data_version
+from models.ml_optimizer import MLOptimizer
+from models import model_registry
+
+
+def train_and_publish(registry_dir, promote=True):
+    data, prices_matrix, tx_df = load_data()
+    optimizer = MLOptimizer(data, prices_matrix, tx_df)
+    optimizer.train_models()
+    return model_registry.publish(optimizer, registry_dir, data_version=data_version(), promote=promote)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the portfolio ML models and publish them to the model registry")
+    parser.add_argument("--registry", default=model_registry.REGISTRY_DIR, help="registry directory (MODEL_REGISTRY_DIR)")
+    parser.add_argument("--no-promote", action="store_true", help="publish without making it the LATEST version")
+    parser.add_argument("--promote", metavar="VERSION", help="make an existing version LATEST, without training")
+    parser.add_argument("--list", action="store_true", help="list published versions")
+    args = parser.parse_args()
+
+    if args.list:
+        latest = model_registry.latest_version(args.registry)
+        for version in model_registry.list_versions(args.registry):
+            print(("* " if version == latest else "  ") + version)
+    elif args.promote:
+        model_registry.set_latest(args.promote, args.registry)
+        print(f"LATEST -> {args.promote}")
+    else:
+        version = train_and_publish(args.registry, promote=not args.no_promote)
+        _, metadata = model_registry.load(version, args.registry)
+        print(json.dumps(metadata, indent=2))